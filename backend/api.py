@@ -1,12 +1,16 @@
 """FastAPI backend for Zappos Semantic Explorer."""
 
+import time
+_IMPORT_STARTED = time.perf_counter()
+_startup_marks = []  # (phase, perf_counter when it finished) for the import-time report
+
 from fastapi import FastAPI, HTTPException, WebSocket, WebSocketDisconnect, Request, UploadFile, File
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse, FileResponse
+from fastapi.responses import JSONResponse, FileResponse, Response
 from fastapi.staticfiles import StaticFiles
 from fastapi.exceptions import RequestValidationError
 from pydantic import BaseModel
-from typing import List, Optional, Dict, Tuple
+from typing import List, Optional, Dict, Set, Tuple
 import numpy as np
 import base64
 from io import BytesIO
@@ -20,8 +24,32 @@ from pathlib import Path
 import requests
 # fal.ai rembg called via REST (no fal_client dependency needed)
 import zipfile
+import tarfile
+import queue
+import hashlib
 import json
 import tempfile
+import shutil
+import importlib
+import threading
+from fnmatch import fnmatch
+from concurrent.futures import ThreadPoolExecutor
+_startup_marks.append(("fastapi, numpy, PIL, stdlib", time.perf_counter()))
+
+
+def _report_fal_status(resp) -> None:
+    """Feed a fal.ai response status back into the shared limiter."""
+    if not resp.ok:
+        record_external_error("fal", f"http_{resp.status_code}")
+    if resp.status_code == 429:
+        _fal_limiter.report_throttled(parse_retry_after(resp.headers.get("Retry-After")))
+    elif resp.ok:
+        _fal_limiter.report_success()
+
+
+def _fal_url(endpoint: str) -> str:
+    """fal.ai endpoint URL; FAL_API_BASE points it elsewhere (e.g. loadtest/mock_services.py)."""
+    return f"{os.getenv('FAL_API_BASE', 'https://fal.run').rstrip('/')}/{endpoint}"
 
 
 def remove_background(image_bytes: bytes) -> bytes:
@@ -29,18 +57,22 @@ def remove_background(image_bytes: bytes) -> bytes:
     fal_key = os.getenv("FAL_KEY", "")
     b64_input = base64.b64encode(image_bytes).decode()
     data_url = f"data:image/png;base64,{b64_input}"
-    resp = requests.post(
-        "https://fal.run/fal-ai/imageutils/rembg",
-        headers={"Authorization": f"Key {fal_key}", "Content-Type": "application/json"},
-        json={"image_url": data_url},
-        timeout=60,
-    )
+    _fal_limiter.acquire()
+    with track_call("fal", "fal-ai/imageutils/rembg"):
+        resp = requests.post(
+            _fal_url("fal-ai/imageutils/rembg"),
+            headers={"Authorization": f"Key {fal_key}", "Content-Type": "application/json"},
+            json={"image_url": data_url},
+            timeout=60,
+        )
+    _report_fal_status(resp)
     resp.raise_for_status()
     result = resp.json()
     img_url = result.get("image", {}).get("url", "")
     if not img_url:
         raise RuntimeError(f"fal.ai rembg returned no image URL: {result}")
-    img_resp = requests.get(img_url, timeout=30)
+    with track_call("image_download", "rembg_result"):
+        img_resp = requests.get(img_url, timeout=30)
     img_resp.raise_for_status()
     return img_resp.content
 
@@ -56,13 +88,45 @@ class _NumpyEncoder(json.JSONEncoder):
             return obj.tolist()
         return super().default(obj)
 from fastapi.responses import FileResponse, StreamingResponse
-import google.generativeai as genai
 from dotenv import load_dotenv
 import re
 import socket
-from sklearn.neighbors import NearestNeighbors
 import uuid as _uuid
 import copy
+# scikit-learn and google.generativeai are imported on first use (or by the
+# post-startup warm-up), not here: they dominate cold-start time.
+
+
+class _LazyModule:
+    """Module proxy that imports on first attribute access.
+    `on_load(module)` runs once right after the import (e.g. SDK configuration)."""
+
+    def __init__(self, name: str, on_load=None):
+        self._name = name
+        self._on_load = on_load
+        self._module = None
+        self._lock = threading.Lock()
+        self.import_ms: Optional[float] = None
+
+    def load(self):
+        if self._module is None:
+            with self._lock:
+                if self._module is None:
+                    t0 = time.perf_counter()
+                    module = importlib.import_module(self._name)
+                    if self._on_load is not None:
+                        self._on_load(module)
+                    self.import_ms = round((time.perf_counter() - t0) * 1000, 1)
+                    self._module = module
+        return self._module
+
+    @property
+    def loaded(self) -> bool:
+        return self._module is not None
+
+    def __getattr__(self, attr):
+        return getattr(self.load(), attr)
+
 
 # Load environment variables
 load_dotenv()
@@ -71,6 +135,12 @@ load_dotenv()
 DATA_DIR = Path(__file__).parent / "data"
 ADMIN_KEY = os.getenv("ADMIN_KEY", "zappos-admin")
 
+# Event logging: JSONL lines are buffered per participant and written in batches
+EVENT_LOG_FLUSH_INTERVAL = float(os.getenv("EVENT_LOG_FLUSH_INTERVAL", "1.0"))  # seconds between batch writes
+EVENT_LOG_MAX_BATCH = int(os.getenv("EVENT_LOG_MAX_BATCH", "256"))              # write early once this many lines queue up
+EVENT_LOG_FSYNC = os.getenv("EVENT_LOG_FSYNC", "session_end")                   # "never" | "session_end" | "always"
+EVENT_LOG_MEMORY_LIMIT = int(os.getenv("EVENT_LOG_MEMORY_LIMIT", "2000"))       # in-memory ring buffer size
+
 # Study participant credentials: STUDY_USERS="Alice:pass1,Bob:pass2"
 _STUDY_USERS: Dict[str, str] = {}
 for _pair in os.getenv("STUDY_USERS", "").split(","):
@@ -81,22 +151,49 @@ for _pair in os.getenv("STUDY_USERS", "").split(","):
 
 # Configure Gemini
 gemini_api_key = os.getenv('GOOGLE_API_KEY')
-if gemini_api_key:
-    genai.configure(api_key=gemini_api_key)
-    print("[OK] Gemini API configured")
-else:
+# GEMINI_API_ENDPOINT redirects the SDK (REST transport) to another host, e.g. the load-test mocks
+GEMINI_API_ENDPOINT = os.getenv("GEMINI_API_ENDPOINT", "")
+_GENAI_CLIENT_OPTS = (
+    {"transport": "rest", "client_options": {"api_endpoint": GEMINI_API_ENDPOINT}}
+    if GEMINI_API_ENDPOINT else {}
+)
+
+
+def _configure_gemini(module) -> None:
+    if gemini_api_key:
+        module.configure(api_key=gemini_api_key, **_GENAI_CLIENT_OPTS)
+        print("[OK] Gemini API configured")
+
+
+genai = _LazyModule("google.generativeai", on_load=_configure_gemini)
+if not gemini_api_key:
     print("[WARNING] GOOGLE_API_KEY not found in .env file")
+_startup_marks.append(("dotenv, config", time.perf_counter()))
 
 # Add parent directory to Python path to import models
 parent_dir = Path(__file__).parent.parent
 sys.path.insert(0, str(parent_dir))
 
 # Import our models (SemanticGenerator removed - using fal.ai for generation)
-from models import CLIPEmbedder, HuggingFaceCLIPEmbedder, SemanticAxisBuilder
+from models import CLIPEmbedder, HuggingFaceCLIPEmbedder, SemanticAxisBuilder, EmbeddingDispatcher, OnlineAxisLearner, PCABasis
+from models.umap_projection import UMAPProjector, is_valid_key as is_valid_umap_key
 from models.data_structures import ImageMetadata, HistoryGroup
+from models.rate_limit import get_limiter, parse_retry_after, all_limiter_stats
+from models.singleflight import SingleFlight, AsyncSingleFlight
+from models.telemetry import (
+    REGISTRY, PROMETHEUS_CONTENT_TYPE, HTTP_LATENCY, OPERATION_LATENCY, LOOP_LAG,
+    BROADCAST_BYTES, track_call, record_external_error, record_cache,
+)
+from models.profiling import RequestProfiler
+from models.tracing import tracer, span, traced
+_startup_marks.append(("models package", time.perf_counter()))
 
 app = FastAPI(title="Zappos Semantic Explorer API")
 
+# Process-wide limiters for external services (see models/rate_limit.py)
+_fal_limiter = get_limiter("fal")
+_gemini_limiter = get_limiter("gemini")
+
 # ── Data download endpoint (no external deps needed) ─────────────────────────
 # Hit /api/admin/download-data?admin_key=032423 in a browser to get a tar.gz
 # of the entire data directory. Bookmark it for periodic local backups.
@@ -105,7 +202,7 @@ app = FastAPI(title="Zappos Semantic Explorer API")
 # Each participant gets their own AppState so concurrent users never share data.
 # _StateProxy transparently delegates attribute access to the current request's
 # AppState via a ContextVar — zero changes required to the 370+ state.xxx calls.
-import threading
+from collections import deque, OrderedDict
 from contextvars import ContextVar
 
 _participant_states: Dict[str, "AppState"] = {}
@@ -176,6 +273,223 @@ async def participant_context_middleware(request: Request, call_next):
         _current_participant_id.reset(token)
     return response
 
+# ── Event-loop lag monitor ───────────────────────────────────────────────────
+# A background task sleeps for a fixed interval and records how late it woke
+# up. Anything blocking the loop (sync I/O, CPU work in a handler) shows up
+# as lag. Read it at /api/admin/loop-lag (the load-test harness does).
+LOOP_LAG_INTERVAL = float(os.getenv("LOOP_LAG_INTERVAL", "0.1"))   # seconds between probes
+LOOP_LAG_SAMPLES = int(os.getenv("LOOP_LAG_SAMPLES", "6000"))      # ring buffer size (10 min at 0.1s)
+
+
+class _LoopLagMonitor:
+    def __init__(self, interval: float, max_samples: int):
+        self.interval = interval
+        self.samples: deque = deque(maxlen=max_samples)
+        self.max_lag = 0.0
+        self.probes = 0
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.ensure_future(self._run())
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            t0 = loop.time()
+            await asyncio.sleep(self.interval)
+            lag = max(loop.time() - t0 - self.interval, 0.0)
+            LOOP_LAG.observe(lag)
+            self.samples.append(lag)
+            self.max_lag = max(self.max_lag, lag)
+            self.probes += 1
+
+    def reset(self) -> None:
+        self.samples.clear()
+        self.max_lag = 0.0
+        self.probes = 0
+
+    def stats(self) -> dict:
+        lags = np.array(self.samples, dtype=np.float64) * 1000.0
+        if not len(lags):
+            return {"interval_ms": self.interval * 1000.0, "probes": 0}
+        p50, p95, p99 = np.percentile(lags, [50, 95, 99])
+        return {
+            "interval_ms": self.interval * 1000.0,
+            "probes": self.probes,
+            "window": len(lags),
+            "mean_ms": round(float(lags.mean()), 3),
+            "p50_ms": round(float(p50), 3),
+            "p95_ms": round(float(p95), 3),
+            "p99_ms": round(float(p99), 3),
+            "max_ms": round(self.max_lag * 1000.0, 3),
+            "last_ms": round(float(lags[-1]), 3),
+        }
+
+
+_loop_lag_monitor = _LoopLagMonitor(LOOP_LAG_INTERVAL, LOOP_LAG_SAMPLES)
+
+
+@app.on_event("startup")
+async def _start_loop_lag_monitor():
+    _loop_lag_monitor.start()
+
+
+# ── Cold start: import-time report + deferred warm-up ────────────────────────
+# Heavy modules are imported lazily. The warm-up loads them on a worker thread
+# shortly after startup (uvicorn binds the port once startup handlers return),
+# so the health check never waits on them and first requests rarely do.
+STARTUP_WARMUP = os.getenv("STARTUP_WARMUP", "1").lower() not in ("0", "false", "no", "off")
+STARTUP_WARMUP_DELAY = float(os.getenv("STARTUP_WARMUP_DELAY", "1.0"))  # seconds after startup
+_HEAVY_MODULES = ("sklearn", "scipy", "pandas", "umap", "google.generativeai")
+_startup_report: dict = {}
+_background_tasks: Set[asyncio.Task] = set()
+
+
+def _spawn(coro) -> asyncio.Task:
+    """ensure_future() that keeps a reference until done (the loop only holds tasks weakly)."""
+    task = asyncio.ensure_future(coro)
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+    return task
+
+
+def _warm_sklearn() -> None:
+    importlib.import_module("sklearn.neighbors")
+    importlib.import_module("sklearn.cluster")
+
+
+_WARMUP_STEPS = [("sklearn", _warm_sklearn), ("google.generativeai", genai.load)]
+
+
+def _import_time_report() -> dict:
+    phases, prev = {}, _IMPORT_STARTED
+    for phase, t in _startup_marks:
+        phases[phase] = round((t - prev) * 1000, 1)
+        prev = t
+    return {
+        "import_ms": round((prev - _IMPORT_STARTED) * 1000, 1),
+        "import_phases_ms": phases,
+        "heavy_modules_at_import": [m for m in _HEAVY_MODULES if m in sys.modules],
+    }
+
+
+async def _warm_up() -> None:
+    await asyncio.sleep(STARTUP_WARMUP_DELAY)
+    timings = {}
+    for name, step in _WARMUP_STEPS:
+        t0 = time.perf_counter()
+        try:
+            await asyncio.to_thread(step)
+        except Exception as e:
+            print(f"[startup] warm-up of {name} failed: {e}")
+            continue
+        timings[name] = round((time.perf_counter() - t0) * 1000, 1)
+    _startup_report["warmup_ms"] = timings
+    print(f"[startup] warm-up done: {timings}")
+
+
+@app.on_event("startup")
+async def _schedule_warm_up():
+    _startup_report["startup_event_after_import_ms"] = round(
+        (time.perf_counter() - _startup_marks[-1][1]) * 1000, 1)
+    if STARTUP_WARMUP:
+        _spawn(_warm_up())
+
+
+# ── Metrics (Prometheus text format at /api/metrics, see models/telemetry.py) ─
+
+@app.middleware("http")
+async def request_metrics_middleware(request: Request, call_next):
+    """Per-route latency histogram. Labelled by route template (not the raw
+    path) so label cardinality stays bounded."""
+    t0 = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        route = getattr(request.scope.get("route"), "path", "unmatched")
+        HTTP_LATENCY.observe(time.perf_counter() - t0, method=request.method, route=route, status=str(status))
+
+
+REGISTRY.gauge("active_participants", "Participants with in-memory state").set_function(
+    lambda: len(_participant_states))
+REGISTRY.gauge("websocket_connections", "Open websocket connections").set_function(
+    lambda: sum(len(st.websocket_connections) for st in list(_participant_states.values())))
+
+
+@app.get("/api/metrics")
+async def metrics():
+    """Prometheus scrape endpoint: request/outbound/operation latencies, loop lag, caches."""
+    return Response(REGISTRY.render(), media_type=PROMETHEUS_CONTENT_TYPE)
+
+
+# ── On-demand request profiling (see models/profiling.py) ────────────────────
+# Off unless PROFILE_REQUESTS=1 or enabled via POST /api/admin/profiling.
+# Diagnostics live under DATA_DIR/_diagnostics ("_" dirs are not participants).
+DIAGNOSTICS_DIR = DATA_DIR / "_diagnostics"
+_request_profiler = RequestProfiler.from_env(DIAGNOSTICS_DIR / "profiles")
+
+
+def _save_profile(*args) -> None:
+    try:
+        paths = _request_profiler.save(*args)
+        print(f"[profiling] saved {paths[0].name}")
+    except Exception as e:
+        print(f"[profiling] failed to save profile: {e}")
+
+
+@app.middleware("http")
+async def request_profiling_middleware(request: Request, call_next):
+    if not _request_profiler.enabled:
+        return await call_next(request)
+    _request_profiler.request_started()
+    session = _request_profiler.begin(request.url.path)
+    if session is None:
+        try:
+            return await call_next(request)
+        finally:
+            _request_profiler.request_finished()
+    t0 = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        _request_profiler.request_finished()
+        elapsed_ms = (time.perf_counter() - t0) * 1000.0
+        if _request_profiler.end(session, elapsed_ms):
+            route = getattr(request.scope.get("route"), "path", request.url.path)
+            pid = request.headers.get("X-Participant-Id", "researcher").strip() or "researcher"
+            _spawn(asyncio.to_thread(
+                _save_profile, session, pid, request.method, request.url.path, route, status, elapsed_ms))
+
+
+# ── Request tracing (per-stage spans, see models/tracing.py) ──────────────────
+# Ingestion and agent requests get a trace; stages inside them (download,
+# decode, remove_background, Jina, projection, clusters, broadcast, Gemini)
+# record spans. Listed at /api/admin/traces; OTEL_EXPORTER_OTLP_ENDPOINT also
+# ships them to a local collector.
+TRACE_ROUTES = [r.strip() for r in os.getenv(
+    "TRACE_ROUTES", "/api/add-external-images,/api/embed-ghost,/api/agent/*").split(",") if r.strip()]
+
+
+@app.middleware("http")
+async def request_tracing_middleware(request: Request, call_next):
+    path = request.url.path
+    if not any(fnmatch(path, pattern) for pattern in TRACE_ROUTES):
+        return await call_next(request)
+    pid = request.headers.get("X-Participant-Id", "researcher").strip() or "researcher"
+    with tracer.trace(f"{request.method} {path}", participant_id=pid) as root:
+        response = await call_next(request)
+        root.set(status=response.status_code)
+    response.headers["X-Trace-Id"] = root.trace.trace_id
+    return response
+
+
 @app.get("/api/health")
 async def health_check():
     """Health check endpoint for Railway deployment."""
@@ -313,6 +627,11 @@ class AppState:
             'z': ('casual', 'elegant')  # New: default z-axis labels
         }
         self.is_3d_mode = False  # New: track 3D mode
+        # Per-axis directions learned from dragged image anchors (see /api/axis-anchor)
+        self.online_axes: Dict[str, OnlineAxisLearner] = {}
+        self.pca_basis: Optional[PCABasis] = None  # unsupervised axes of the current canvas (see /api/pca-basis)
+        self.projection_mode: str = "axes"  # "axes" (semantic axes) or "umap" (see /api/projection-mode)
+        self.umap_key: Optional[str] = None  # fitted UMAP layout used in "umap" mode
         self.next_id = 0
         self.websocket_connections: List[WebSocket] = []
         self.design_brief: Optional[str] = None  # New: persist design brief
@@ -322,7 +641,9 @@ class AppState:
         self.clip_model_type: str = os.getenv("CLIP_MODEL", "fashionclip")  # "fashionclip" or "huggingface"
         # Caches to avoid redundant Gemini/embedding calls
         self._gemini_expansion_cache: Dict[str, List[str]] = {}  # concept -> expanded concepts
-        self._axis_directions_cache: Optional[Tuple] = None  # (labels_key, (x_dir, y_dir, z_dir?))
+        # Latest-wins control for long-running work per resource (see _run_latest)
+        self._work_generations: Dict[str, int] = {}
+        self._inflight_work: Dict[str, asyncio.Future] = {}
         # Session / multi-canvas tracking
         self.current_canvas_id: str = str(_uuid.uuid4())
         self.canvas_name: str = "Canvas 1"
@@ -330,7 +651,7 @@ class AppState:
         self.canvas_created_at: str = datetime.now().isoformat()
         self.parent_canvas_id: Optional[str] = None
         self.shared_image_ids: List[int] = []
-        self.event_log: List[Dict] = []
+        self.event_log: deque = _new_event_ring()  # bounded; full history lives in the JSONL file
         self.event_log_path: Optional[Path] = None       # current JSONL event log file path
         self.event_log_session_start: Optional[str] = None  # ISO timestamp of session start
         self.study_session_name: str = ""  # User-set study session identifier (prefixed to filenames)
@@ -440,9 +761,7 @@ def _serialize_canvas() -> dict:
     """Serialize current AppState to a JSON-safe dict."""
     images_data = []
     for img in state.images_metadata:
-        buf = BytesIO()
-        img.pil_image.save(buf, format="PNG")
-        b64 = "data:image/png;base64," + base64.b64encode(buf.getvalue()).decode()
+        b64 = "data:image/png;base64," + base64.b64encode(img.get_png_bytes()).decode()
         ts = img.timestamp.isoformat() if isinstance(img.timestamp, datetime) else str(img.timestamp)
         images_data.append({
             "id": img.id,
@@ -482,6 +801,9 @@ def _serialize_canvas() -> dict:
         "parentCanvasId": state.parent_canvas_id,
         "sharedImageIds": state.shared_image_ids,
         "axisLabels": {k: list(v) for k, v in state.axis_labels.items()},
+        "onlineAxes": {axis: learner.to_dict() for axis, learner in state.online_axes.items()},
+        "projectionMode": state.projection_mode,
+        "umapModel": state.umap_key,
         "designBrief": state.design_brief,
         "briefFields": state.brief_fields,
         "briefInterpretation": state.brief_interpretation,
@@ -543,23 +865,127 @@ def _get_last_active_canvas_id(participant_id: str) -> Optional[str]:
     return None
 
 
-def _close_event_log():
-    """Write session_end to the current JSONL event log and clear the path."""
-    if state.event_log_path:
-        try:
-            with open(state.event_log_path, "a", encoding="utf-8") as f:
-                f.write(json.dumps({
-                    "type": "session_end",
-                    "timestamp": datetime.now().isoformat(),
-                    "canvas_id": state.current_canvas_id,
-                }) + "\n")
-        except Exception:
-            pass
+def _new_event_ring(entries=()) -> deque:
+    """In-memory event log: a ring buffer so long sessions can't grow it unbounded."""
+    return deque(entries, maxlen=EVENT_LOG_MEMORY_LIMIT)
+
+
+class _EventLogWriter:
+    """Background JSONL writer for one participant.
+
+    Request handlers only append a serialized line to an in-memory queue; a
+    daemon thread drains it every EVENT_LOG_FLUSH_INTERVAL seconds (or earlier
+    once EVENT_LOG_MAX_BATCH lines are waiting), opening each file once per
+    batch. flush() forces a write and optionally an fsync, e.g. on session_end.
+    """
+
+    def __init__(self, participant_id: str):
+        self.participant_id = participant_id
+        self._pending: deque = deque()  # (path, line)
+        self._cond = threading.Condition()
+        self._flush_requested = 0   # incremented by flush()
+        self._flush_done = 0        # highest request number fully written
+        self._fsync_requested = False
+        self._thread = threading.Thread(target=self._run, name=f"eventlog-{participant_id}", daemon=True)
+        self._thread.start()
+
+    def write(self, path: Path, line: str) -> None:
+        with self._cond:
+            self._pending.append((path, line))
+            if len(self._pending) >= EVENT_LOG_MAX_BATCH:
+                self._cond.notify()
+
+    def flush(self, fsync: bool = False, timeout: float = 5.0) -> bool:
+        """Write everything queued so far; returns False if it didn't finish in time."""
+        with self._cond:
+            self._flush_requested += 1
+            ticket = self._flush_requested
+            self._fsync_requested = self._fsync_requested or fsync
+            self._cond.notify()
+            return self._cond.wait_for(lambda: self._flush_done >= ticket, timeout=timeout)
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                self._cond.wait_for(
+                    lambda: self._flush_requested > self._flush_done
+                    or len(self._pending) >= EVENT_LOG_MAX_BATCH,
+                    timeout=EVENT_LOG_FLUSH_INTERVAL,
+                )
+                batch = list(self._pending)
+                self._pending.clear()
+                ticket = self._flush_requested
+                fsync = self._fsync_requested or EVENT_LOG_FSYNC == "always"
+                self._fsync_requested = False
+            if batch:
+                self._write_batch(batch, fsync and EVENT_LOG_FSYNC != "never")
+            with self._cond:
+                self._flush_done = max(self._flush_done, ticket)
+                self._cond.notify_all()
+
+    @staticmethod
+    def _write_batch(batch: List[Tuple[Path, str]], fsync: bool) -> None:
+        by_path: Dict[Path, List[str]] = {}
+        for path, line in batch:
+            by_path.setdefault(path, []).append(line)
+        for path, lines in by_path.items():
+            try:
+                with open(path, "a", encoding="utf-8") as f:
+                    f.writelines(lines)
+                    if fsync:
+                        f.flush()
+                        os.fsync(f.fileno())
+            except Exception as e:
+                print(f"[eventlog] failed to write {len(lines)} events to {path}: {e}")
+
+
+_event_writers: Dict[str, _EventLogWriter] = {}
+_event_writers_lock = threading.Lock()
+
+
+def _get_event_writer(participant_id: Optional[str] = None) -> _EventLogWriter:
+    pid = participant_id or state.participant_id or "researcher"
+    writer = _event_writers.get(pid)
+    if writer is None:
+        with _event_writers_lock:
+            writer = _event_writers.get(pid)
+            if writer is None:
+                writer = _EventLogWriter(pid)
+                _event_writers[pid] = writer
+    return writer
+
+
+@app.on_event("shutdown")
+async def _flush_event_writers():
+    """Don't lose the last buffered events when the server stops."""
+    for writer in list(_event_writers.values()):
+        await asyncio.to_thread(writer.flush, True)
+
+
+async def _close_event_log():
+    """Write session_end to the current JSONL event log, flush it to disk and clear the path."""
+    path = state.event_log_path
     state.event_log_path = None
     state.event_log_session_start = None
+    if path:
+        writer = _get_event_writer()
+        writer.write(path, json.dumps({
+            "type": "session_end",
+            "timestamp": datetime.now().isoformat(),
+            "canvas_id": state.current_canvas_id,
+        }) + "\n")
+        # flush() waits on the writer thread (and may fsync): keep it off the loop
+        await asyncio.to_thread(writer.flush, EVENT_LOG_FSYNC != "never")
+
+
+def _prepare_event_log_file(writer: _EventLogWriter, path: Path) -> bool:
+    """Create the events directory and report whether today's file is new (worker thread)."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    writer.flush()  # earlier buffered lines decide whether today's file already exists
+    return not path.exists()
 
 
-def _open_event_log():
+async def _open_event_log():
     """Open or append to the daily JSONL event log for the current participant.
 
     All visits within one calendar day go into one file:
@@ -567,101 +993,80 @@ def _open_event_log():
     Subsequent visits append a session_resume marker instead of creating a new file.
     """
     now = datetime.now()
-    state.event_log_session_start = now.isoformat()
+    session_start = now.isoformat()
     date_str = now.strftime("%Y-%m-%d")
     participant = state.participant_id or "researcher"
     fname = f"{participant}_{date_str}_eventlog.jsonl"
     path = DATA_DIR / participant / "events" / fname
-    path.parent.mkdir(parents=True, exist_ok=True)
+    writer = _get_event_writer(participant)
+    is_new = await asyncio.to_thread(_prepare_event_log_file, writer, path)
+    writer.write(path, json.dumps({
+        "type": "session_start" if is_new else "session_resume",
+        "timestamp": session_start,
+        "canvas_id": state.current_canvas_id,
+        "canvas_name": state.canvas_name,
+        "participant_id": participant,
+    }) + "\n")
+    # Set the path only after the marker so events logged meanwhile don't precede it
+    state.event_log_session_start = session_start
     state.event_log_path = path
-    is_new = not path.exists()
-    with open(path, "a", encoding="utf-8") as f:
-        if is_new:
-            f.write(json.dumps({
-                "type": "session_start",
-                "timestamp": state.event_log_session_start,
-                "canvas_id": state.current_canvas_id,
-                "canvas_name": state.canvas_name,
-                "participant_id": participant,
-            }) + "\n")
-        else:
-            f.write(json.dumps({
-                "type": "session_resume",
-                "timestamp": state.event_log_session_start,
-                "canvas_id": state.current_canvas_id,
-                "canvas_name": state.canvas_name,
-                "participant_id": participant,
-            }) + "\n")
 
 
 def _log_event_to_file(entry: dict):
-    """Append an event dict to the current JSONL file (fire-and-forget)."""
+    """Queue an event dict for the current JSONL file (fire-and-forget, written in batches)."""
     if state.event_log_path:
         try:
-            with open(state.event_log_path, "a", encoding="utf-8") as f:
-                f.write(json.dumps(entry, cls=_NumpyEncoder) + "\n")
+            _get_event_writer().write(state.event_log_path, json.dumps(entry, cls=_NumpyEncoder) + "\n")
         except Exception:
             pass
 
 
-def _deserialize_canvas(data: dict) -> None:
-    """Restore AppState from a saved canvas dict (clears existing state)."""
-    from models.data_structures import ImageMetadata, HistoryGroup
+# PNG encode/decode for export and import runs on a small shared pool.
+_PNG_CODEC_WORKERS = int(os.getenv("PNG_CODEC_WORKERS", "4"))
+_png_pool = ThreadPoolExecutor(max_workers=_PNG_CODEC_WORKERS, thread_name_prefix="png-codec")
 
-    # Restore canvas meta
-    state.current_canvas_id = data.get("id") or str(_uuid.uuid4())
-    state.canvas_name = data.get("name", "Canvas 1")
-    state.participant_id = data.get("participantId", "researcher")
-    state.canvas_created_at = data.get("createdAt", datetime.now().isoformat())
-    state.parent_canvas_id = data.get("parentCanvasId")
-    state.shared_image_ids = data.get("sharedImageIds", [])
-    state.event_log = data.get("eventLog", [])
-    state.design_brief = data.get("designBrief")
-    state.brief_fields = data.get("briefFields", [])
-    state.brief_interpretation = data.get("briefInterpretation")
-    state.brief_suggested_params = data.get("briefSuggestedParams", [])
-    state.brief_highlights = data.get("briefHighlights", [])
-    state.next_id = data.get("nextId", 0)
 
-    # Restore axis labels (tuples)
-    raw_axes = data.get("axisLabels", {"x": ["formal","sporty"], "y": ["dark","colorful"]})
-    state.axis_labels = {k: tuple(v) for k, v in raw_axes.items()}
+def _decode_png(png_bytes: bytes) -> Image.Image:
+    """Decode PNG bytes to a fully loaded RGBA image (safe to run on a worker thread)."""
+    with Image.open(BytesIO(png_bytes)) as im:
+        return im.convert("RGBA")
 
-    # Invalidate caches so reprojection uses restored axis labels
-    state._axis_directions_cache = None
-    state._gemini_expansion_cache = {}
 
-    # Restore images
-    state.images_metadata = []
-    all_embeddings = []
-    img_records = []
-    for img_data in data.get("images", []):
-        b64_str = img_data["base64_image"].split(",", 1)[-1]
-        pil_img = Image.open(BytesIO(base64.b64decode(b64_str))).convert("RGBA")
-        embedding = np.array(img_data["embedding"], dtype=np.float32)
+def _b64_image_bytes(img_data: dict) -> bytes:
+    """Raw image bytes from a saved canvas image record's inline base64_image."""
+    return base64.b64decode(img_data["base64_image"].split(",", 1)[-1])
+
+
+def _read_canvas(data: dict, image_loader=None) -> dict:
+    """Build everything a saved canvas dict restores, without touching AppState.
+
+    Runs in a worker thread: PNG decoding, embeddings and learner restore happen
+    here, and _apply_canvas() then assigns the result on the event loop in one go
+    (handlers for the same participant keep running while this one awaits).
+    image_loader(img_data) -> PNG bytes lets callers supply pixel data directly
+    (e.g. from ZIP members); by default the record's inline base64_image is used.
+    """
+    from models.data_structures import ImageMetadata, HistoryGroup
+
+    # Decode on the codec pool; stored embeddings are reused as-is (no re-embedding)
+    images_data = data.get("images", [])
+    loader = image_loader or _b64_image_bytes
+    png_blobs = [loader(img_data) for img_data in images_data]
+    pil_images = list(_png_pool.map(_decode_png, png_blobs))
+    images = []
+    for img_data, png_bytes, pil_img in zip(images_data, png_blobs, pil_images):
         ts_raw = img_data.get("timestamp", "")
         try:
             ts = datetime.fromisoformat(ts_raw)
         except Exception:
             ts = datetime.now()
-        all_embeddings.append(embedding)
-        img_records.append((img_data, pil_img, embedding, ts))
-
-    # Reproject all embeddings using restored axis labels
-    if img_records and state.embedder and state.axis_builder:
-        emb_matrix = np.array([e for _, _, e, _ in img_records])
-        coords = project_embeddings_to_coordinates(emb_matrix)
-    else:
-        coords = [img_data.get("coordinates", [0.0, 0.0]) for img_data, _, _, _ in img_records]
-
-    for i, (img_data, pil_img, embedding, ts) in enumerate(img_records):
-        coord = tuple(coords[i]) if hasattr(coords[i], '__iter__') else (0.0, 0.0)
+        stored = img_data.get("coordinates", [0.0, 0.0])
         meta = ImageMetadata(
             id=img_data["id"],
             group_id=img_data.get("group_id", ""),
             pil_image=pil_img,
-            embedding=embedding,
-            coordinates=coord,
+            embedding=np.array(img_data["embedding"], dtype=np.float32),
+            coordinates=tuple(stored) if hasattr(stored, '__iter__') else (0.0, 0.0),
             parents=img_data.get("parents", []),
             children=img_data.get("children", []),
             reference_ids=img_data.get("reference_ids", []),
@@ -676,18 +1081,33 @@ def _deserialize_canvas(data: dict) -> None:
             shoe_view=img_data.get("shoe_view", "side"),
             parent_side_id=img_data.get("parent_side_id", -1),
         )
-        state.images_metadata.append(meta)
+        meta._cached_png = png_bytes  # already PNG-encoded — reuse for responses/exports
+        images.append(meta)
 
-    # Restore history groups
-    from models.data_structures import HistoryGroup
-    state.history_groups = []
+    # Anchor-learned axes (they override the text axes when reprojecting)
+    anchor_embeddings = {img.id: img.embedding for img in images}
+    online_axes = {}
+    for axis, learner_data in (data.get("onlineAxes") or {}).items():
+        try:
+            online_axes[axis] = OnlineAxisLearner.from_dict(learner_data, anchor_embeddings)
+        except Exception as e:
+            print(f"[online-axes] could not restore {axis} axis: {e}")
+
+    # UMAP mode reuses the fitted layout from UMAP_CACHE (falls back to axes if it's gone)
+    projection_mode = data.get("projectionMode", "axes")
+    umap_key = data.get("umapModel")
+    if projection_mode not in ("axes", "umap") or (umap_key is not None and not is_valid_umap_key(umap_key)):
+        print(f"[umap] ignoring invalid layout in canvas: {projection_mode!r} {umap_key!r}")
+        projection_mode, umap_key = "axes", None
+
+    history_groups = []
     for hg_data in data.get("historyGroups", []):
         ts_raw = hg_data.get("timestamp", "")
         try:
             ts = datetime.fromisoformat(ts_raw)
         except Exception:
             ts = datetime.now()
-        state.history_groups.append(HistoryGroup(
+        history_groups.append(HistoryGroup(
             id=hg_data["id"],
             type=hg_data.get("type", "batch"),
             image_ids=hg_data.get("image_ids", []),
@@ -697,6 +1117,48 @@ def _deserialize_canvas(data: dict) -> None:
             timestamp=ts,
         ))
 
+    raw_axes = data.get("axisLabels", {"x": ["formal","sporty"], "y": ["dark","colorful"]})
+    return {
+        "data": data,
+        "axis_labels": {k: tuple(v) for k, v in raw_axes.items()},
+        "images": images,
+        "online_axes": online_axes,
+        "projection_mode": projection_mode,
+        "umap_key": umap_key,
+        "history_groups": history_groups,
+        "event_log": _new_event_ring(data.get("eventLog", [])),
+    }
+
+
+def _apply_canvas(restored: dict) -> None:
+    """Replace AppState with a canvas built by _read_canvas (event loop, no awaits)."""
+    data = restored["data"]
+
+    # Restore canvas meta
+    state.current_canvas_id = data.get("id") or str(_uuid.uuid4())
+    state.canvas_name = data.get("name", "Canvas 1")
+    state.participant_id = data.get("participantId", "researcher")
+    state.canvas_created_at = data.get("createdAt", datetime.now().isoformat())
+    state.parent_canvas_id = data.get("parentCanvasId")
+    state.shared_image_ids = data.get("sharedImageIds", [])
+    state.event_log = restored["event_log"]
+    state.design_brief = data.get("designBrief")
+    state.brief_fields = data.get("briefFields", [])
+    state.brief_interpretation = data.get("briefInterpretation")
+    state.brief_suggested_params = data.get("briefSuggestedParams", [])
+    state.brief_highlights = data.get("briefHighlights", [])
+    state.next_id = data.get("nextId", 0)
+
+    state.axis_labels = restored["axis_labels"]
+    # Fresh expansions for the restored canvas (pole directions are keyed by expansion set)
+    state._gemini_expansion_cache = {}
+    state.online_axes = restored["online_axes"]
+    state.projection_mode = restored["projection_mode"]
+    state.umap_key = restored["umap_key"]
+
+    state.images_metadata = restored["images"]
+    state.history_groups = restored["history_groups"]
+
     # Restore layer metadata
     if "layerDefinitions" in data:
         state.layer_definitions = data["layerDefinitions"]
@@ -708,6 +1170,33 @@ def _deserialize_canvas(data: dict) -> None:
     state.cluster_labels = []
 
 
+async def _reproject_restored(use_3d: bool = None) -> None:
+    """Place restored images with the restored axes (latest-wins with axis edits).
+
+    Images keep their stored coordinates until the projection lands; if an axis
+    edit started meanwhile, its projection owns the positions instead."""
+    images = list(state.images_metadata)
+    if not images or not (state.embedder and state.axis_builder):
+        return
+    emb_matrix = np.array([img.embedding for img in images])
+    try:
+        coords = await _run_latest(PROJECTION_WORK, lambda: aproject_embeddings_to_coordinates(emb_matrix, use_3d=use_3d))
+    except _Superseded:
+        return
+    _apply_coordinates(images, coords)
+
+
+async def _deserialize_canvas(data: dict, image_loader=None, use_3d: bool = None) -> None:
+    """Restore AppState from a saved canvas dict (clears existing state).
+
+    Decoding runs in a worker thread; state is only assigned on the event loop.
+    use_3d is forwarded to the reprojection (None = current mode).
+    """
+    restored = await asyncio.to_thread(_read_canvas, data, image_loader)
+    _apply_canvas(restored)
+    await _reproject_restored(use_3d)
+
+
 def _list_sessions(participant_id: str) -> List[dict]:
     """List all saved canvases for a participant, sorted by updatedAt descending."""
     sessions_dir = DATA_DIR / participant_id / "sessions"
@@ -739,6 +1228,7 @@ def _list_sessions(participant_id: str) -> List[dict]:
 def _get_cached_expansion(concept: str, num_expansions: int = 4) -> Optional[List[str]]:
     """Return cached Gemini expansion if available."""
     key = f"{concept}:{num_expansions}"
+    record_cache("gemini_expansion", key in state._gemini_expansion_cache)
     if key in state._gemini_expansion_cache:
         return state._gemini_expansion_cache[key]
     return None
@@ -755,98 +1245,221 @@ def _set_cached_expansion(concept: str, concepts: List[str], num_expansions: int
             del state._gemini_expansion_cache[k]
 
 
+# Pole directions are cached process-wide, one entry per
+# (embedder model, pole label, expansion set), so switching back to an earlier
+# axis pair, toggling 3D, or changing a single axis only rebuilds new poles.
+_POLE_CACHE_SIZE = int(os.getenv("POLE_DIRECTION_CACHE_SIZE", "256"))
+_pole_direction_cache: "OrderedDict[tuple, np.ndarray]" = OrderedDict()
+_pole_cache_lock = threading.Lock()
+
+
+def _pole_cache_key(label: str, concepts: List[str]) -> tuple:
+    model = getattr(state.embedder, "model_name", type(state.embedder).__name__)
+    return (model, label, tuple(concepts))
+
+
+def _pole_cache_get(key: tuple) -> Optional[np.ndarray]:
+    with _pole_cache_lock:
+        direction = _pole_direction_cache.get(key)
+        if direction is not None:
+            _pole_direction_cache.move_to_end(key)
+    record_cache("pole_direction", direction is not None)
+    return direction
+
+
+def _pole_cache_put(key: tuple, direction: np.ndarray) -> np.ndarray:
+    with _pole_cache_lock:
+        _pole_direction_cache[key] = direction
+        _pole_direction_cache.move_to_end(key)
+        while len(_pole_direction_cache) > _POLE_CACHE_SIZE:
+            _pole_direction_cache.popitem(last=False)
+    return direction
+
+
+def _get_pole_direction(label: str) -> np.ndarray:
+    """Ensemble direction for one pole label (Gemini expansion + embeddings, LRU-cached)."""
+    concepts = _get_cached_expansion(label)
+    if concepts is None:
+        concepts = expand_concept_with_gemini(label, num_expansions=4)
+        _set_cached_expansion(label, concepts)
+
+    key = _pole_cache_key(label, concepts)
+    direction = _pole_cache_get(key)
+    if direction is None:
+        axis = state.axis_builder.create_ensemble_axis(concepts, name=f"ensemble_{label}", positive_concept="pos", negative_concept="neg")
+        direction = _pole_cache_put(key, axis.direction)
+    return direction
+
+
+async def _aget_pole_direction(label: str) -> np.ndarray:
+    """Async _get_pole_direction: Gemini runs on a worker thread, embedding via the async API."""
+    concepts = _get_cached_expansion(label)
+    if concepts is None:
+        concepts = await asyncio.to_thread(expand_concept_with_gemini, label, 4)
+        _set_cached_expansion(label, concepts)
+
+    key = _pole_cache_key(label, concepts)
+    direction = _pole_cache_get(key)
+    if direction is None:
+        axis = await state.axis_builder.acreate_ensemble_axis(concepts, name=f"ensemble_{label}", positive_concept="pos", negative_concept="neg")
+        direction = _pole_cache_put(key, axis.direction)
+    return direction
+
+
+def _unit_axis(neg_dir: np.ndarray, pos_dir: np.ndarray) -> np.ndarray:
+    direction = pos_dir - neg_dir
+    norm = np.linalg.norm(direction)
+    if norm > 1e-12:
+        direction = direction / norm
+    return direction
+
+
+def _get_axis_direction(labels: Tuple[str, str]) -> np.ndarray:
+    """Unit direction from the negative pole to the positive pole."""
+    neg, pos = labels
+    return _unit_axis(_get_pole_direction(neg), _get_pole_direction(pos))
+
+
+async def _aget_axis_direction(labels: Tuple[str, str]) -> np.ndarray:
+    neg, pos = labels
+    return _unit_axis(await _aget_pole_direction(neg), await _aget_pole_direction(pos))
+
+
+def _online_direction(axis: str) -> Optional[np.ndarray]:
+    """Anchor-learned direction for this axis, if one was trained for its current labels."""
+    learner = state.online_axes.get(axis)
+    if learner is None or not learner.fitted or learner.labels != tuple(state.axis_labels.get(axis, ())):
+        return None
+    return learner.direction
+
+
+def _projection_axes(use_3d: Optional[bool]) -> List[str]:
+    if use_3d is None:
+        use_3d = state.is_3d_mode
+    axes = ['x', 'y']
+    if use_3d and 'z' in state.axis_labels:
+        axes.append('z')
+    return axes
+
+
+# Non-linear layout mode: one projector (and fit cache) for the whole server;
+# each canvas records the key of the fit it uses.
+_umap_projector = UMAPProjector()
+
+
+def _umap_layout():
+    """Fitted UMAP layout of the current canvas when it is in UMAP mode, else None."""
+    if state.projection_mode != "umap" or not state.umap_key:
+        return None
+    return _umap_projector.load(state.umap_key)
+
+
+def _combine_layout(layout_coords: Optional[np.ndarray], linear: Optional[np.ndarray]) -> np.ndarray:
+    """UMAP x/y (when active) followed by any remaining linear axes (z in 3D mode)."""
+    parts = [c for c in (layout_coords, linear) if c is not None]
+    return parts[0] if len(parts) == 1 else np.column_stack(parts)
+
+
 def project_embeddings_to_coordinates(embeddings: np.ndarray, use_3d: bool = None) -> np.ndarray:
     """
     Project embeddings onto semantic axes to get 2D or 3D coordinates.
     Uses current axis labels to create semantic directions.
-    Caches Gemini expansions and axis directions to avoid redundant API calls.
+    Gemini expansions and per-pole directions are cached, so a previously seen
+    axis set costs a single matrix multiply. In UMAP mode x/y come from the
+    canvas' fitted UMAP layout instead.
     """
     if state.axis_builder is None or state.embedder is None:
         raise RuntimeError("Models not initialized")
 
-    if use_3d is None:
-        use_3d = state.is_3d_mode
+    embeddings = np.atleast_2d(embeddings)
+    axes = _projection_axes(use_3d)
+    layout_coords = None
+    layout = _umap_layout()
+    if layout is not None:
+        layout_coords = layout.coords_for(embeddings)[:, :len(axes)]
+        axes = axes[layout_coords.shape[1]:]
+    directions = []
+    for a in axes:
+        learned = _online_direction(a)
+        directions.append(learned if learned is not None else _get_axis_direction(state.axis_labels[a]))
+    linear = embeddings @ np.column_stack(directions) if directions else None
+    return _combine_layout(layout_coords, linear)
+
+
+@traced("projection")
+async def aproject_embeddings_to_coordinates(embeddings: np.ndarray, use_3d: bool = None) -> np.ndarray:
+    """Async project_embeddings_to_coordinates for request handlers (never blocks the loop)."""
+    if state.axis_builder is None or state.embedder is None:
+        raise RuntimeError("Models not initialized")
 
-    # Cache key: axis labels tuple
-    labels_key = (
-        state.axis_labels['x'],
-        state.axis_labels['y'],
-        state.axis_labels.get('z', (None, None)) if use_3d else (None, None),
-    )
-    if state._axis_directions_cache is not None:
-        cache_key, cached = state._axis_directions_cache
-        if cache_key == labels_key:
-            x_dir, y_dir, z_dir = cached
-            x_coords = embeddings @ x_dir
-            y_coords = embeddings @ y_dir
-            if z_dir is not None:
-                z_coords = embeddings @ z_dir
-                coords = np.column_stack([x_coords, y_coords, z_coords])
-            else:
-                coords = np.column_stack([x_coords, y_coords])
-            return coords
-
-    # Build semantic axes (Gemini + embeddings, with cache)
-    x_neg, x_pos = state.axis_labels['x']
-    x_neg_concepts = _get_cached_expansion(x_neg)
-    if x_neg_concepts is None:
-        x_neg_concepts = expand_concept_with_gemini(x_neg, num_expansions=4)
-        _set_cached_expansion(x_neg, x_neg_concepts)
-    x_pos_concepts = _get_cached_expansion(x_pos)
-    if x_pos_concepts is None:
-        x_pos_concepts = expand_concept_with_gemini(x_pos, num_expansions=4)
-        _set_cached_expansion(x_pos, x_pos_concepts)
-
-    x_neg_axis = state.axis_builder.create_ensemble_axis(x_neg_concepts, name=f"ensemble_{x_neg}", positive_concept="neg", negative_concept="neg")
-    x_pos_axis = state.axis_builder.create_ensemble_axis(x_pos_concepts, name=f"ensemble_{x_pos}", positive_concept="pos", negative_concept="neg")
-    x_direction = x_pos_axis.direction - x_neg_axis.direction
-    if np.linalg.norm(x_direction) > 1e-12:
-        x_direction = x_direction / np.linalg.norm(x_direction)
-
-    y_neg, y_pos = state.axis_labels['y']
-    y_neg_concepts = _get_cached_expansion(y_neg)
-    if y_neg_concepts is None:
-        y_neg_concepts = expand_concept_with_gemini(y_neg, num_expansions=4)
-        _set_cached_expansion(y_neg, y_neg_concepts)
-    y_pos_concepts = _get_cached_expansion(y_pos)
-    if y_pos_concepts is None:
-        y_pos_concepts = expand_concept_with_gemini(y_pos, num_expansions=4)
-        _set_cached_expansion(y_pos, y_pos_concepts)
-
-    y_neg_axis = state.axis_builder.create_ensemble_axis(y_neg_concepts, name=f"ensemble_{y_neg}", positive_concept="neg", negative_concept="neg")
-    y_pos_axis = state.axis_builder.create_ensemble_axis(y_pos_concepts, name=f"ensemble_{y_pos}", positive_concept="pos", negative_concept="neg")
-    y_direction = y_pos_axis.direction - y_neg_axis.direction
-    if np.linalg.norm(y_direction) > 1e-12:
-        y_direction = y_direction / np.linalg.norm(y_direction)
-
-    z_direction = None
-    if use_3d and 'z' in state.axis_labels:
-        z_neg, z_pos = state.axis_labels['z']
-        z_neg_concepts = _get_cached_expansion(z_neg)
-        if z_neg_concepts is None:
-            z_neg_concepts = expand_concept_with_gemini(z_neg, num_expansions=4)
-            _set_cached_expansion(z_neg, z_neg_concepts)
-        z_pos_concepts = _get_cached_expansion(z_pos)
-        if z_pos_concepts is None:
-            z_pos_concepts = expand_concept_with_gemini(z_pos, num_expansions=4)
-            _set_cached_expansion(z_pos, z_pos_concepts)
-        z_neg_axis = state.axis_builder.create_ensemble_axis(z_neg_concepts, name=f"ensemble_{z_neg}", positive_concept="neg", negative_concept="neg")
-        z_pos_axis = state.axis_builder.create_ensemble_axis(z_pos_concepts, name=f"ensemble_{z_pos}", positive_concept="pos", negative_concept="neg")
-        z_direction = z_pos_axis.direction - z_neg_axis.direction
-        if np.linalg.norm(z_direction) > 1e-12:
-            z_direction = z_direction / np.linalg.norm(z_direction)
-
-    # Cache directions for reuse
-    state._axis_directions_cache = (labels_key, (x_direction, y_direction, z_direction))
-
-    x_coords = embeddings @ x_direction
-    y_coords = embeddings @ y_direction
-    if z_direction is not None:
-        z_coords = embeddings @ z_direction
-        coords = np.column_stack([x_coords, y_coords, z_coords])
-    else:
-        coords = np.column_stack([x_coords, y_coords])
-    return coords
+    embeddings = np.atleast_2d(embeddings)
+    axes = _projection_axes(use_3d)
+    layout_coords = None
+    layout = await asyncio.to_thread(_umap_layout)
+    if layout is not None:
+        layout_coords = (await asyncio.to_thread(layout.coords_for, embeddings))[:, :len(axes)]
+        axes = axes[layout_coords.shape[1]:]
+    directions = []
+    for a in axes:
+        learned = _online_direction(a)
+        directions.append(learned if learned is not None else await _aget_axis_direction(state.axis_labels[a]))
+    linear = embeddings @ np.column_stack(directions) if directions else None
+    return _combine_layout(layout_coords, linear)
+
+
+# ─── Latest-wins projection work ─────────────────────────────────────────────
+# Axis edits arrive in quick bursts. Each request bumps a per-participant
+# generation for its resource; the older in-flight task is cancelled and its
+# result is discarded. Cancellation only stops the coroutines awaiting it:
+# Gemini/Jina calls already running in worker threads (or shielded
+# single-flight leaders) run to completion, their results just go unused.
+
+PROJECTION_WORK = "projection"  # update-axes, update-axes-tuned, set-3d-mode, reapply-layout, ...
+
+
+class _Superseded(Exception):
+    """Raised to a request whose work was replaced by a newer request."""
+
+
+async def _run_latest(resource: str, work):
+    """Run work() (a coroutine factory) as the latest request for `resource`.
+
+    Returns its result only if no newer request for the same resource has
+    started meanwhile; otherwise raises _Superseded. The caller must apply
+    the result to state without awaiting in between.
+    """
+    gen = state._work_generations.get(resource, 0) + 1
+    state._work_generations[resource] = gen
+    prev = state._inflight_work.get(resource)
+    if prev is not None and not prev.done():
+        prev.cancel()
+    task = asyncio.ensure_future(work())
+    state._inflight_work[resource] = task
+    try:
+        result = await task
+    except asyncio.CancelledError:
+        if state._work_generations.get(resource) != gen:
+            raise _Superseded()
+        raise  # the request itself was cancelled (client went away)
+    finally:
+        if state._inflight_work.get(resource) is task:
+            del state._inflight_work[resource]
+    if state._work_generations.get(resource) != gen:
+        raise _Superseded()
+    return result
+
+
+def _superseded_response() -> dict:
+    return {"status": "superseded", "message": "A newer request replaced this one"}
+
+
+def _apply_coordinates(images: List[ImageMetadata], coords: np.ndarray) -> None:
+    """Store projected coords on a snapshot of images (2D or 3D tuples).
+
+    Work on a snapshot: images added or removed while the projection was
+    awaiting are left alone rather than mis-indexed."""
+    for img_meta, c in zip(images, coords):
+        img_meta.coordinates = tuple(float(v) for v in c)
 
 
 # Grid-based layout parameters
@@ -968,6 +1581,7 @@ def get_semantic_neighbors(metadata: List[ImageMetadata], k: int = 5) -> Dict[in
     # Use cosine similarity (1 - cosine distance) for semantic similarity
     # KNN with cosine metric
     k_actual = min(k + 1, len(metadata))  # +1 because each point is its own nearest neighbor
+    from sklearn.neighbors import NearestNeighbors
     nbrs = NearestNeighbors(n_neighbors=k_actual, metric='cosine').fit(embeddings)
     distances, indices = nbrs.kneighbors(embeddings)
 
@@ -1017,7 +1631,8 @@ def apply_layout_spread(coords: np.ndarray, min_spacing_ratio: float = 0.2,
     # Compute clusters for centripetal attraction
     from sklearn.cluster import KMeans
     k = min(5, max(2, n // 8))
-    km = KMeans(n_clusters=k, random_state=42, n_init=10).fit(result)
+    with OPERATION_LATENCY.time(operation="kmeans"):
+        km = KMeans(n_clusters=k, random_state=42, n_init=10).fit(result)
 
     # Calculate minimum allowed distance in coordinate space
     extent = np.ptp(result, axis=0)
@@ -1066,6 +1681,7 @@ def apply_layout_spread(coords: np.ndarray, min_spacing_ratio: float = 0.2,
     return result
 
 
+@traced("update_clusters")
 def update_clusters():
     """Compute and store cluster centroids and labels for edge bundling."""
     visible = [img for img in state.images_metadata if img.visible]
@@ -1077,7 +1693,8 @@ def update_clusters():
     coords = np.array([img.coordinates for img in visible])
     from sklearn.cluster import KMeans
     k = min(5, max(2, len(visible) // 8))
-    km = KMeans(n_clusters=k, random_state=42, n_init=10).fit(coords)
+    with OPERATION_LATENCY.time(operation="kmeans"):
+        km = KMeans(n_clusters=k, random_state=42, n_init=10).fit(coords)
 
     state.cluster_centroids = km.cluster_centers_.tolist()
     # Map image ID to cluster label
@@ -1092,7 +1709,7 @@ def image_metadata_to_response(img: ImageMetadata, neighbor_map: Optional[Dict[i
     return ImageResponse(
         id=img.id,
         group_id=img.group_id,
-        base64_image=pil_to_base64(img.pil_image),
+        base64_image=base64.b64encode(img.get_png_bytes()).decode(),
         coordinates=img.coordinates,
         parents=img.parents,
         children=img.children,
@@ -1110,6 +1727,7 @@ def image_metadata_to_response(img: ImageMetadata, neighbor_map: Optional[Dict[i
     )
 
 
+@traced("broadcast_state_update")
 async def broadcast_state_update():
     """Broadcast state update to all connected WebSocket clients."""
     if not state.websocket_connections:
@@ -1146,13 +1764,16 @@ async def broadcast_state_update():
         }
     }
 
-    # Send to all connections
-    dead_connections = []
-    for ws in state.websocket_connections:
-        try:
-            await ws.send_json(response)
-        except:
-            dead_connections.append(ws)
+    # Serialize once (same encoding as send_json) and send the text to every connection
+    with OPERATION_LATENCY.time(operation="ws_broadcast"):
+        payload = json.dumps(response, separators=(",", ":"), ensure_ascii=False)
+        BROADCAST_BYTES.observe(len(payload.encode("utf-8")))
+        dead_connections = []
+        for ws in state.websocket_connections:
+            try:
+                await ws.send_text(payload)
+            except:
+                dead_connections.append(ws)
 
     # Remove dead connections
     for ws in dead_connections:
@@ -1182,15 +1803,19 @@ async def health():
 # All fal.ai calls routed through backend so FAL_KEY stays server-side.
 # Uses asyncio.to_thread to avoid blocking the event loop during long generations.
 
+@traced("fal.run")
 def _fal_sync_call(endpoint: str, input_data: dict) -> dict:
     """Blocking HTTP call to fal.ai synchronous endpoint."""
     fal_key = os.getenv("FAL_KEY", "")
-    resp = requests.post(
-        f"https://fal.run/{endpoint}",
-        headers={"Authorization": f"Key {fal_key}", "Content-Type": "application/json"},
-        json=input_data,
-        timeout=180,
-    )
+    _fal_limiter.acquire()
+    with track_call("fal", endpoint):
+        resp = requests.post(
+            _fal_url(endpoint),
+            headers={"Authorization": f"Key {fal_key}", "Content-Type": "application/json"},
+            json=input_data,
+            timeout=180,
+        )
+    _report_fal_status(resp)
     if not resp.ok:
         # Extract fal.ai's error body for readable diagnosis
         try:
@@ -1268,25 +1893,104 @@ async def get_state():
     )
 
 
+# One dispatcher for the whole server: embedding calls from every participant
+# are micro-batched into shared Jina requests (EMBED_BATCH_* env settings).
+_embedding_dispatcher = EmbeddingDispatcher()
+
+
+# Embedders and axis builders hold no per-participant state (the canvas lives in
+# AppState), so one instance per model type serves every participant: they share
+# the HTTP keep-alive pool and the in-memory text-embedding cache instead of each
+# login paying for its own. AXIS_BUILDER_MAX_AXES bounds the axes a shared builder
+# remembers (we never read them back; projection goes through the pole cache).
+AXIS_BUILDER_MAX_AXES = int(os.getenv("AXIS_BUILDER_MAX_AXES", "256"))
+_shared_embedders: Dict[str, CLIPEmbedder] = {}
+_shared_axis_builders: Dict[str, SemanticAxisBuilder] = {}
+_shared_models_lock = threading.Lock()
+
+
 def initialize_embedder(model_type: str = "fashionclip"):
-    """Initialize the appropriate CLIP embedder based on model type."""
-    print(f"🔄 Initializing {model_type} embedder...")
-    if model_type == "huggingface":
-        return HuggingFaceCLIPEmbedder()
-    else:
-        return CLIPEmbedder()
+    """Return the process-wide CLIP embedder for this model type (created on first use)."""
+    with _shared_models_lock:
+        embedder = _shared_embedders.get(model_type)
+        if embedder is None:
+            print(f"🔄 Initializing {model_type} embedder...")
+            if model_type == "huggingface":
+                embedder = HuggingFaceCLIPEmbedder()
+            else:
+                embedder = CLIPEmbedder()
+            embedder.dispatcher = _embedding_dispatcher
+            _shared_embedders[model_type] = embedder
+        return embedder
+
+
+def get_axis_builder(model_type: str = "fashionclip"):
+    """Return the process-wide axis builder bound to the shared embedder for this model type."""
+    embedder = initialize_embedder(model_type)
+    with _shared_models_lock:
+        builder = _shared_axis_builders.get(model_type)
+        if builder is None:
+            builder = SemanticAxisBuilder(embedder, max_axes=AXIS_BUILDER_MAX_AXES)
+            _shared_axis_builders[model_type] = builder
+        return builder
 
 
 def _ensure_embedder():
     """Auto-initialize embedder + axis builder if they were reset (e.g. after server restart)."""
     if state.embedder is None:
-        print("[auto-init] embedder is None — re-initializing after server restart...")
+        print("[auto-init] embedder is None — attaching shared embedder...")
         state.embedder = initialize_embedder(state.clip_model_type)
-        state.axis_builder = SemanticAxisBuilder(state.embedder)
-        state._axis_directions_cache = None
+        state.axis_builder = get_axis_builder(state.clip_model_type)
         print("[auto-init] embedder ready")
 
 
+_GEMINI_IMAGE_TOKENS = 258  # Gemini's fixed per-image token cost
+
+
+def _estimate_gemini_tokens(content) -> int:
+    parts = content if isinstance(content, list) else [content]
+    return sum(len(p) // 4 + 1 if isinstance(p, str) else _GEMINI_IMAGE_TOKENS for p in parts)
+
+
+def _is_gemini_rate_limit(e: Exception) -> bool:
+    return type(e).__name__ in ("ResourceExhausted", "TooManyRequests") or getattr(e, "code", None) == 429
+
+
+@traced("gemini.generate")
+def _gemini_generate(model, content):
+    """model.generate_content behind the shared Gemini limiter (blocking; use from threads)."""
+    _gemini_limiter.acquire(_estimate_gemini_tokens(content))
+    try:
+        with track_call("gemini", getattr(model, "model_name", "unknown")):
+            response = model.generate_content(content)
+    except Exception as e:
+        if _is_gemini_rate_limit(e):
+            _gemini_limiter.report_throttled()
+        raise
+    _gemini_limiter.report_success()
+    return response
+
+
+@traced("gemini.generate")
+async def _agemini_generate(model, content):
+    """Async _gemini_generate: waits on the limiter without blocking the loop and
+    runs the SDK's blocking call on a worker thread."""
+    await _gemini_limiter.aacquire(_estimate_gemini_tokens(content))
+    try:
+        with track_call("gemini", getattr(model, "model_name", "unknown")):
+            response = await asyncio.to_thread(model.generate_content, content)
+    except Exception as e:
+        if _is_gemini_rate_limit(e):
+            _gemini_limiter.report_throttled()
+        raise
+    _gemini_limiter.report_success()
+    return response
+
+
+# Concurrent identical expansions (e.g. double frontend calls) share one Gemini request
+_expansion_flight = SingleFlight("gemini-expand")
+
+
 def expand_concept_with_gemini(concept: str, num_expansions: int = 4) -> List[str]:
     """
     Use Gemini to expand a single concept into multiple visual descriptions.
@@ -1308,6 +2012,11 @@ def expand_concept_with_gemini(concept: str, num_expansions: int = 4) -> List[st
             "gym sneaker with flexible design"
         ]
     """
+    key = (concept, num_expansions)
+    return list(_expansion_flight.do(key, lambda: _expand_concept_with_gemini(concept, num_expansions)))
+
+
+def _expand_concept_with_gemini(concept: str, num_expansions: int) -> List[str]:
     try:
         gemini_model = genai.GenerativeModel("gemini-2.5-flash-lite")
 
@@ -1329,7 +2038,7 @@ Example for "elegant":
 
 Now generate {num_expansions} descriptions for "{concept}":"""
 
-        response = gemini_model.generate_content(prompt)
+        response = _gemini_generate(gemini_model, prompt)
         text = (getattr(response, "text", None) or "").strip()
         # Strip markdown code block if present (Gemini often returns ```json\n[...]\n```)
         if text.startswith("```"):
@@ -1364,24 +2073,28 @@ async def initialize_clip_only():
             print(f"{state.clip_model_type.upper()} loaded successfully")
 
         if state.axis_builder is None:
-            state.axis_builder = SemanticAxisBuilder(state.embedder)
+            state.axis_builder = get_axis_builder(state.clip_model_type)
             print("Axis builder initialized")
 
         # Recalculate and rescale all image positions whenever encoding/axes become available
         if len(state.images_metadata) > 0 and state.axis_builder and state.embedder:
             print("Recalculating positions for existing images...")
-            all_embeddings = np.array([img.embedding for img in state.images_metadata])
-            new_coords = project_embeddings_to_coordinates(all_embeddings, use_3d=state.is_3d_mode)
-            # Grid snapping disabled - using semantic projection directly
-            for i, img_meta in enumerate(state.images_metadata):
-                img_meta.coordinates = tuple(float(c) for c in new_coords[i])
-            update_clusters()  # Update clusters for edge bundling
-            await broadcast_state_update()
-            print("OK: Positions recalculated and rescaled")
+            images = list(state.images_metadata)
+            all_embeddings = np.array([img.embedding for img in images])
+            try:
+                new_coords = await _run_latest(PROJECTION_WORK, lambda: aproject_embeddings_to_coordinates(all_embeddings, use_3d=state.is_3d_mode))
+            except _Superseded:
+                new_coords = None  # a newer projection request owns the positions
+            if new_coords is not None:
+                # Grid snapping disabled - using semantic projection directly
+                _apply_coordinates(images, new_coords)
+                update_clusters()  # Update clusters for edge bundling
+                await broadcast_state_update()
+                print("OK: Positions recalculated and rescaled")
 
         # Open event log file for this session (if not already open)
         if state.event_log_path is None:
-            _open_event_log()
+            await _open_event_log()
 
         return {"status": "success", "message": "CLIP initialized"}
     except Exception as e:
@@ -1414,19 +2127,18 @@ async def update_semantic_axes(request: AxisUpdateRequest):
             print(f"Z: {request.z_negative} -> {request.z_positive}")
             state.axis_labels['z'] = new_z
 
-        # Invalidate axis cache when labels change
-        state._axis_directions_cache = None
-
         # Recalculate positions only if models are initialized and we have images
         if state.axis_builder is not None and state.embedder is not None and len(state.images_metadata) > 0:
             print(f"Recalculating positions for {len(state.images_metadata)} images...")
-            all_embeddings = np.array([img.embedding for img in state.images_metadata])
-            new_coords = project_embeddings_to_coordinates(all_embeddings)
+            images = list(state.images_metadata)
+            all_embeddings = np.array([img.embedding for img in images])
+            try:
+                new_coords = await _run_latest(PROJECTION_WORK, lambda: aproject_embeddings_to_coordinates(all_embeddings))
+            except _Superseded:
+                print(f"[update-axes] superseded by a newer request: {new_x} / {new_y}")
+                return _superseded_response()
             # Grid snapping disabled - using semantic projection directly
-
-            for i, img_meta in enumerate(state.images_metadata):
-                # Store coordinates as tuple (2D or 3D)
-                img_meta.coordinates = tuple(float(c) for c in new_coords[i])
+            _apply_coordinates(images, new_coords)
             update_clusters()  # Update clusters for edge bundling
 
             print(f"OK: All positions recalculated")
@@ -1459,7 +2171,7 @@ async def get_axis_sentences():
                     result[key] = state._gemini_expansion_cache[cache_key]
                 elif label:
                     # Generate on the fly if not cached
-                    concepts = expand_concept_with_gemini(label, num_expansions=4)
+                    concepts = await asyncio.to_thread(expand_concept_with_gemini, label, 4)
                     _set_cached_expansion(label, concepts)
                     result[key] = concepts
                 else:
@@ -1490,30 +2202,45 @@ async def update_axes_tuned(request: TunedAxesRequest):
         print(f"  Image anchors: {len(request.image_anchors)}")
 
         # Build image ID → embedding lookup
+        images = list(state.images_metadata)
         img_embed_map: Dict[int, np.ndarray] = {}
-        for img_meta in state.images_metadata:
+        for img_meta in images:
             img_embed_map[img_meta.id] = img_meta.embedding
+        dim = len(next(iter(img_embed_map.values())))
+
+        async def _tuned_text_directions() -> Dict[str, np.ndarray]:
+            text_dirs = {}
+            for axis in ("x", "y"):
+                neg_key = f"{axis}_negative"
+                pos_key = f"{axis}_positive"
+                neg_sentences = request.custom_sentences.get(neg_key, [])
+                pos_sentences = request.custom_sentences.get(pos_key, [])
+
+                # Text direction (same as standard projection)
+                text_dir = np.zeros(dim)
+                if neg_sentences and pos_sentences:
+                    neg_axis = await state.axis_builder.acreate_ensemble_axis(
+                        neg_sentences, name=f"tuned_{neg_key}", positive_concept="neg", negative_concept="neg"
+                    )
+                    pos_axis = await state.axis_builder.acreate_ensemble_axis(
+                        pos_sentences, name=f"tuned_{pos_key}", positive_concept="pos", negative_concept="neg"
+                    )
+                    text_dir = pos_axis.direction - neg_axis.direction
+                    norm = np.linalg.norm(text_dir)
+                    if norm > 1e-12:
+                        text_dir = text_dir / norm
+                text_dirs[axis] = text_dir
+            return text_dirs
+
+        try:
+            text_dirs = await _run_latest(PROJECTION_WORK, _tuned_text_directions)
+        except _Superseded:
+            print("[update-axes-tuned] superseded by a newer request")
+            return _superseded_response()
 
         directions = {}
         for axis in ("x", "y"):
-            neg_key = f"{axis}_negative"
-            pos_key = f"{axis}_positive"
-            neg_sentences = request.custom_sentences.get(neg_key, [])
-            pos_sentences = request.custom_sentences.get(pos_key, [])
-
-            # Text direction (same as standard projection)
-            text_dir = np.zeros(len(next(iter(img_embed_map.values()))))
-            if neg_sentences and pos_sentences:
-                neg_axis = state.axis_builder.create_ensemble_axis(
-                    neg_sentences, name=f"tuned_{neg_key}", positive_concept="neg", negative_concept="neg"
-                )
-                pos_axis = state.axis_builder.create_ensemble_axis(
-                    pos_sentences, name=f"tuned_{pos_key}", positive_concept="pos", negative_concept="neg"
-                )
-                text_dir = pos_axis.direction - neg_axis.direction
-                norm = np.linalg.norm(text_dir)
-                if norm > 1e-12:
-                    text_dir = text_dir / norm
+            text_dir = text_dirs[axis]
 
             # Image anchor direction
             anchor_dir = np.zeros_like(text_dir)
@@ -1543,12 +2270,8 @@ async def update_axes_tuned(request: TunedAxesRequest):
             print(f"  {axis}: text_norm={np.linalg.norm(text_dir):.3f}, anchor_contrib={np.linalg.norm(anchor_dir):.3f}, n_anchors={len(axis_anchors)}")
 
         # Project all images onto tuned axes
-        all_embeddings = np.array([img.embedding for img in state.images_metadata])
-        x_coords = all_embeddings @ directions["x"]
-        y_coords = all_embeddings @ directions["y"]
-
-        for i, img_meta in enumerate(state.images_metadata):
-            img_meta.coordinates = (float(x_coords[i]), float(y_coords[i]))
+        all_embeddings = np.array([img.embedding for img in images])
+        _apply_coordinates(images, all_embeddings @ np.column_stack([directions["x"], directions["y"]]))
 
         # Update the expansion cache with custom sentences
         for key, sentences in request.custom_sentences.items():
@@ -1559,9 +2282,6 @@ async def update_axes_tuned(request: TunedAxesRequest):
             if label and sentences:
                 _set_cached_expansion(label, sentences)
 
-        # Invalidate direction cache (custom directions don't match standard projection)
-        state._axis_directions_cache = None
-
         update_clusters()
         await broadcast_state_update()
 
@@ -1574,6 +2294,261 @@ async def update_axes_tuned(request: TunedAxesRequest):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+class AxisAnchorRequest(BaseModel):
+    image_id: int
+    axis: str                # "x" | "y" | "z"
+    position: float = 5.0    # 0-10 along the axis (5 = neutral)
+    remove: bool = False     # drop this image's anchor instead
+
+
+@app.post("/api/axis-anchor")
+async def axis_anchor(request: AxisAnchorRequest):
+    """
+    Online supervised axis: pin an image at a position along an axis and update
+    that axis' direction incrementally (SGD partial_fit warm-started from the
+    current direction), then reproject. Meant to be called on every anchor drag.
+    """
+    try:
+        _ensure_embedder()
+        if request.axis not in state.axis_labels:
+            raise HTTPException(status_code=400, detail=f"Unknown axis '{request.axis}'")
+        img = next((m for m in state.images_metadata if m.id == request.image_id), None)
+        if img is None:
+            raise HTTPException(status_code=404, detail=f"Image {request.image_id} not found")
+
+        labels = tuple(state.axis_labels[request.axis])
+        learner = state.online_axes.get(request.axis)
+        if learner is None or learner.labels != labels:
+            # New axis labels start over from the text direction
+            prior = await _aget_axis_direction(labels)
+            learner = state.online_axes[request.axis] = OnlineAxisLearner(labels, prior=prior)
+
+        # partial_fit (and the first sklearn import) run off the loop
+        t0 = time.perf_counter()
+        if request.remove:
+            await asyncio.to_thread(learner.remove_anchor, request.image_id)
+        else:
+            await asyncio.to_thread(learner.add_anchor, request.image_id, img.embedding, request.position)
+        fit_ms = (time.perf_counter() - t0) * 1000
+        if not learner.anchors and state.online_axes.get(request.axis) is learner:
+            del state.online_axes[request.axis]
+
+        # Drags arrive in bursts: only the latest reprojection is applied
+        images = list(state.images_metadata)
+        if images:
+            all_embeddings = np.array([m.embedding for m in images])
+            try:
+                coords = await _run_latest(PROJECTION_WORK, lambda: aproject_embeddings_to_coordinates(all_embeddings))
+            except _Superseded:
+                return _superseded_response()
+            _apply_coordinates(images, coords)
+            update_clusters()
+        await broadcast_state_update()
+
+        return {
+            "status": "success",
+            "axis": request.axis,
+            "anchors": len(learner.anchors),
+            "updates": learner.updates,
+            "fit_ms": round(fit_ms, 2),
+        }
+    except HTTPException:
+        raise
+    except Exception as e:
+        print(f"ERROR in axis anchor update: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.delete("/api/axis-anchors")
+async def reset_axis_anchors(axis: str = ""):
+    """Forget anchor-learned directions (one axis, or all) and go back to the text axes."""
+    if axis:
+        state.online_axes.pop(axis, None)
+    else:
+        state.online_axes = {}
+    images = list(state.images_metadata)
+    if images and state.embedder is not None:
+        all_embeddings = np.array([m.embedding for m in images])
+        try:
+            coords = await _run_latest(PROJECTION_WORK, lambda: aproject_embeddings_to_coordinates(all_embeddings))
+        except _Superseded:
+            return _superseded_response()
+        _apply_coordinates(images, coords)
+        update_clusters()
+    await broadcast_state_update()
+    return {"status": "success", "online_axes": list(state.online_axes)}
+
+
+PCA_COMPONENTS = int(os.getenv("PCA_COMPONENTS", "10"))
+
+
+def _canvas_pca_basis() -> PCABasis:
+    """The current canvas' PCA basis; a canvas or model switch starts a new one."""
+    key = (state.current_canvas_id, state.clip_model_type)
+    if state.pca_basis is None or state.pca_basis.key != key:
+        state.pca_basis = PCABasis(n_components=PCA_COMPONENTS, key=key)
+    return state.pca_basis
+
+
+@app.get("/api/pca-basis")
+async def get_pca_basis(n_extreme: int = 5):
+    """
+    Unsupervised axes of the current canvas: explained variance per principal
+    component plus the most positive / negative images along each. The basis
+    is updated incrementally with images added since the last call.
+    """
+    try:
+        basis = _canvas_pca_basis()
+        images = [m for m in state.images_metadata if m.embedding is not None]
+        items = [(m.id, m.embedding) for m in images]
+        await asyncio.to_thread(basis.sync, items)
+
+        result = basis.explained_variance()
+        if basis.fitted and images and n_extreme > 0:
+            bank = basis.bank()
+            ids = [m.id for m in images]
+            extremes = await asyncio.to_thread(bank.extreme_indices, np.array([m.embedding for m in images]), n_extreme)
+            for comp in result["components"]:
+                top, bottom = extremes[f"pc{comp['index']}"]
+                comp["positive_image_ids"] = [ids[i] for i in reversed(top)]
+                comp["negative_image_ids"] = [ids[i] for i in bottom]
+        return result
+    except Exception as e:
+        print(f"ERROR computing PCA basis: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+class ProjectionModeRequest(BaseModel):
+    mode: str            # "axes" | "umap"
+    refit: bool = False  # umap: fit on the current canvas even if a layout exists
+
+
+@app.get("/api/projection-mode")
+async def get_projection_mode():
+    layout = await asyncio.to_thread(_umap_layout)
+    return {
+        "mode": state.projection_mode,
+        "umap": layout.stats() if layout is not None else None,
+        "projector": _umap_projector.stats(),
+    }
+
+
+@app.post("/api/projection-mode")
+async def set_projection_mode(request: ProjectionModeRequest):
+    """
+    Switch between linear semantic-axis projection and a non-linear UMAP layout.
+    UMAP is fitted on the canvas embeddings (cached in UMAP_CACHE by embedding
+    set); images added later are placed with the fitted model's transform().
+    """
+    if request.mode not in ("axes", "umap"):
+        raise HTTPException(status_code=400, detail="Invalid mode. Must be 'axes' or 'umap'")
+    try:
+        _ensure_embedder()
+        images = list(state.images_metadata)
+        all_embeddings = np.array([m.embedding for m in images]) if images else None
+        fit_ms = None
+
+        if request.mode == "umap":
+            existing = await asyncio.to_thread(_umap_layout) if state.projection_mode == "umap" else None
+            if existing is None or request.refit:
+                if all_embeddings is None:
+                    raise HTTPException(status_code=400, detail="Add images before switching to UMAP")
+                t0 = time.perf_counter()
+                try:
+                    layout = await _run_latest(
+                        PROJECTION_WORK, lambda: asyncio.to_thread(_umap_projector.fit, all_embeddings, request.refit))
+                except _Superseded:
+                    return _superseded_response()
+                except ValueError as e:
+                    raise HTTPException(status_code=400, detail=str(e))
+                fit_ms = round((time.perf_counter() - t0) * 1000, 1)
+                state.umap_key = layout.key
+        state.projection_mode = request.mode
+
+        if images:
+            try:
+                coords = await _run_latest(PROJECTION_WORK, lambda: aproject_embeddings_to_coordinates(all_embeddings))
+            except _Superseded:
+                return _superseded_response()
+            _apply_coordinates(images, coords)
+            update_clusters()
+        await broadcast_state_update()
+        return {"status": "success", "mode": state.projection_mode, "umap_key": state.umap_key,
+                "backend": _umap_projector.backend if request.mode == "umap" else None, "fit_ms": fit_ms}
+    except HTTPException:
+        raise
+    except Exception as e:
+        print(f"ERROR switching projection mode: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+# ─── Dataset nearest-neighbour lookup ─────────────────────────────────────────
+# Real UT-Zappos50K products closest to a canvas image, served from the index
+# built offline by `python -m models.dataset_index build` (memmapped, IVF).
+
+_dataset_index = None
+_dataset_index_lock = threading.Lock()
+
+
+def _get_dataset_index(reload: bool = False):
+    """Open the dataset index once per process; None if it hasn't been built."""
+    global _dataset_index
+    from models.dataset_index import DatasetEmbeddingIndex
+    with _dataset_index_lock:
+        if (_dataset_index is None or reload) and DatasetEmbeddingIndex.exists():
+            _dataset_index = DatasetEmbeddingIndex()
+            print(f"[dataset-index] loaded {_dataset_index.count} rows "
+                  f"({_dataset_index.meta.get('nlist', 'no')} IVF lists, model {_dataset_index.model})")
+        return _dataset_index
+
+
+@app.get("/api/dataset/nearest")
+async def dataset_nearest(image_id: int, k: int = 10, nprobe: int = 0, reload: bool = False):
+    """Top-k real dataset shoes for a canvas image (cosine similarity of embeddings)."""
+    img = next((m for m in state.images_metadata if m.id == image_id), None)
+    if img is None:
+        raise HTTPException(status_code=404, detail=f"Image {image_id} not found")
+    index = await asyncio.to_thread(_get_dataset_index, reload)
+    if index is None:
+        raise HTTPException(status_code=503, detail="Dataset index not built (python -m models.dataset_index build)")
+    model = getattr(state.embedder, "model_name", None)
+    if len(img.embedding) != index.dim or (model and index.model and model != index.model):
+        raise HTTPException(status_code=409, detail=f"Dataset index was built with {index.model} ({index.dim}-d); "
+                                                    f"canvas uses {model} ({len(img.embedding)}-d)")
+
+    from models.dataset_index import DEFAULT_NPROBE
+    k = max(1, min(k, 100))
+    t0 = time.perf_counter()
+    hits = await asyncio.to_thread(index.search, img.embedding, k, nprobe or DEFAULT_NPROBE)
+    elapsed_ms = (time.perf_counter() - t0) * 1000
+    results = []
+    for rank, (row, score) in enumerate(hits):
+        record = index.record(row)
+        results.append({
+            "rank": rank,
+            "score": round(score, 4),
+            "path": record["path"],
+            "category": record.get("category"),
+            "subcategory": record.get("subcategory"),
+            "brand": record.get("brand"),
+            "url": f"/api/dataset/image/{record['path']}",
+        })
+    return {"image_id": image_id, "model": index.model, "elapsed_ms": round(elapsed_ms, 2), "results": results}
+
+
+@app.get("/api/dataset/image/{path:path}")
+async def dataset_image(path: str):
+    """Serve a dataset image referenced by /api/dataset/nearest."""
+    index = await asyncio.to_thread(_get_dataset_index)
+    if index is None:
+        raise HTTPException(status_code=404, detail="Dataset index not built")
+    root = index.images_root.resolve()
+    file_path = (root / path).resolve()
+    if root not in file_path.parents or not file_path.is_file():
+        raise HTTPException(status_code=404, detail="Image not found")
+    return FileResponse(str(file_path))
+
+
 class RefineSentencesRequest(BaseModel):
     sentences: Dict[str, List[str]]  # Current sentences per axis end
     instruction: str  # Natural language instruction for refinement
@@ -1602,7 +2577,7 @@ Rewrite each group of sentences to reflect the user's instruction. Rules:
 Example output:
 {{"x_negative": ["sentence1", "sentence2", "sentence3", "sentence4"], "x_positive": [...]}}"""
 
-        response = gemini_model.generate_content(prompt)
+        response = await _agemini_generate(gemini_model, prompt)
         text = (getattr(response, "text", None) or "").strip()
         if text.startswith("```"):
             text = re.sub(r"^```(?:json)?\s*\n?", "", text)
@@ -1637,13 +2612,14 @@ async def set_3d_mode(use_3d: bool):
         # Recalculate ALL positions with new dimensionality
         if len(state.images_metadata) > 0:
             print(f"Recalculating positions for {len(state.images_metadata)} images in {'3D' if use_3d else '2D'} mode...")
-            all_embeddings = np.array([img.embedding for img in state.images_metadata])
-            new_coords = project_embeddings_to_coordinates(all_embeddings, use_3d=use_3d)
+            images = list(state.images_metadata)
+            all_embeddings = np.array([img.embedding for img in images])
+            try:
+                new_coords = await _run_latest(PROJECTION_WORK, lambda: aproject_embeddings_to_coordinates(all_embeddings, use_3d=use_3d))
+            except _Superseded:
+                return _superseded_response()
             # Grid snapping disabled - using semantic projection directly
-
-            for i, img_meta in enumerate(state.images_metadata):
-                # Store coordinates as tuple (2D or 3D)
-                img_meta.coordinates = tuple(float(c) for c in new_coords[i])
+            _apply_coordinates(images, new_coords)
             update_clusters()  # Update clusters for edge bundling
 
             print(f"OK: All positions recalculated to {'3D' if use_3d else '2D'}")
@@ -1679,18 +2655,20 @@ async def set_clip_model(model_type: str):
         # Reinitialize embedder with new model
         print(f"🔄 Reinitializing embedder from {old_model} to {model_type}...")
         state.embedder = initialize_embedder(model_type)
-        state.axis_builder = SemanticAxisBuilder(state.embedder)
-        state._axis_directions_cache = None  # Invalidate: axes depend on embedder
+        state.axis_builder = get_axis_builder(model_type)
         print(f"✅ Embedder switched to {model_type}")
 
         # Re-project all images with new model
         if len(state.images_metadata) > 0:
             print(f"🔄 Re-projecting {len(state.images_metadata)} images with new model...")
-            all_embeddings = np.array([img.embedding for img in state.images_metadata])
-            new_coords = project_embeddings_to_coordinates(all_embeddings)
+            images = list(state.images_metadata)
+            all_embeddings = np.array([img.embedding for img in images])
+            try:
+                new_coords = await _run_latest(PROJECTION_WORK, lambda: aproject_embeddings_to_coordinates(all_embeddings))
+            except _Superseded:
+                return _superseded_response()
 
-            for i, img_meta in enumerate(state.images_metadata):
-                img_meta.coordinates = tuple(float(c) for c in new_coords[i])
+            _apply_coordinates(images, new_coords)
 
             update_clusters()
             print(f"✅ All positions recalculated with {model_type} model")
@@ -1784,7 +2762,7 @@ Return JSON ONLY (no markdown):
 }}"""
 
         model = genai.GenerativeModel('gemini-2.5-flash-lite')
-        response = model.generate_content(prompt)
+        response = await _agemini_generate(model, prompt)
         text = (getattr(response, "text", None) or "").strip()
         if text.startswith("```"):
             text = text.split("```")[1]
@@ -1849,7 +2827,7 @@ Write as if a designer is describing their shoe concept — specific, evocative,
 
     try:
         model = genai.GenerativeModel('gemini-2.5-flash-lite')
-        response = model.generate_content(prompt)
+        response = await _agemini_generate(model, prompt)
         brief = (getattr(response, "text", None) or "").strip()
         # Persist in state so it's included in future prompts
         state.design_brief = brief
@@ -1990,7 +2968,7 @@ Return JSON ONLY (no markdown):
                 else:
                     print(f"[suggest_tags] WARNING: no image data for id={img.id}, skipping")
 
-            response = model.generate_content(content)
+            response = await _agemini_generate(model, content)
             text = (getattr(response, "text", None) or "").strip()
             if text.startswith("```"):
                 text = text.split("```")[1]
@@ -2135,7 +3113,7 @@ Return JSON ONLY (no markdown):
                     print(f"[suggest_tags] mood-board-reference: WARNING no image data for id={img.id}, skipping")
 
             print(f"[suggest_tags] mood-board-reference: sending {len(content)-1} images to Gemini")
-            response = model.generate_content(content)
+            response = await _agemini_generate(model, content)
             text = (getattr(response, "text", None) or "").strip()
             if text.startswith("```"):
                 text = text.split("```")[1]
@@ -2211,7 +3189,7 @@ Return JSON ONLY (no markdown):
   ]
 }}"""
 
-            response = model.generate_content(prompt_text)
+            response = await _agemini_generate(model, prompt_text)
             text = (getattr(response, "text", None) or "").strip()
             if text.startswith("```"):
                 text = text.split("```")[1]
@@ -2255,7 +3233,7 @@ Return JSON ONLY (no markdown):
   ]
 }}"""
 
-            response = model.generate_content(prompt_text)
+            response = await _agemini_generate(model, prompt_text)
             text = (getattr(response, "text", None) or "").strip()
             if text.startswith("```"):
                 text = text.split("```")[1]
@@ -2333,7 +3311,8 @@ async def rembg_batch(request: RembgBatchRequest):
             buf = BytesIO()
             pil_img.save(buf, format='PNG')
             buf.seek(0)
-            output_bytes = remove_background(buf.getvalue())
+            with span("remove_background"):
+                output_bytes = await asyncio.to_thread(remove_background, buf.getvalue())
 
             result_b64 = base64.b64encode(output_bytes).decode()
             results[key] = result_b64
@@ -2422,7 +3401,7 @@ Return ONLY valid JSON, no markdown fences:
             except Exception as img_err:
                 print(f"[analyze-views] failed to load {vt}: {img_err}")
 
-        response = model.generate_content(content)
+        response = await _agemini_generate(model, content)
         text = (getattr(response, "text", None) or "").strip()
         if text.startswith("```"):
             text = text.split("```")[1]
@@ -2494,7 +3473,7 @@ BAD: "Component: toe cap, Descriptor: pointed" (just listing — not natural lan
 
 Return ONLY the prompt text, no JSON, no quotes, no explanation."""
 
-        response = model.generate_content(prompt)
+        response = await _agemini_generate(model, prompt)
         text = (getattr(response, "text", None) or "").strip().strip('"').strip("'")
         print(f"[compose-edit-prompt] result: {text[:100]}...")
         return {"prompt": text}
@@ -2523,7 +3502,7 @@ Write as a descriptive phrase, not a list.
 Return JSON ONLY: {{"prompt": "..."}}"""
 
         model = genai.GenerativeModel('gemini-2.5-flash-lite')
-        response = model.generate_content(prompt_text)
+        response = await _agemini_generate(model, prompt_text)
         text = (getattr(response, "text", None) or "").strip()
         if text.startswith("```"):
             text = text.split("```")[1]
@@ -2664,9 +3643,9 @@ Return JSON ONLY (no markdown): {{"prompt": "..."}}"""
                     content.append(resized)
                 except Exception:
                     pass
-            response = model.generate_content(content)
+            response = await _agemini_generate(model, content)
         else:
-            response = model.generate_content(prompt_text)
+            response = await _agemini_generate(model, prompt_text)
 
         text = (getattr(response, "text", None) or "").strip()
         if text.startswith("```"):
@@ -2716,6 +3695,9 @@ async def clear_canvas():
     """Clear all images."""
     state.images_metadata = []
     state.history_groups = []
+    state.online_axes = {}
+    state.pca_basis = None
+    state.projection_mode, state.umap_key = "axes", None
     state.next_id = 0
 
     await broadcast_state_update()
@@ -2732,11 +3714,14 @@ async def reapply_layout():
             return {"status": "success", "message": "Nothing to spread"}
 
         print("Reapplying pure CLIP semantic projection...")
-        all_embeddings = np.array([img.embedding for img in state.images_metadata])
-        new_coords = project_embeddings_to_coordinates(all_embeddings, use_3d=state.is_3d_mode)
+        images = list(state.images_metadata)
+        all_embeddings = np.array([img.embedding for img in images])
+        try:
+            new_coords = await _run_latest(PROJECTION_WORK, lambda: aproject_embeddings_to_coordinates(all_embeddings, use_3d=state.is_3d_mode))
+        except _Superseded:
+            return _superseded_response()
         # Pure CLIP projection - no grid, physics, or collision
-        for i, img_meta in enumerate(state.images_metadata):
-            img_meta.coordinates = tuple(float(c) for c in new_coords[i])
+        _apply_coordinates(images, new_coords)
         update_clusters()  # Update clusters for edge bundling
         print("OK: Pure semantic layout applied")
         await broadcast_state_update()
@@ -2794,8 +3779,10 @@ async def add_external_images(request: AddExternalImagesRequest):
                         raise ValueError("Invalid data URL format: missing comma separator")
 
                     header, encoded = url.split(',', 1)
-                    img_bytes = base64.b64decode(encoded)
-                    img = Image.open(BytesIO(img_bytes))
+                    with span("decode", index=i, bytes=len(encoded)):
+                        img_bytes = base64.b64decode(encoded)
+                        img = Image.open(BytesIO(img_bytes))
+                        img.load()
                     print(f"  [OK] Image {i+1} decoded (size: {img.size})")
                 except Exception as e:
                     print(f"  [ERROR] decoding data URL: {e}")
@@ -2803,9 +3790,12 @@ async def add_external_images(request: AddExternalImagesRequest):
             elif is_http_url:
                 print(f"  Downloading from HTTP URL: {url[:50]}...")
                 try:
-                    response = requests.get(url, timeout=30)
+                    with span("download", index=i), track_call("image_download", "external_image"):
+                        response = await asyncio.to_thread(requests.get, url, timeout=30)
                     response.raise_for_status()
-                    img = Image.open(BytesIO(response.content))
+                    with span("decode", index=i, bytes=len(response.content)):
+                        img = Image.open(BytesIO(response.content))
+                        img.load()
                     print(f"  [OK] Image {i+1} downloaded (size: {img.size})")
                 except Exception as e:
                     print(f"  [ERROR] downloading: {e}")
@@ -2823,7 +3813,8 @@ async def add_external_images(request: AddExternalImagesRequest):
                 img.save(img_bytes, format='PNG')
                 img_bytes.seek(0)
 
-                output_bytes = remove_background(img_bytes.getvalue())
+                with span("remove_background", index=i):
+                    output_bytes = await asyncio.to_thread(remove_background, img_bytes.getvalue())
 
                 img = Image.open(BytesIO(output_bytes))
                 if img.mode != 'RGBA':
@@ -2839,10 +3830,17 @@ async def add_external_images(request: AddExternalImagesRequest):
 
         # Extract embeddings
         print("Extracting CLIP embeddings...")
-        embeddings = state.embedder.extract_image_embeddings_from_pil(pil_images)
+        embeddings = await state.embedder.aextract_image_embeddings_from_pil(pil_images)
         print("OK: Embeddings extracted")
 
-        # Create ImageMetadata objects (placeholder coords; we reproject all below)
+        # Project new images onto current axes before touching state, so other
+        # requests never observe them at placeholder coordinates
+        new_coords = None
+        if not (request.precomputed_coordinates and len(request.precomputed_coordinates) >= 2):
+            print("Projecting new images onto axes...")
+            new_coords = await aproject_embeddings_to_coordinates(embeddings, use_3d=state.is_3d_mode)
+
+        # Create ImageMetadata objects (placeholder coords; assigned below)
         group_id = f"{request.generation_method}_{len(state.history_groups)}"
         new_metadata = []
 
@@ -2852,7 +3850,7 @@ async def add_external_images(request: AddExternalImagesRequest):
                 group_id=group_id,
                 pil_image=img,
                 embedding=emb,
-                coordinates=(0.0, 0.0),  # Placeholder; reprojected below
+                coordinates=(0.0, 0.0),  # Placeholder; assigned below
                 parents=request.parent_ids.copy(),  # Set parent relationships
                 children=[],
                 generation_method=request.generation_method,
@@ -2878,8 +3876,6 @@ async def add_external_images(request: AddExternalImagesRequest):
                     img_meta.coordinates = coords_tuple
                 print(f"OK: Using precomputed coordinates {coords_tuple}")
             else:
-                print("Projecting new images onto axes...")
-                new_coords = project_embeddings_to_coordinates(embeddings, use_3d=state.is_3d_mode)
                 for i, img_meta in enumerate(new_metadata):
                     img_meta.coordinates = tuple(float(c) for c in new_coords[i])
                 print("OK: New positions assigned")
@@ -2970,7 +3966,8 @@ async def get_canvas_digest():
         # Quick clustering (k=3-5)
         from sklearn.cluster import KMeans
         k = min(5, max(3, len(visible) // 10))
-        km = KMeans(n_clusters=k, random_state=42, n_init=10).fit(coords)
+        with OPERATION_LATENCY.time(operation="kmeans"):
+            km = KMeans(n_clusters=k, random_state=42, n_init=10).fit(coords)
 
         clusters = []
         for i in range(k):
@@ -3130,7 +4127,7 @@ Return JSON ONLY (no markdown):
 }}"""
 
         model = genai.GenerativeModel('gemini-2.5-flash-lite')
-        response = model.generate_content(prompt)
+        response = await _agemini_generate(model, prompt)
 
         json_match = re.search(r'\{[\s\S]*\}', response.text)
         if json_match:
@@ -3247,7 +4244,7 @@ Return JSON ONLY (no markdown, no code blocks):
 Remember: EVERY x_axis and y_axis value MUST contain " - " (space-dash-space)."""
 
         model = genai.GenerativeModel('gemini-2.5-flash-lite')
-        response = model.generate_content(prompt)
+        response = await _agemini_generate(model, prompt)
 
         # Common semantic opposites for shoe design
         OPPOSITES = {
@@ -3593,7 +4590,7 @@ Be bold and specific. Push into corners of the design space that are visually em
             except Exception:
                 pass
 
-        response = model.generate_content(ghosts_content)
+        response = await _agemini_generate(model, ghosts_content)
         text = response.text.strip()
 
         # Parse JSON from response
@@ -3638,6 +4635,61 @@ Be bold and specific. Push into corners of the design space that are visually em
         return {"ghosts": []}
 
 
+# Same ghost URL requested concurrently (e.g. by two agent hooks) → one download/rembg/embed
+_ghost_flight = AsyncSingleFlight("embed-ghost")
+
+
+async def _load_ghost_image(image_url: str) -> Tuple[np.ndarray, str]:
+    """Load, background-remove and embed a ghost image. Participant-independent.
+
+    Returns (embedding, PNG data URL)."""
+    # Load image from data URL or HTTP URL
+    if image_url.startswith("data:"):
+        if "," not in image_url:
+            raise HTTPException(status_code=400, detail="Invalid data URL")
+        _, encoded = image_url.split(",", 1)
+        with span("decode", bytes=len(encoded)):
+            img_bytes = base64.b64decode(encoded)
+            img = Image.open(BytesIO(img_bytes))
+            img.load()
+    elif image_url.startswith("http://") or image_url.startswith("https://"):
+        with span("download"), track_call("image_download", "ghost_image"):
+            resp = await asyncio.to_thread(requests.get, image_url, timeout=30)
+        resp.raise_for_status()
+        with span("decode", bytes=len(resp.content)):
+            img = Image.open(BytesIO(resp.content))
+            img.load()
+    else:
+        raise HTTPException(status_code=400, detail="Unsupported URL format")
+
+    # Normalize to RGB for CLIP embedding
+    if img.mode not in ("RGB", "RGBA"):
+        img = img.convert("RGB")
+
+    # Remove background so ghost shoes show transparent, like user-generated shoes
+    try:
+        img_bytes_in = BytesIO()
+        img.convert("RGB").save(img_bytes_in, format="PNG")
+        with span("remove_background"):
+            img_bytes_out = await asyncio.to_thread(remove_background, img_bytes_in.getvalue())
+        img = Image.open(BytesIO(img_bytes_out)).convert("RGBA")
+        print(f"  [OK] Background removed from ghost image")
+    except Exception as rembg_err:
+        print(f"  [WARN] rembg failed for ghost ({rembg_err}), keeping original")
+        img = img.convert("RGBA")  # ensure RGBA even without removal
+
+    # Embed via CLIP using RGB version
+    img_rgb = img.convert("RGB")
+    embeddings = await state.embedder.aextract_image_embeddings_from_pil([img_rgb])
+    emb = np.array(embeddings[0])
+
+    # Encode as PNG to preserve transparency
+    buf = BytesIO()
+    img.save(buf, format="PNG")
+    base64_image = "data:image/png;base64," + base64.b64encode(buf.getvalue()).decode()
+    return emb, base64_image
+
+
 @app.post("/api/embed-ghost")
 async def embed_ghost_image(request: Request):
     """Embed an image and compute CLIP coordinates WITHOUT adding it to the canvas.
@@ -3652,49 +4704,14 @@ async def embed_ghost_image(request: Request):
 
         _ensure_embedder()
 
-        # Load image from data URL or HTTP URL
-        if image_url.startswith("data:"):
-            if "," not in image_url:
-                raise HTTPException(status_code=400, detail="Invalid data URL")
-            _, encoded = image_url.split(",", 1)
-            img_bytes = base64.b64decode(encoded)
-            img = Image.open(BytesIO(img_bytes))
-        elif image_url.startswith("http://") or image_url.startswith("https://"):
-            resp = requests.get(image_url, timeout=30)
-            resp.raise_for_status()
-            img = Image.open(BytesIO(resp.content))
-        else:
-            raise HTTPException(status_code=400, detail="Unsupported URL format")
-
-        # Normalize to RGB for CLIP embedding
-        if img.mode not in ("RGB", "RGBA"):
-            img = img.convert("RGB")
+        model = getattr(state.embedder, "model_name", type(state.embedder).__name__)
+        key = (model, hashlib.sha1(image_url.encode()).hexdigest())
+        emb, base64_image = await _ghost_flight.do(key, lambda: _load_ghost_image(image_url))
 
-        # Remove background so ghost shoes show transparent, like user-generated shoes
-        try:
-            img_bytes_in = BytesIO()
-            img.convert("RGB").save(img_bytes_in, format="PNG")
-            img_bytes_out = remove_background(img_bytes_in.getvalue())
-            img = Image.open(BytesIO(img_bytes_out)).convert("RGBA")
-            print(f"  [OK] Background removed from ghost image")
-        except Exception as rembg_err:
-            print(f"  [WARN] rembg failed for ghost ({rembg_err}), keeping original")
-            img = img.convert("RGBA")  # ensure RGBA even without removal
-
-        # Embed via CLIP using RGB version
-        img_rgb = img.convert("RGB")
-        embeddings = state.embedder.extract_image_embeddings_from_pil([img_rgb])
-        emb = np.array(embeddings[0])
-
-        # Project to 2D coordinates using current axes (no state mutation)
-        coords = project_embeddings_to_coordinates(emb.reshape(1, -1), use_3d=False)
+        # Project to 2D coordinates using this participant's axes (no state mutation)
+        coords = await aproject_embeddings_to_coordinates(emb.reshape(1, -1), use_3d=False)
         x, y = float(coords[0][0]), float(coords[0][1])
 
-        # Encode as PNG to preserve transparency
-        buf = BytesIO()
-        img.save(buf, format="PNG")
-        base64_image = "data:image/png;base64," + base64.b64encode(buf.getvalue()).decode()
-
         return {"base64_image": base64_image, "coordinates": [x, y]}
 
     except HTTPException:
@@ -3729,7 +4746,7 @@ async def concurrent_ghost_prompt(request: ConcurrentPromptRequest):
                 "reasoning": "Exploring an adjacent design direction"
             }
 
-        genai.configure(api_key=gemini_api_key)
+        genai.configure(api_key=gemini_api_key, **_GENAI_CLIENT_OPTS)
 
         # Build brief + structured fields section
         brief_section = ""
@@ -3825,7 +4842,7 @@ key_shifts should be 2-3 concise contrasts like "leather → mesh" or "muted →
                 content.append(grid_img)
             except Exception:
                 pass
-        response = model.generate_content(content)
+        response = await _agemini_generate(model, content)
         text = response.text.strip()
 
         # Strip markdown if present
@@ -3863,7 +4880,7 @@ async def sync_layers(request: Request):
     return {"status": "ok"}
 
 
-def _import_from_zip(zf: "zipfile.ZipFile") -> dict:
+def _read_zip(zf: "zipfile.ZipFile") -> dict:
     """Shared ZIP import logic — supports new unified format and legacy format.
 
     New format (canvas.json present):
@@ -3874,9 +4891,9 @@ def _import_from_zip(zf: "zipfile.ZipFile") -> dict:
       - export_summary.json  — canvas-level metadata
       - img_*.png / img_*.json — per-image pixel + metadata pairs
 
-    Returns dict with keys: images_loaded, groups_loaded, design_brief.
+    Runs in a worker thread and doesn't touch AppState; _apply_zip_import()
+    assigns the result on the event loop.
     """
-    import io as _io
     from models.data_structures import HistoryGroup
 
     namelist = zf.namelist()
@@ -3885,36 +4902,20 @@ def _import_from_zip(zf: "zipfile.ZipFile") -> dict:
     if "canvas.json" in namelist:
         print("[import] Unified canvas.json format detected")
         data = json.loads(zf.read("canvas.json"))
-        # Replace filename references with inline base64 so _deserialize_canvas works unchanged
+        member_names = set(namelist)
         valid_images = []
         for img_data in data.get("images", []):
             fname = img_data.get("filename", "")
-            if fname and fname in namelist:
-                png_bytes = zf.read(fname)
-                img_data["base64_image"] = (
-                    "data:image/png;base64," + base64.b64encode(png_bytes).decode()
-                )
+            if fname and fname in member_names:
                 valid_images.append(img_data)
             else:
                 print(f"  [WARN] PNG '{fname}' not found in ZIP, skipping image {img_data.get('id')}")
         data["images"] = valid_images
-        # Layer state lives outside _deserialize_canvas — restore it first
-        state.layer_definitions = data.get("layerDefinitions", state.layer_definitions)
-        state.image_layer_map = {int(k): v for k, v in data.get("imageLayerMap", {}).items()}
-        _deserialize_canvas(data)
-        # Re-project coordinates using restored axis labels if models are ready
-        if state.images_metadata and state.embedder and state.axis_builder:
-            state._axis_directions_cache = None
-            emb_matrix = np.array([img.embedding for img in state.images_metadata])
-            new_coords = project_embeddings_to_coordinates(emb_matrix, use_3d=False)
-            for i, img in enumerate(state.images_metadata):
-                img.coordinates = (float(new_coords[i][0]), float(new_coords[i][1]))
-        print(f"[OK] Import (canvas.json): {len(state.images_metadata)} images, {len(state.history_groups)} groups")
-        return {
-            "images_loaded": len(state.images_metadata),
-            "groups_loaded": len(state.history_groups),
-            "design_brief": state.design_brief,
-        }
+        # An export without a layer map clears the current one
+        data.setdefault("imageLayerMap", {})
+        # PNGs are read straight from the ZIP members (no base64 round-trip)
+        canvas = _read_canvas(data, image_loader=lambda img_data: zf.read(img_data["filename"]))
+        return {"format": "canvas", "canvas": canvas}
 
     # ── Legacy format ─────────────────────────────────────────────────────────
     if "export_summary.json" not in namelist:
@@ -3925,33 +4926,35 @@ def _import_from_zip(zf: "zipfile.ZipFile") -> dict:
 
     axis_raw = summary.get("axis_labels", {})
     new_axis_labels = {k: tuple(v) if isinstance(v, list) else v for k, v in axis_raw.items()}
-    if not new_axis_labels:
-        new_axis_labels = state.axis_labels
 
     history_groups_raw = summary.get("history_groups", [])
-    layer_defs = summary.get("layer_definitions", state.layer_definitions)
+    layer_defs = summary.get("layer_definitions")
     img_layer_map_raw = summary.get("image_layer_map", {})
     design_brief = summary.get("design_brief", None)
 
     # Build index of per-image JSON/PNG pairs
-    png_map: Dict[str, bytes] = {}
+    png_names: Dict[str, str] = {}
     json_map: Dict[str, dict] = {}
     for name in namelist:
         stem, ext = name.rsplit(".", 1) if "." in name else (name, "")
         if ext.lower() == "png" and stem.startswith("img_"):
-            png_map[stem] = zf.read(name)
+            png_names[stem] = name
         elif ext.lower() == "json" and stem.startswith("img_"):
             json_map[stem] = json.loads(zf.read(name))
 
-    new_images: List[ImageMetadata] = []
-    max_id = 0
+    pairs = []
     for stem, meta in json_map.items():
-        if stem not in png_map:
+        if stem not in png_names:
             print(f"  [WARN] No PNG for {stem}, skipping")
             continue
+        pairs.append((meta, zf.read(png_names[stem])))
+    pil_images = list(_png_pool.map(_decode_png, [png for _, png in pairs]))
+
+    new_images: List[ImageMetadata] = []
+    max_id = 0
+    for (meta, png_bytes), pil_img in zip(pairs, pil_images):
         img_id = meta.get("id", 0)
         max_id = max(max_id, img_id)
-        pil_img = Image.open(_io.BytesIO(png_map[stem])).convert("RGBA")
         embedding_list = meta.get("embedding", None)
         embedding = np.array(embedding_list, dtype=np.float32) if embedding_list else np.zeros(1024, dtype=np.float32)
         try:
@@ -3980,20 +4983,11 @@ def _import_from_zip(zf: "zipfile.ZipFile") -> dict:
             shoe_view=meta.get("shoe_view", "side"),
             parent_side_id=meta.get("parent_side_id", -1),
         ))
+        new_images[-1]._cached_png = png_bytes
 
     if not new_images:
         raise HTTPException(status_code=400, detail="No valid images found in ZIP")
 
-    if state.embedder and state.axis_builder:
-        state.axis_labels = new_axis_labels
-        state._axis_directions_cache = None
-        emb_matrix = np.array([img.embedding for img in new_images])
-        new_coords = project_embeddings_to_coordinates(emb_matrix, use_3d=False)
-        for i, img in enumerate(new_images):
-            img.coordinates = (float(new_coords[i][0]), float(new_coords[i][1]))
-    else:
-        state.axis_labels = new_axis_labels
-
     new_history: List[HistoryGroup] = []
     for hg in history_groups_raw:
         try:
@@ -4010,18 +5004,60 @@ def _import_from_zip(zf: "zipfile.ZipFile") -> dict:
             timestamp=ts_hg,
         ))
 
-    state.images_metadata = sorted(new_images, key=lambda x: x.id)
-    state.history_groups = new_history
-    state.next_id = max_id + 1
-    state.image_layer_map = {int(k): v for k, v in img_layer_map_raw.items()}
-    state.layer_definitions = layer_defs
-    if design_brief is not None:
-        state.design_brief = design_brief
+    return {
+        "format": "legacy",
+        "axis_labels": new_axis_labels,
+        "images": sorted(new_images, key=lambda x: x.id),
+        "history_groups": new_history,
+        "next_id": max_id + 1,
+        "image_layer_map": {int(k): v for k, v in img_layer_map_raw.items()},
+        "layer_definitions": layer_defs,
+        "design_brief": design_brief,
+    }
+
+
+def _apply_zip_import(imported: dict) -> None:
+    """Assign a _read_zip() result to AppState (event loop, no awaits)."""
+    if imported["format"] == "canvas":
+        _apply_canvas(imported["canvas"])
+        print(f"[OK] Import (canvas.json): {len(state.images_metadata)} images, {len(state.history_groups)} groups")
+        return
+
+    if imported["axis_labels"]:
+        state.axis_labels = imported["axis_labels"]
+    state.images_metadata = imported["images"]
+    state.history_groups = imported["history_groups"]
+    state.next_id = imported["next_id"]
+    state.image_layer_map = imported["image_layer_map"]
+    if imported["layer_definitions"] is not None:
+        state.layer_definitions = imported["layer_definitions"]
+    if imported["design_brief"] is not None:
+        state.design_brief = imported["design_brief"]
+    print(f"[OK] Import (legacy): {len(state.images_metadata)} images, {len(state.history_groups)} groups")
+
+
+_UPLOAD_COPY_CHUNK = 1024 * 1024
+
+
+def _read_zip_file(fileobj) -> dict:
+    """Open a seekable ZIP file object and read it (runs in a worker thread)."""
+    fileobj.seek(0)
+    with zipfile.ZipFile(fileobj) as zf:
+        return _read_zip(zf)
+
 
-    print(f"[OK] Import (legacy): {len(new_images)} images, {len(new_history)} groups")
+async def _import_zip_file(fileobj) -> dict:
+    """Import a ZIP export: read and decode off the loop, then assign state on it.
+
+    Returns dict with keys: images_loaded, groups_loaded, design_brief.
+    """
+    imported = await asyncio.to_thread(_read_zip_file, fileobj)
+    _apply_zip_import(imported)
+    # Imports are laid out in 2D with the restored axis labels
+    await _reproject_restored(use_3d=False)
     return {
-        "images_loaded": len(new_images),
-        "groups_loaded": len(new_history),
+        "images_loaded": len(state.images_metadata),
+        "groups_loaded": len(state.history_groups),
         "design_brief": state.design_brief,
     }
 
@@ -4033,12 +5069,14 @@ async def import_zip_canvas(file: UploadFile = File(...)):
     Supports two formats:
     - New unified format: canvas.json + img_*.png
     - Legacy format: export_summary.json + img_*.png + img_*.json
+
+    The upload is spooled to a temp file (never held in memory as a whole) and
+    the import runs off the event loop.
     """
-    import io as _io
     try:
-        zip_bytes = await file.read()
-        with zipfile.ZipFile(_io.BytesIO(zip_bytes)) as zf:
-            result = _import_from_zip(zf)
+        with tempfile.TemporaryFile(suffix=".zip") as tmp:
+            await asyncio.to_thread(shutil.copyfileobj, file.file, tmp, _UPLOAD_COPY_CHUNK)
+            result = await _import_zip_file(tmp)
         await broadcast_state_update()
         return {"status": "ok", **result}
     except HTTPException:
@@ -4057,7 +5095,6 @@ async def import_starter_canvas():
     Checks for template.json first (plain JSON, preferred), then falls back
     to starter.zip. Returns 404 if neither exists (graceful fallback).
     """
-    import io as _io
     starter_dir = Path(__file__).parent / "data" / "starter"
 
     # Preferred: plain JSON template (saved via /api/sessions/save-as-template)
@@ -4065,11 +5102,11 @@ async def import_starter_canvas():
     if template_path.exists():
         try:
             data = json.loads(template_path.read_text(encoding="utf-8"))
-            _deserialize_canvas(data)
             # Assign fresh canvas ID so the template isn't overwritten on save
-            state.current_canvas_id = str(_uuid.uuid4())
-            state.event_log = []  # clean slate
-            _open_event_log()
+            data["id"] = str(_uuid.uuid4())
+            data["eventLog"] = []  # clean slate
+            await _deserialize_canvas(data)
+            await _open_event_log()
             await broadcast_state_update()
             return {
                 "status": "ok",
@@ -4088,9 +5125,8 @@ async def import_starter_canvas():
     if not starter_path.exists():
         raise HTTPException(status_code=404, detail="No onboarding template found")
     try:
-        zip_bytes = starter_path.read_bytes()
-        with zipfile.ZipFile(_io.BytesIO(zip_bytes)) as zf:
-            result = _import_from_zip(zf)
+        with open(starter_path, "rb") as fh:
+            result = await _import_zip_file(fh)
         await broadcast_state_update()
         return {"status": "ok", **result}
     except HTTPException:
@@ -4125,10 +5161,219 @@ async def save_as_template():
         raise HTTPException(status_code=500, detail=str(e))
 
 
+class _ChunkSink:
+    """Write-only buffer for zipfile; drained after each member so bytes stream out.
+
+    tell() without seek() makes zipfile write in streaming mode.
+    """
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+        self._pos = 0
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        self._pos += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._pos
+
+    def flush(self) -> None:
+        pass
+
+    def drain(self) -> bytes:
+        out = b"".join(self._chunks)
+        self._chunks = []
+        return out
+
+
+def _export_filename(img_meta: ImageMetadata) -> str:
+    """Timestamp-based filename stem shared by the PNG, its JSON and canvas.json."""
+    timestamp_str = img_meta.timestamp.strftime("%Y%m%d_%H%M%S_%f")[:-3]  # Remove last 3 digits of microseconds
+    return f"img_{img_meta.id}_{timestamp_str}"
+
+
+def _export_legacy_metadata(img_meta: ImageMetadata) -> dict:
+    """Legacy per-image metadata JSON (kept for backward compat with old importers)."""
+    return {
+        "id": img_meta.id,
+        "group_id": img_meta.group_id,
+        "prompt": img_meta.prompt,
+        "generation_method": img_meta.generation_method,
+        "timestamp": img_meta.timestamp.isoformat(),
+        "coordinates": list(img_meta.coordinates),
+        "parents": img_meta.parents,
+        "children": img_meta.children,
+        "reference_ids": img_meta.reference_ids,
+        "visible": img_meta.visible,
+        "is_ghost": img_meta.is_ghost,
+        "suggested_prompt": img_meta.suggested_prompt,
+        "reasoning": img_meta.reasoning,
+        "embedding": img_meta.embedding.tolist(),
+    }
+
+
+def _build_export_documents(visible_images: List[ImageMetadata]) -> List[Tuple[str, bytes]]:
+    """Build canvas.json and export_summary.json from the current state (request context)."""
+    # Build generation sequence map: image_id -> (group_index, position_in_group)
+    gen_sequence: Dict[int, Dict] = {}
+    for g_idx, g in enumerate(state.history_groups):
+        for pos, img_id in enumerate(g.image_ids):
+            gen_sequence[img_id] = {
+                "group_index": g_idx,
+                "position_in_group": pos,
+                "group_id": g.id,
+                "group_type": g.type,
+                "group_prompt": g.prompt,
+                "group_timestamp": g.timestamp.isoformat(),
+            }
+
+    # ── Unified canvas.json (mirrors local save format, filename ref instead of base64) ──
+    canvas_images_data = []
+    for img_meta in visible_images:
+        canvas_images_data.append({
+            "id": img_meta.id,
+            "group_id": img_meta.group_id,
+            "filename": f"{_export_filename(img_meta)}.png",  # PNG in same ZIP, no base64 here
+            "embedding": img_meta.embedding.tolist(),
+            "coordinates": [float(x) for x in img_meta.coordinates],
+            "parents": img_meta.parents,
+            "children": img_meta.children,
+            "reference_ids": img_meta.reference_ids,
+            "generation_method": img_meta.generation_method,
+            "prompt": img_meta.prompt,
+            "timestamp": img_meta.timestamp.isoformat(),
+            "visible": img_meta.visible,
+            "is_ghost": img_meta.is_ghost,
+            "suggested_prompt": img_meta.suggested_prompt,
+            "reasoning": img_meta.reasoning,
+            "realm": getattr(img_meta, 'realm', 'shoe'),
+            "shoe_view": getattr(img_meta, 'shoe_view', 'side'),
+            "parent_side_id": getattr(img_meta, 'parent_side_id', -1),
+        })
+    canvas_history_data = []
+    for hg in state.history_groups:
+        ts = hg.timestamp.isoformat() if isinstance(hg.timestamp, datetime) else str(hg.timestamp)
+        canvas_history_data.append({
+            "id": hg.id,
+            "type": hg.type,
+            "image_ids": hg.image_ids,
+            "prompt": hg.prompt,
+            "visible": hg.visible,
+            "thumbnail_id": hg.thumbnail_id,
+            "timestamp": ts,
+        })
+    canvas_doc = {
+        "id": state.current_canvas_id,
+        "name": state.canvas_name,
+        "participantId": state.participant_id,
+        "createdAt": state.canvas_created_at,
+        "updatedAt": datetime.now().isoformat(),
+        "parentCanvasId": state.parent_canvas_id,
+        "sharedImageIds": state.shared_image_ids,
+        "axisLabels": {k: list(v) for k, v in state.axis_labels.items()},
+        "onlineAxes": {axis: learner.to_dict() for axis, learner in state.online_axes.items()},
+        "projectionMode": state.projection_mode,
+        "umapModel": state.umap_key,
+        "designBrief": state.design_brief,
+        "briefFields": state.brief_fields,
+        "briefInterpretation": state.brief_interpretation,
+        "briefSuggestedParams": state.brief_suggested_params,
+        "briefHighlights": state.brief_highlights,
+        "nextId": state.next_id,
+        "layerDefinitions": state.layer_definitions,
+        "imageLayerMap": {str(k): v for k, v in state.image_layer_map.items()},
+        "images": canvas_images_data,
+        "historyGroups": canvas_history_data,
+        "eventLog": list(state.event_log),
+    }
+
+    # ── Legacy export_summary.json (kept for old importers / human inspection) ──
+    summary = {
+        "export_timestamp": datetime.now().isoformat(),
+        "total_images": len(visible_images),
+        "axis_labels": {k: list(v) for k, v in state.axis_labels.items()},
+        "is_3d_mode": state.is_3d_mode,
+        "design_brief": state.design_brief,
+        "layer_definitions": state.layer_definitions,
+        "image_layer_map": {str(k): v for k, v in state.image_layer_map.items()},
+        "history_groups": [
+            {
+                "id": g.id,
+                "type": g.type,
+                "image_ids": g.image_ids,
+                "prompt": g.prompt,
+                "visible": g.visible,
+                "timestamp": g.timestamp.isoformat(),
+                "thumbnail_id": g.thumbnail_id,
+            }
+            for g in state.history_groups
+        ],
+        "images": [
+            {
+                "id": img.id,
+                "filename": f"{_export_filename(img)}.png",
+                "prompt": img.prompt,
+                "generation_method": img.generation_method,
+                "timestamp": img.timestamp.isoformat(),
+                "coordinates": list(img.coordinates),
+                "parents": img.parents,
+                "children": img.children,
+                "reference_ids": img.reference_ids,
+                "layer_id": state.image_layer_map.get(img.id, "default"),
+                **gen_sequence.get(img.id, {"group_index": -1, "position_in_group": -1, "group_id": None, "group_type": None, "group_prompt": None, "group_timestamp": None}),
+            }
+            for img in state.images_metadata if img.visible
+        ]
+    }
+    return [
+        ("canvas.json", json.dumps(canvas_doc, ensure_ascii=False, cls=_NumpyEncoder).encode("utf-8")),
+        ("export_summary.json", json.dumps(summary, indent=2, ensure_ascii=False).encode("utf-8")),
+    ]
+
+
+async def _stream_export_zip(visible_images: List[ImageMetadata], documents: List[Tuple[str, bytes]]):
+    """Yield ZIP bytes as each image is encoded; never touches request state.
+
+    All PNG encodes are submitted up front so the pool works ahead while
+    earlier members are being sent (images already encoded for API
+    responses or saves come straight from the PNG cache). PNGs are stored
+    (already compressed),
+    JSON members are deflated.
+    """
+    loop = asyncio.get_running_loop()
+    futures = [loop.run_in_executor(_png_pool, img.get_png_bytes) for img in visible_images]
+    sink = _ChunkSink()
+    zf = zipfile.ZipFile(sink, "w", zipfile.ZIP_DEFLATED)
+    try:
+        for n, (img_meta, fut) in enumerate(zip(visible_images, futures), start=1):
+            png_bytes = await fut
+            filename = _export_filename(img_meta)
+            zf.writestr(f"{filename}.png", png_bytes, compress_type=zipfile.ZIP_STORED)
+            zf.writestr(f"{filename}.json", json.dumps(_export_legacy_metadata(img_meta), indent=2, ensure_ascii=False))
+            if n % 10 == 0:
+                print(f"  Streamed {n}/{len(visible_images)} images...")
+            yield sink.drain()
+        for name, payload in documents:
+            zf.writestr(name, payload)
+            yield sink.drain()
+        zf.close()
+        yield sink.drain()
+        print(f"OK: ZIP streamed with {len(visible_images)} PNG images ({sink.tell() / 1024:.2f} KB)")
+    finally:
+        for fut in futures:
+            fut.cancel()  # client went away — don't keep encoding
+
+
 @app.get("/api/export-zip")
 async def export_zip(ids: Optional[str] = None):
     """Export images and metadata as ZIP. If ids query param provided (comma-separated),
-    export only those image IDs; otherwise export all visible images."""
+    export only those image IDs; otherwise export all visible images.
+
+    The archive is streamed: the first images are on the wire while later ones
+    are still being encoded.
+    """
     try:
         print(f"\n=== Export ZIP Request ===")
         print(f"Total images in state: {len(state.images_metadata)}")
@@ -4143,209 +5388,20 @@ async def export_zip(ids: Optional[str] = None):
         if len(visible_images) == 0:
             raise HTTPException(status_code=400, detail="No visible images to export")
 
-        # Create a temporary directory
-        with tempfile.TemporaryDirectory() as temp_dir:
-            temp_path = Path(temp_dir)
-            print(f"Created temp directory: {temp_path}")
-
-            # Save each image with timestamp-based filename
-            print(f"Saving {len(visible_images)} images...")
-            saved_count = 0
-            # img_id -> png filename stem (used when building canvas.json)
-            img_filename_map: Dict[int, str] = {}
-            for img_meta in visible_images:
-                # Create timestamp-based filename
-                timestamp_str = img_meta.timestamp.strftime("%Y%m%d_%H%M%S_%f")[:-3]  # Remove last 3 digits of microseconds
-                filename = f"img_{img_meta.id}_{timestamp_str}"
-                img_filename_map[img_meta.id] = filename
-
-                # Save image as PNG
-                img_path = temp_path / f"{filename}.png"
-                img_meta.pil_image.save(img_path, format="PNG")
-                saved_count += 1
-                if saved_count % 10 == 0:
-                    print(f"  Saved {saved_count}/{len(visible_images)} images...")
-
-                # Legacy per-image metadata JSON (kept for backward compat with old importers)
-                legacy_metadata = {
-                    "id": img_meta.id,
-                    "group_id": img_meta.group_id,
-                    "prompt": img_meta.prompt,
-                    "generation_method": img_meta.generation_method,
-                    "timestamp": img_meta.timestamp.isoformat(),
-                    "coordinates": list(img_meta.coordinates),
-                    "parents": img_meta.parents,
-                    "children": img_meta.children,
-                    "reference_ids": img_meta.reference_ids,
-                    "visible": img_meta.visible,
-                    "is_ghost": img_meta.is_ghost,
-                    "suggested_prompt": img_meta.suggested_prompt,
-                    "reasoning": img_meta.reasoning,
-                    "embedding": img_meta.embedding.tolist(),
-                }
-
-                json_path = temp_path / f"{filename}.json"
-                with open(json_path, 'w', encoding='utf-8') as f:
-                    json.dump(legacy_metadata, f, indent=2, ensure_ascii=False)
-
-            print(f"Saved all {saved_count} images successfully")
-
-            # Build generation sequence map: image_id -> (group_index, position_in_group)
-            gen_sequence: Dict[int, Dict] = {}
-            for g_idx, g in enumerate(state.history_groups):
-                for pos, img_id in enumerate(g.image_ids):
-                    gen_sequence[img_id] = {
-                        "group_index": g_idx,
-                        "position_in_group": pos,
-                        "group_id": g.id,
-                        "group_type": g.type,
-                        "group_prompt": g.prompt,
-                        "group_timestamp": g.timestamp.isoformat(),
-                    }
+        # Snapshot everything that needs the participant's state now: the body is
+        # iterated after the request middleware has reset the participant context.
+        documents = _build_export_documents(visible_images)
 
-            # ── Unified canvas.json (mirrors local save format, filename ref instead of base64) ──
-            canvas_images_data = []
-            for img_meta in visible_images:
-                ts = img_meta.timestamp.isoformat()
-                filename = img_filename_map[img_meta.id]
-                canvas_images_data.append({
-                    "id": img_meta.id,
-                    "group_id": img_meta.group_id,
-                    "filename": f"{filename}.png",  # PNG in same ZIP, no base64 here
-                    "embedding": img_meta.embedding.tolist(),
-                    "coordinates": [float(x) for x in img_meta.coordinates],
-                    "parents": img_meta.parents,
-                    "children": img_meta.children,
-                    "reference_ids": img_meta.reference_ids,
-                    "generation_method": img_meta.generation_method,
-                    "prompt": img_meta.prompt,
-                    "timestamp": ts,
-                    "visible": img_meta.visible,
-                    "is_ghost": img_meta.is_ghost,
-                    "suggested_prompt": img_meta.suggested_prompt,
-                    "reasoning": img_meta.reasoning,
-                    "realm": getattr(img_meta, 'realm', 'shoe'),
-                    "shoe_view": getattr(img_meta, 'shoe_view', 'side'),
-                    "parent_side_id": getattr(img_meta, 'parent_side_id', -1),
-                })
-            canvas_history_data = []
-            for hg in state.history_groups:
-                ts = hg.timestamp.isoformat() if isinstance(hg.timestamp, datetime) else str(hg.timestamp)
-                canvas_history_data.append({
-                    "id": hg.id,
-                    "type": hg.type,
-                    "image_ids": hg.image_ids,
-                    "prompt": hg.prompt,
-                    "visible": hg.visible,
-                    "thumbnail_id": hg.thumbnail_id,
-                    "timestamp": ts,
-                })
-            canvas_doc = {
-                "id": state.current_canvas_id,
-                "name": state.canvas_name,
-                "participantId": state.participant_id,
-                "createdAt": state.canvas_created_at,
-                "updatedAt": datetime.now().isoformat(),
-                "parentCanvasId": state.parent_canvas_id,
-                "sharedImageIds": state.shared_image_ids,
-                "axisLabels": {k: list(v) for k, v in state.axis_labels.items()},
-                "designBrief": state.design_brief,
-                "briefFields": state.brief_fields,
-                "briefInterpretation": state.brief_interpretation,
-                "briefSuggestedParams": state.brief_suggested_params,
-                "briefHighlights": state.brief_highlights,
-                "nextId": state.next_id,
-                "layerDefinitions": state.layer_definitions,
-                "imageLayerMap": {str(k): v for k, v in state.image_layer_map.items()},
-                "images": canvas_images_data,
-                "historyGroups": canvas_history_data,
-                "eventLog": state.event_log,
+        return StreamingResponse(
+            _stream_export_zip(visible_images, documents),
+            media_type="application/zip",
+            headers={
+                "Content-Disposition": f"attachment; filename=zappos_export_{datetime.now().strftime('%Y%m%d_%H%M%S')}.zip",
             }
-            canvas_path = temp_path / "canvas.json"
-            print("Writing unified canvas.json...")
-            with open(canvas_path, 'w', encoding='utf-8') as f:
-                json.dump(canvas_doc, f, ensure_ascii=False, cls=_NumpyEncoder)
-
-            # ── Legacy export_summary.json (kept for old importers / human inspection) ──
-            summary = {
-                "export_timestamp": datetime.now().isoformat(),
-                "total_images": len(visible_images),
-                "axis_labels": {k: list(v) for k, v in state.axis_labels.items()},
-                "is_3d_mode": state.is_3d_mode,
-                "design_brief": state.design_brief,
-                "layer_definitions": state.layer_definitions,
-                "image_layer_map": {str(k): v for k, v in state.image_layer_map.items()},
-                "history_groups": [
-                    {
-                        "id": g.id,
-                        "type": g.type,
-                        "image_ids": g.image_ids,
-                        "prompt": g.prompt,
-                        "visible": g.visible,
-                        "timestamp": g.timestamp.isoformat(),
-                        "thumbnail_id": g.thumbnail_id,
-                    }
-                    for g in state.history_groups
-                ],
-                "images": [
-                    {
-                        "id": img.id,
-                        "filename": f"img_{img.id}_{img.timestamp.strftime('%Y%m%d_%H%M%S_%f')[:-3]}.png",
-                        "prompt": img.prompt,
-                        "generation_method": img.generation_method,
-                        "timestamp": img.timestamp.isoformat(),
-                        "coordinates": list(img.coordinates),
-                        "parents": img.parents,
-                        "children": img.children,
-                        "reference_ids": img.reference_ids,
-                        "layer_id": state.image_layer_map.get(img.id, "default"),
-                        **gen_sequence.get(img.id, {"group_index": -1, "position_in_group": -1, "group_id": None, "group_type": None, "group_prompt": None, "group_timestamp": None}),
-                    }
-                    for img in state.images_metadata if img.visible
-                ]
-            }
-
-            summary_path = temp_path / "export_summary.json"
-            print("Writing legacy export_summary.json...")
-            with open(summary_path, 'w', encoding='utf-8') as f:
-                json.dump(summary, f, indent=2, ensure_ascii=False)
-
-            # Create ZIP file
-            print("Creating ZIP archive...")
-            zip_path = temp_path / "zappos_export.zip"
-            files_to_zip = list(temp_path.glob("*"))
-            print(f"Files to zip: {len(files_to_zip)}")
-
-            with zipfile.ZipFile(zip_path, 'w', zipfile.ZIP_DEFLATED) as zipf:
-                for file_path in files_to_zip:
-                    if file_path != zip_path:
-                        zipf.write(file_path, file_path.name)
-
-            png_count = len(list(temp_path.glob('*.png')))
-            json_count = len(list(temp_path.glob('*.json')))
-            print(f"OK: ZIP file created with {png_count} PNG images and {json_count} JSON files")
-
-            # Read the ZIP file and return it
-            print("Reading ZIP file for response...")
-            with open(zip_path, 'rb') as f:
-                zip_content = f.read()
-
-            zip_size = len(zip_content)
-            print(f"ZIP file size: {zip_size} bytes ({zip_size / 1024:.2f} KB)")
-
-            if zip_size == 0:
-                raise Exception("Generated ZIP file is empty!")
-
-            print("Sending ZIP file to client...")
-            return StreamingResponse(
-                BytesIO(zip_content),
-                media_type="application/zip",
-                headers={
-                    "Content-Disposition": f"attachment; filename=zappos_export_{datetime.now().strftime('%Y%m%d_%H%M%S')}.zip",
-                    "Content-Length": str(zip_size)
-                }
-            )
+        )
 
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"\n!!! ERROR in export_zip !!!")
         print(f"Error: {e}")
@@ -4399,7 +5455,7 @@ class LoadSessionRequest(BaseModel):
 async def load_session(request: LoadSessionRequest):
     """Save current canvas, then load a different one from disk."""
     try:
-        _close_event_log()
+        await _close_event_log()
         # Save current canvas first
         _save_canvas_to_disk()
 
@@ -4422,17 +5478,18 @@ async def load_session(request: LoadSessionRequest):
             raise HTTPException(status_code=400, detail="Corrupted canvas file — missing required fields")
 
         try:
-            _deserialize_canvas(data)
+            await _deserialize_canvas(data)
         except Exception as deser_err:
             # Rollback: restore the canvas we just saved so state isn't half-broken
             print(f"[load_session] Deserialization failed: {deser_err} — rolling back")
             rollback_path = _find_session_file(_snapshot["participant_id"], _snapshot["canvas_id"])
             if rollback_path:
                 with open(rollback_path, encoding="utf-8") as f:
-                    _deserialize_canvas(json.load(f))
+                    rollback_data = json.load(f)
+                await _deserialize_canvas(rollback_data)
             raise HTTPException(status_code=500, detail=f"Failed to load canvas: {deser_err}")
 
-        _open_event_log()
+        await _open_event_log()
         await broadcast_state_update()
         visible = [img for img in state.images_metadata if img.visible]
         neighbor_map = get_semantic_neighbors(visible, k=5) if len(visible) > 1 else {}
@@ -4471,13 +5528,15 @@ class NewCanvasRequest(BaseModel):
 async def new_canvas(request: NewCanvasRequest):
     """Save current canvas, then start a fresh empty canvas."""
     try:
-        _close_event_log()
+        await _close_event_log()
         _save_canvas_to_disk()
         # Reset state (like /api/clear but also resets session meta)
         state.images_metadata = []
         state.history_groups = []
+        state.online_axes = {}
+        state.projection_mode, state.umap_key = "axes", None
         state.next_id = 0
-        state.event_log = []
+        state.event_log = _new_event_ring()
         state.cluster_centroids = []
         state.cluster_labels = []
         state.current_canvas_id = str(_uuid.uuid4())
@@ -4487,7 +5546,7 @@ async def new_canvas(request: NewCanvasRequest):
         state.shared_image_ids = []
         if request.participant_id:
             state.participant_id = request.participant_id
-        _open_event_log()
+        await _open_event_log()
         await broadcast_state_update()
         return {
             "canvasId": state.current_canvas_id,
@@ -4507,7 +5566,7 @@ class BranchCanvasRequest(BaseModel):
 async def branch_canvas(request: BranchCanvasRequest):
     """Save current canvas, then create a new canvas pre-seeded with selected images."""
     try:
-        _close_event_log()
+        await _close_event_log()
         parent_canvas_id = state.current_canvas_id
         _save_canvas_to_disk()
 
@@ -4534,7 +5593,7 @@ async def branch_canvas(request: BranchCanvasRequest):
         state.images_metadata = new_images
         state.history_groups = []
         state.next_id = len(new_images)
-        state.event_log = []
+        state.event_log = _new_event_ring()
         state.cluster_centroids = []
         state.cluster_labels = []
         state.current_canvas_id = str(_uuid.uuid4())
@@ -4542,7 +5601,7 @@ async def branch_canvas(request: BranchCanvasRequest):
         state.canvas_created_at = datetime.now().isoformat()
         state.parent_canvas_id = parent_canvas_id
         state.shared_image_ids = request.image_ids
-        _open_event_log()
+        await _open_event_log()
 
         await broadcast_state_update()
         return {
@@ -4586,7 +5645,7 @@ async def delete_canvas(request: DeleteCanvasRequest):
                 _save_canvas_to_disk()  # save current first
                 with open(other_path, encoding="utf-8") as f:
                     data = json.load(f)
-                _deserialize_canvas(data)
+                await _deserialize_canvas(data)
                 switched_to = state.current_canvas_id
         else:
             # Last canvas — reset to empty state
@@ -4637,12 +5696,12 @@ async def login(request: LoginRequest):
     # Researcher / admin login
     if username.lower() == "researcher" and password == ADMIN_KEY:
         state.participant_id = "researcher"
-        _open_event_log()
+        await _open_event_log()
         return {"success": True, "participantId": "researcher", "role": "admin"}
     # Study participant login
     if username in _STUDY_USERS and _STUDY_USERS[username] == password:
         state.participant_id = username
-        _open_event_log()
+        await _open_event_log()
         return {"success": True, "participantId": username, "role": "participant"}
     raise HTTPException(status_code=401, detail="Invalid username or password")
 
@@ -4658,8 +5717,8 @@ async def set_study_session_name(request: SetStudySessionRequest):
     state.study_session_name = request.name.strip()
     # Reopen event log with new prefix if name changed
     if state.study_session_name != old_name and state.event_log_path:
-        _close_event_log()
-        _open_event_log()
+        await _close_event_log()
+        await _open_event_log()
     return {"studySessionName": state.study_session_name}
 
 
@@ -4669,26 +5728,372 @@ async def get_study_session_name():
     return {"studySessionName": state.study_session_name}
 
 
+# ─── Admin data backup (streamed) ────────────────────────────────────────────
+# The archive is written by a producer thread into a bounded queue and sent to
+# the client chunk by chunk, so memory stays at a few chunks regardless of how
+# much participant data exists and the event loop never waits on compression.
+# Incremental mode only includes files changed since a timestamp or files whose
+# hash differs from a manifest previously fetched via /api/admin/data-manifest.
+
+_BACKUP_CHUNK_SIZE = 256 * 1024
+_BACKUP_QUEUE_CHUNKS = 8
+_BACKUP_DONE = object()
+
+
+class _BackupCancelled(OSError):
+    """Raised inside the archiver thread once the client has gone away."""
+
+
+class _QueueSink:
+    """Write-only file object that hands archive bytes to the response iterator.
+
+    Exposes tell() but not seek(), which puts zipfile into streaming mode
+    (data descriptors instead of rewriting local headers).
+    """
+
+    def __init__(self, chunk_size: int = _BACKUP_CHUNK_SIZE, max_chunks: int = _BACKUP_QUEUE_CHUNKS):
+        self.queue: "queue.Queue" = queue.Queue(maxsize=max_chunks)
+        self.cancelled = threading.Event()
+        self._buf = bytearray()
+        self._pos = 0
+        self._chunk_size = chunk_size
+
+    def _put(self, item) -> None:
+        # Bounded put that gives up once the consumer is gone (backpressure)
+        while True:
+            if self.cancelled.is_set():
+                raise _BackupCancelled("backup download cancelled")
+            try:
+                self.queue.put(item, timeout=0.5)
+                return
+            except queue.Full:
+                continue
+
+    def write(self, data) -> int:
+        n = len(data)
+        if n:
+            self._buf += data
+            self._pos += n
+            if len(self._buf) >= self._chunk_size:
+                self._put(bytes(self._buf))
+                self._buf.clear()
+        return n
+
+    def tell(self) -> int:
+        return self._pos
+
+    def flush(self) -> None:
+        pass
+
+    def finish(self, error: Optional[BaseException] = None) -> None:
+        """Push any buffered tail plus an end marker (or the producer's error)."""
+        try:
+            if self._buf and error is None:
+                self._put(bytes(self._buf))
+                self._buf.clear()
+            self._put(error if error is not None else _BACKUP_DONE)
+        except _BackupCancelled:
+            pass
+
+
+def _file_sha256(path: Path) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def _iter_data_files() -> List[Tuple[Path, str]]:
+    """All backup-able files under DATA_DIR as (path, posix path relative to DATA_DIR)."""
+    if not DATA_DIR.exists():
+        return []
+    out = []
+    for path in sorted(DATA_DIR.rglob("*")):
+        # Skip half-written session files (see _save_canvas_to_disk)
+        if path.is_file() and path.suffix != ".tmp":
+            out.append((path, path.relative_to(DATA_DIR).as_posix()))
+    return out
+
+
+def _parse_backup_since(since: str) -> Optional[float]:
+    """Accept epoch seconds or an ISO timestamp; empty means full backup."""
+    if not since:
+        return None
+    try:
+        return float(since)
+    except ValueError:
+        pass
+    try:
+        return datetime.fromisoformat(since).timestamp()
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"Invalid 'since' value: {since!r}")
+
+
+def _manifest_entry_unchanged(path: Path, entry) -> bool:
+    """Compare a file against a manifest entry (sha256 string or {size, mtime, sha256})."""
+    if isinstance(entry, str):
+        return _file_sha256(path) == entry
+    if not isinstance(entry, dict):
+        return False
+    st = path.stat()
+    if entry.get("size") == st.st_size and entry.get("mtime") == st.st_mtime:
+        return True  # cheap path: untouched since the manifest was taken
+    sha = entry.get("sha256")
+    return bool(sha) and st.st_size == entry.get("size", st.st_size) and _file_sha256(path) == sha
+
+
+def _select_backup_files(since: Optional[float] = None,
+                         manifest: Optional[Dict[str, object]] = None) -> List[Tuple[Path, str]]:
+    """Pick files for a (possibly incremental) backup as (path, archive name) pairs."""
+    selected = []
+    for path, rel in _iter_data_files():
+        try:
+            if since is not None and path.stat().st_mtime <= since:
+                continue
+            if manifest is not None and rel in manifest and _manifest_entry_unchanged(path, manifest[rel]):
+                continue
+        except FileNotFoundError:
+            continue  # deleted while scanning
+        selected.append((path, f"data/{rel}"))
+    return selected
+
+
+def _write_backup_archive(sink: _QueueSink, files: List[Tuple[Path, str]], fmt: str) -> None:
+    if fmt == "zip":
+        with zipfile.ZipFile(sink, "w", zipfile.ZIP_DEFLATED) as zf:
+            for path, arcname in files:
+                try:
+                    zf.write(path, arcname)
+                except FileNotFoundError:
+                    continue
+    else:
+        with tarfile.open(fileobj=sink, mode="w|gz") as tar:
+            for path, arcname in files:
+                try:
+                    tar.add(str(path), arcname=arcname, recursive=False)
+                except FileNotFoundError:
+                    continue
+
+
+def _stream_backup(files: List[Tuple[Path, str]], fmt: str):
+    """Sync generator of archive chunks (StreamingResponse runs it in the threadpool)."""
+    sink = _QueueSink()
+
+    def _produce():
+        error = None
+        try:
+            _write_backup_archive(sink, files, fmt)
+        except _BackupCancelled:
+            return
+        except Exception as e:
+            print(f"[backup] archive failed: {e}")
+            error = e
+        sink.finish(error)
+
+    threading.Thread(target=_produce, name="data-backup", daemon=True).start()
+    try:
+        while True:
+            item = sink.queue.get()
+            if item is _BACKUP_DONE:
+                return
+            if isinstance(item, BaseException):
+                raise item
+            yield item
+    finally:
+        sink.cancelled.set()
+
+
+def _backup_response(files: List[Tuple[Path, str]], fmt: str, incremental: bool) -> StreamingResponse:
+    if fmt not in ("tar", "zip"):
+        raise HTTPException(status_code=400, detail="format must be 'tar' or 'zip'")
+    started = datetime.now()
+    kind = "incremental" if incremental else "backup"
+    ext = "zip" if fmt == "zip" else "tar.gz"
+    filename = f"study_{kind}_{started.strftime('%Y-%m-%d_%H%M')}.{ext}"
+    print(f"[backup] streaming {len(files)} files as {ext} ({kind})")
+    return StreamingResponse(
+        _stream_backup(files, fmt),
+        media_type="application/zip" if fmt == "zip" else "application/gzip",
+        headers={
+            "Content-Disposition": f"attachment; filename={filename}",
+            # Pass back as ?since= on the next run to fetch only newer files
+            "X-Backup-Timestamp": str(started.timestamp()),
+            "X-Backup-File-Count": str(len(files)),
+        },
+    )
+
+
 @app.get("/api/admin/download-data")
-async def admin_download_data(admin_key: str = ""):
-    """Stream the entire data directory as a tar.gz for local backup.
+async def admin_download_data(admin_key: str = "", since: str = "", format: str = "tar"):
+    """Stream the data directory as a tar.gz (or zip) for local backup.
     Visit this URL in a browser to download: /api/admin/download-data?admin_key=YOUR_KEY
+    Add &since=<epoch or ISO timestamp> to only include files modified after that time.
     """
     if admin_key != ADMIN_KEY:
         raise HTTPException(status_code=403, detail="Invalid admin key")
-    import tarfile, io
-    timestamp = datetime.now().strftime("%Y-%m-%d_%H%M")
-    filename = f"study_backup_{timestamp}.tar.gz"
-    buf = io.BytesIO()
-    with tarfile.open(fileobj=buf, mode="w:gz") as tar:
-        if DATA_DIR.exists():
-            tar.add(str(DATA_DIR), arcname="data")
-    buf.seek(0)
-    return StreamingResponse(
-        buf,
-        media_type="application/gzip",
-        headers={"Content-Disposition": f"attachment; filename={filename}"},
-    )
+    since_ts = _parse_backup_since(since)
+    files = await asyncio.to_thread(_select_backup_files, since_ts)
+    return _backup_response(files, format, incremental=since_ts is not None)
+
+
+class BackupManifestRequest(BaseModel):
+    # Either the /api/admin/data-manifest document as-is ({generatedAt, files})
+    # or {"manifest": ...} holding that document or its bare files mapping.
+    manifest: Dict[str, object] = {}  # relative path -> sha256 or {size, mtime, sha256}
+    files: Optional[Dict[str, object]] = None
+    generatedAt: Optional[float] = None
+    format: str = "tar"
+
+    def entries(self) -> Dict[str, object]:
+        if self.files is not None:
+            return self.files
+        manifest = self.manifest
+        if "generatedAt" in manifest and isinstance(manifest.get("files"), dict):
+            return manifest["files"]
+        return manifest
+
+
+@app.post("/api/admin/download-data")
+async def admin_download_data_incremental(request: BackupManifestRequest, admin_key: str = ""):
+    """Stream only files that are new or changed relative to a previous manifest."""
+    if admin_key != ADMIN_KEY:
+        raise HTTPException(status_code=403, detail="Invalid admin key")
+    files = await asyncio.to_thread(_select_backup_files, None, request.entries())
+    return _backup_response(files, request.format, incremental=True)
+
+
+@app.get("/api/admin/data-manifest")
+async def admin_data_manifest(admin_key: str = "", hashes: bool = True):
+    """Return {relative path: {size, mtime, sha256}} for every file under DATA_DIR.
+    Save it next to a backup and POST it back to /api/admin/download-data later."""
+    if admin_key != ADMIN_KEY:
+        raise HTTPException(status_code=403, detail="Invalid admin key")
+
+    def _build() -> Dict[str, Dict]:
+        out = {}
+        for path, rel in _iter_data_files():
+            try:
+                st = path.stat()
+                entry = {"size": st.st_size, "mtime": st.st_mtime}
+                if hashes:
+                    entry["sha256"] = _file_sha256(path)
+            except FileNotFoundError:
+                continue
+            out[rel] = entry
+        return out
+
+    files = await asyncio.to_thread(_build)
+    return {"generatedAt": datetime.now().timestamp(), "files": files}
+
+
+@app.get("/api/admin/embedding-batching")
+async def admin_embedding_batching(admin_key: str = ""):
+    """Shared embedding dispatcher counters: Jina calls vs. callers served."""
+    if admin_key != ADMIN_KEY:
+        raise HTTPException(status_code=403, detail="Invalid admin key")
+    stats = _embedding_dispatcher.stats()
+    with _shared_models_lock:
+        stats["shared_embedders"] = {
+            model_type: {"axes_remembered": len(_shared_axis_builders[model_type].axes)
+                         if model_type in _shared_axis_builders else 0,
+                         "text_memory_cache": len(embedder._text_memory)}
+            for model_type, embedder in _shared_embedders.items()
+        }
+    return stats
+
+
+@app.get("/api/admin/rate-limits")
+async def admin_rate_limits(admin_key: str = ""):
+    """Per-service limiter state: current rate, queue depth, waits and 429 count."""
+    if admin_key != ADMIN_KEY:
+        raise HTTPException(status_code=403, detail="Invalid admin key")
+    return all_limiter_stats()
+
+
+@app.get("/api/admin/loop-lag")
+async def admin_loop_lag(admin_key: str = "", reset: bool = False):
+    """Event-loop lag percentiles over the recent window (`reset=true` clears it after reading)."""
+    if admin_key != ADMIN_KEY:
+        raise HTTPException(status_code=403, detail="Invalid admin key")
+    stats = _loop_lag_monitor.stats()
+    if reset:
+        _loop_lag_monitor.reset()
+    return stats
+
+
+class ProfilingConfigRequest(BaseModel):
+    enabled: Optional[bool] = None
+    threshold_ms: Optional[float] = None
+    routes: Optional[List[str]] = None   # fnmatch patterns on the request path; [] = all routes
+
+
+@app.get("/api/admin/profiling")
+async def admin_profiling_config(admin_key: str = ""):
+    """Current request-profiling settings and counters."""
+    if admin_key != ADMIN_KEY:
+        raise HTTPException(status_code=403, detail="Invalid admin key")
+    return _request_profiler.config()
+
+
+@app.post("/api/admin/profiling")
+async def admin_profiling_configure(request: ProfilingConfigRequest, admin_key: str = ""):
+    """Turn request profiling on/off or change its threshold and route patterns (until restart)."""
+    if admin_key != ADMIN_KEY:
+        raise HTTPException(status_code=403, detail="Invalid admin key")
+    config = _request_profiler.configure(request.enabled, request.threshold_ms, request.routes)
+    print(f"[profiling] enabled={config['enabled']} threshold={config['threshold_ms']}ms routes={config['routes']}")
+    return config
+
+
+@app.get("/api/admin/profiles")
+async def admin_list_profiles(admin_key: str = ""):
+    """Saved request profiles, newest first."""
+    if admin_key != ADMIN_KEY:
+        raise HTTPException(status_code=403, detail="Invalid admin key")
+    return {"profiles": await asyncio.to_thread(_request_profiler.list_profiles)}
+
+
+@app.get("/api/admin/profiles/{filename}")
+async def admin_get_profile(filename: str, admin_key: str = ""):
+    """Download one profile file (.html, .prof or .txt)."""
+    if admin_key != ADMIN_KEY:
+        raise HTTPException(status_code=403, detail="Invalid admin key")
+    path = _request_profiler.profile_path(filename)
+    if path is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return FileResponse(str(path), filename=filename)
+
+
+@app.get("/api/admin/traces")
+async def admin_traces(admin_key: str = "", limit: int = 50, name: str = "", min_ms: float = 0.0):
+    """Recent request traces, newest first, each with its per-stage timing breakdown."""
+    if admin_key != ADMIN_KEY:
+        raise HTTPException(status_code=403, detail="Invalid admin key")
+    return {"traces": tracer.list(limit=limit, name=name, min_ms=min_ms), "stats": tracer.stats()}
+
+
+@app.get("/api/admin/traces/{trace_id}")
+async def admin_trace(trace_id: str, admin_key: str = "", format: str = "json"):
+    """All spans of one trace (`format=otlp` returns OTLP/JSON for importing elsewhere)."""
+    if admin_key != ADMIN_KEY:
+        raise HTTPException(status_code=403, detail="Invalid admin key")
+    trace = tracer.get(trace_id)
+    if trace is None:
+        raise HTTPException(status_code=404, detail="Trace not found (evicted or never recorded)")
+    return trace.to_otlp() if format == "otlp" else trace.to_dict()
+
+
+@app.get("/api/admin/startup")
+async def admin_startup(admin_key: str = ""):
+    """Import-time breakdown, warm-up timings and which heavy modules are loaded now."""
+    if admin_key != ADMIN_KEY:
+        raise HTTPException(status_code=403, detail="Invalid admin key")
+    return {
+        **_startup_report,
+        "heavy_modules_loaded": [m for m in _HEAVY_MODULES if m in sys.modules],
+        "gemini_sdk_import_ms": genai.import_ms,
+    }
 
 
 @app.get("/api/admin/sessions")
@@ -4700,7 +6105,7 @@ async def admin_sessions(admin_key: str = ""):
         return {"participants": []}
     result = []
     for pid_dir in DATA_DIR.iterdir():
-        if pid_dir.is_dir():
+        if pid_dir.is_dir() and not pid_dir.name.startswith("_"):
             sessions = _list_sessions(pid_dir.name)
             result.append({"participantId": pid_dir.name, "sessions": sessions})
     return {"participants": result}
@@ -4715,8 +6120,9 @@ class EventLogRequest(BaseModel):
 async def log_event(request: EventLogRequest):
     """Append an event to the current canvas event log (fire-and-forget).
 
-    Writes to both the in-memory list (included in canvas JSON auto-save)
-    and the dedicated JSONL event log file.
+    Writes to both the in-memory ring buffer (included in ZIP export)
+    and the buffered JSONL event log writer. A session_end event forces
+    the participant's pending lines to disk.
     """
     entry = {
         "type": request.type,
@@ -4725,6 +6131,8 @@ async def log_event(request: EventLogRequest):
     }
     state.event_log.append(entry)
     _log_event_to_file(entry)
+    if request.type == "session_end" and state.event_log_path:
+        await asyncio.to_thread(_get_event_writer().flush, EVENT_LOG_FSYNC != "never")
     return {"ok": True}
 
 class FeedbackContext(BaseModel):
@@ -4772,7 +6180,15 @@ async def submit_feedback(request: FeedbackRequest):
 
 @app.websocket("/ws")
 async def websocket_endpoint(websocket: WebSocket):
-    """WebSocket endpoint for real-time updates."""
+    """WebSocket endpoint for real-time updates.
+
+    The HTTP middleware doesn't run for websockets, so the participant is read
+    here: X-Participant-Id header, or ?participant_id= (browsers can't set
+    headers on a WebSocket handshake).
+    """
+    pid = (websocket.headers.get("X-Participant-Id")
+           or websocket.query_params.get("participant_id") or "researcher").strip() or "researcher"
+    token = _current_participant_id.set(pid)
     await websocket.accept()
     state.websocket_connections.append(websocket)
 
@@ -4807,6 +6223,8 @@ async def websocket_endpoint(websocket: WebSocket):
 
     except WebSocketDisconnect:
         state.websocket_connections.remove(websocket)
+    finally:
+        _current_participant_id.reset(token)
 
 
 # ─── Static file serving (production: serve built React app) ───
@@ -4843,6 +6261,13 @@ async def debug_spa():
     }
 
 
+_startup_marks.append(("app, routes, state", time.perf_counter()))
+_startup_report.update(_import_time_report())
+print(f"[startup] api.py imported in {_startup_report['import_ms']:.0f} ms {_startup_report['import_phases_ms']}"
+      + (f" (heavy modules loaded: {_startup_report['heavy_modules_at_import']})"
+         if _startup_report['heavy_modules_at_import'] else ""))
+
+
 if __name__ == "__main__":
     # Allow port to be configured via env and automatically fall back
     # to the next available port if the desired one is already in use.
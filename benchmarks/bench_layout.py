@@ -0,0 +1,41 @@
+"""Neighbour search, clustering and layout post-processing."""
+
+import numpy as np
+import pytest
+
+import api
+from conftest import SLOW
+
+
+def _coords(state) -> np.ndarray:
+    return np.array([img.coordinates for img in state.images_metadata], dtype=float)
+
+
+@pytest.mark.benchmark(group="get_semantic_neighbors")
+def bench_semantic_neighbors(benchmark, canvas):
+    visible = [img for img in canvas.images_metadata if img.visible]
+    neighbor_map = benchmark(api.get_semantic_neighbors, visible, 5)
+    assert len(neighbor_map) == len(visible)
+
+
+@pytest.mark.benchmark(group="update_clusters")
+def bench_update_clusters(benchmark, canvas):
+    benchmark(api.update_clusters)
+    assert len(canvas.cluster_labels) == len(canvas.images_metadata)
+
+
+@pytest.mark.benchmark(group="snap_to_grid")
+def bench_snap_to_grid(benchmark, canvas):
+    coords = _coords(canvas)
+    snapped = benchmark(api.snap_to_grid, coords)
+    assert snapped.shape == coords.shape
+
+
+@pytest.mark.benchmark(group="apply_layout_spread")
+def bench_apply_layout_spread(benchmark, canvas, n_images):
+    # Pure-Python O(N²) per iteration: cap sizes so the suite stays runnable
+    if n_images > 500 or (n_images > 50 and not SLOW):
+        pytest.skip("quadratic layout: set BENCH_SLOW=1 for 500 images; 5,000 is not run")
+    coords = _coords(canvas)
+    spread = benchmark.pedantic(api.apply_layout_spread, args=(coords,), rounds=3, iterations=1)
+    assert spread.shape == coords.shape
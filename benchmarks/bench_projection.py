@@ -0,0 +1,14 @@
+"""Axis projection: the per-request cost once pole directions are cached."""
+
+import numpy as np
+import pytest
+
+import api
+
+
+@pytest.mark.benchmark(group="project_embeddings_to_coordinates")
+@pytest.mark.parametrize("use_3d", [False, True], ids=["2d", "3d"])
+def bench_project_embeddings(benchmark, canvas, use_3d):
+    embeddings = np.array([img.embedding for img in canvas.images_metadata])
+    coords = benchmark(api.project_embeddings_to_coordinates, embeddings, use_3d=use_3d)
+    assert coords.shape == (len(embeddings), 3 if use_3d else 2)
@@ -0,0 +1,70 @@
+"""Canvas save/load, API response building and the agent canvas digest."""
+
+import asyncio
+import copy
+
+import pytest
+
+import api
+
+
+@pytest.mark.benchmark(group="_serialize_canvas")
+def bench_serialize_canvas_cold(benchmark, canvas):
+    """First save: every image is PNG-encoded."""
+    def setup():
+        for img in canvas.images_metadata:
+            img._cached_png = None
+    data = benchmark.pedantic(api._serialize_canvas, setup=setup, rounds=3, iterations=1)
+    assert len(data["images"]) == len(canvas.images_metadata)
+
+
+@pytest.mark.benchmark(group="_serialize_canvas")
+def bench_serialize_canvas_warm(benchmark, canvas):
+    """Subsequent saves: PNG bytes come from the per-image cache."""
+    api._serialize_canvas()
+    data = benchmark(api._serialize_canvas)
+    assert len(data["images"]) == len(canvas.images_metadata)
+
+
+@pytest.mark.benchmark(group="_deserialize_canvas")
+def bench_deserialize_canvas(benchmark, canvas):
+    data = api._serialize_canvas()
+    before = canvas.images_metadata
+    embedder, axis_builder = canvas.embedder, canvas.axis_builder
+    # Models unloaded → stored coordinates are kept; reprojection is covered by bench_projection
+    canvas.embedder = canvas.axis_builder = None
+    try:
+        benchmark.pedantic(lambda d: asyncio.run(api._deserialize_canvas(d)),
+                           setup=lambda: ((copy.copy(data),), {}), rounds=3, iterations=1)
+    finally:
+        canvas.embedder, canvas.axis_builder = embedder, axis_builder
+    # A real restore replaces the image list with freshly decoded records
+    assert canvas.images_metadata is not before
+    assert [img.id for img in canvas.images_metadata] == [img["id"] for img in data["images"]]
+    assert all(img.pil_image is not None for img in canvas.images_metadata)
+
+
+@pytest.mark.benchmark(group="image_metadata_to_response")
+@pytest.mark.parametrize("png_cache", ["cold", "warm"])
+def bench_image_metadata_to_response(benchmark, canvas, png_cache):
+    images = canvas.images_metadata
+    neighbor_map = api.get_semantic_neighbors(images, k=5)
+
+    def build():
+        return [api.image_metadata_to_response(img, neighbor_map) for img in images]
+
+    if png_cache == "cold":
+        def setup():
+            for img in images:
+                img._cached_png = None
+        responses = benchmark.pedantic(build, setup=setup, rounds=3, iterations=1)
+    else:
+        build()
+        responses = benchmark(build)
+    assert len(responses) == len(images)
+
+
+@pytest.mark.benchmark(group="get_canvas_digest")
+def bench_get_canvas_digest(benchmark, canvas):
+    digest = benchmark(lambda: asyncio.run(api.get_canvas_digest()))
+    assert digest["count"] == len(canvas.images_metadata)
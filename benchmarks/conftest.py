@@ -0,0 +1,137 @@
+"""
+Shared fixtures for the backend benchmarks: synthetic canvases + seeded axes.
+
+Canvases are built once per size and installed into a dedicated participant
+state ("__bench__") before each benchmark, so the backend functions run
+unchanged against realistic data without touching real participants.
+"""
+
+import os
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import numpy as np
+import pytest
+from PIL import Image
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "backend"))
+sys.path.insert(0, str(ROOT))
+
+import api  # noqa: E402  (backend/api.py)
+from models.data_structures import ImageMetadata, HistoryGroup  # noqa: E402
+from models.embeddings import EMBEDDING_DIM  # noqa: E402
+
+SIZES = [int(x) for x in os.getenv("BENCH_SIZES", "50,500,5000").split(",") if x.strip()]
+IMAGE_SIZE = int(os.getenv("BENCH_IMAGE_SIZE", "256"))
+SLOW = os.getenv("BENCH_SLOW", "") not in ("", "0")
+DISTINCT_IMAGES = 16  # pixel variants shared across a canvas (keeps 5,000-image canvases in memory)
+BENCH_PARTICIPANT = "__bench__"
+
+AXIS_LABELS = {
+    "x": ("formal", "sporty"),
+    "y": ("dark", "colorful"),
+    "z": ("casual", "elegant"),
+}
+
+
+def random_unit_vectors(rng: np.random.Generator, n: int, dim: int = EMBEDDING_DIM) -> np.ndarray:
+    v = rng.standard_normal((n, dim)).astype(np.float32)
+    return v / np.linalg.norm(v, axis=1, keepdims=True)
+
+
+def synthetic_shoe(rng: np.random.Generator, size: int = IMAGE_SIZE) -> Image.Image:
+    """RGBA image shaped like a background-removed product shot: a textured,
+    shaded blob on full transparency (so PNG size/compressibility is realistic)."""
+    yy, xx = np.mgrid[0:size, 0:size].astype(np.float32) / size
+    cx, cy = rng.uniform(0.4, 0.6, 2)
+    rx, ry = rng.uniform(0.30, 0.42), rng.uniform(0.15, 0.25)
+    inside = ((xx - cx) / rx) ** 2 + ((yy - cy) / ry) ** 2 <= 1.0
+    base = rng.uniform(40, 220, 3)
+    shade = (1.0 - 0.5 * yy)[..., None]
+    noise = rng.normal(0, 12, (size, size, 3))
+    rgb = np.clip(base * shade + noise, 0, 255).astype(np.uint8)
+    alpha = np.where(inside, 255, 0).astype(np.uint8)
+    return Image.fromarray(np.dstack([rgb, alpha]), mode="RGBA")
+
+
+def build_canvas(n: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    pixels = [synthetic_shoe(rng) for _ in range(DISTINCT_IMAGES)]
+    embeddings = random_unit_vectors(rng, n)
+    coords = rng.normal(0, 0.15, (n, 2))
+    t0 = datetime(2026, 1, 1)
+    group_size = 4
+    images, groups = [], []
+    for i in range(n):
+        group_id = f"batch_{i // group_size}"
+        parents = [i - group_size] if i >= group_size else []
+        images.append(ImageMetadata(
+            id=i,
+            group_id=group_id,
+            pil_image=pixels[i % DISTINCT_IMAGES],
+            embedding=embeddings[i],
+            coordinates=(float(coords[i, 0]), float(coords[i, 1])),
+            parents=parents,
+            children=[i + group_size] if i + group_size < n else [],
+            generation_method="batch",
+            prompt=f"synthetic shoe {i}",
+            reference_ids=list(parents),
+            timestamp=t0 + timedelta(seconds=i),
+        ))
+    for g in range(0, n, group_size):
+        groups.append(HistoryGroup(
+            id=f"batch_{g // group_size}",
+            type="batch",
+            image_ids=list(range(g, min(g + group_size, n))),
+            prompt=f"synthetic batch {g // group_size}",
+            timestamp=t0 + timedelta(seconds=g),
+        ))
+    return images, groups
+
+
+def seed_axes(state) -> None:
+    """Real embedder/axis builder objects, with every pole direction pre-seeded
+    in the backend's pole cache so projection never reaches Gemini or Jina."""
+    rng = np.random.default_rng(1234)
+    if state.embedder is None:
+        state.embedder = api.initialize_embedder(state.clip_model_type)
+        state.axis_builder = api.get_axis_builder(state.clip_model_type)
+    state.axis_labels = dict(AXIS_LABELS)
+    for labels in AXIS_LABELS.values():
+        for label in labels:
+            api._set_cached_expansion(label, [label])
+            api._pole_cache_put(api._pole_cache_key(label, [label]), random_unit_vectors(rng, 1)[0])
+
+
+@pytest.fixture(scope="session")
+def bench_state():
+    api._current_participant_id.set(BENCH_PARTICIPANT)
+    state = api._get_participant_state(BENCH_PARTICIPANT)
+    seed_axes(state)
+    return state
+
+
+_canvas_cache = {}
+
+
+@pytest.fixture(params=SIZES, ids=lambda n: f"n_images={n}")
+def n_images(request):
+    return request.param
+
+
+@pytest.fixture
+def canvas(bench_state, n_images):
+    """Install the synthetic canvas of `n_images` into the bench participant's state."""
+    if n_images not in _canvas_cache:
+        _canvas_cache[n_images] = build_canvas(n_images)
+    images, groups = _canvas_cache[n_images]
+    for img in images:
+        img._cached_png = None  # each benchmark starts with a cold PNG cache
+    bench_state.images_metadata = list(images)
+    bench_state.history_groups = list(groups)
+    bench_state.next_id = len(images)
+    bench_state.is_3d_mode = False
+    seed_axes(bench_state)
+    return bench_state
@@ -3,8 +3,8 @@
 import os
 from pathlib import Path
 
-# Dataset paths - UPDATE THIS TO YOUR DATASET LOCATION
-DATASET_ROOT = Path("W:/CMU_Academics/2025 Fall/Thesis Demo")
+# Dataset paths - set DATASET_ROOT in the environment (or update the default)
+DATASET_ROOT = Path(os.getenv("DATASET_ROOT", "W:/CMU_Academics/2025 Fall/Thesis Demo"))
 IMAGES_PATH = DATASET_ROOT / "ut-zap50k-images" / "ut-zap50k-images"
 DATA_PATH = DATASET_ROOT / "ut-zap50k-data"
 FEATS_PATH = DATASET_ROOT / "ut-zap50k-feats"
@@ -13,11 +13,17 @@ FEATS_PATH = DATASET_ROOT / "ut-zap50k-feats"
 CACHE_DIR = Path("cache")
 EMBEDDINGS_CACHE = CACHE_DIR / "embeddings"
 UMAP_CACHE = CACHE_DIR / "umap"
+MANIFEST_PATH = CACHE_DIR / "zappos_manifest.sqlite"  # indexed dataset manifest (data/manifest.py)
+FEATURES_CACHE = CACHE_DIR / "features"  # .npy memmaps converted from ut-zap50k-feats (data/features.py)
+DATASET_INDEX_DIR = CACHE_DIR / "dataset_index"  # dataset embeddings + IVF index (models/dataset_index.py)
 
-# Create cache directories
-CACHE_DIR.mkdir(exist_ok=True)
-EMBEDDINGS_CACHE.mkdir(exist_ok=True)
-UMAP_CACHE.mkdir(exist_ok=True)
+
+
+def ensure_cache_dirs():
+    """Create the cache directories. Called by code that writes to them
+    (not at import, so importing config has no filesystem side effects)."""
+    for cache_dir in (CACHE_DIR, EMBEDDINGS_CACHE, UMAP_CACHE, FEATURES_CACHE):
+        cache_dir.mkdir(parents=True, exist_ok=True)
 
 # Model settings
 CLIP_MODEL = "ViT-B-32"
@@ -0,0 +1,266 @@
+"""Memory-mapped access to the precomputed UT-Zappos50K features (ut-zap50k-feats).
+
+The dataset ships its features as MATLAB .mat files: one row per image, in
+the order of ut-zap50k-data/image-path.mat. Decoding them takes seconds and
+the full arrays at once, so FeatureStore converts them once:
+
+    cache/features/<file>_<variable>.npy   float32 (N, D), opened with mmap_mode='r'
+    cache/features/rows.json               relative image path of each row
+    cache/features/index.json              shapes + source file signatures
+
+and afterwards every process maps the .npy files instead of loading them.
+Rows are addressed by the same '/'-separated relative paths as the dataset
+manifest (data/manifest.py), so manifest queries and feature rows line up:
+
+    store = FeatureStore().ensure()
+    feats = store.load("zappos-feats_gistfeats")          # np.memmap
+    rows = store.rows_for(manifest.sample(100, category="Boots"))
+    store.nearest("zappos-feats_gistfeats", feats[rows[0]], k=10)
+
+Older .mat files are read with scipy.io; MATLAB v7.3 files are HDF5 and need
+the optional h5py package.
+"""
+
+import json
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from config import DATA_PATH, FEATS_PATH, FEATURES_CACHE, IMAGES_PATH
+
+try:
+    import h5py
+except ImportError:  # optional: only needed for MATLAB v7.3 (HDF5) files
+    h5py = None
+
+INDEX_VERSION = 1
+IMAGE_PATH_FILE = "image-path.mat"
+
+
+def _cell_strings(cell) -> List[str]:
+    """Flatten a MATLAB cell array of strings (as returned by scipy.io.loadmat)."""
+    out = []
+    for item in np.asarray(cell, dtype=object).ravel():
+        while isinstance(item, np.ndarray) and item.dtype == object and item.size == 1:
+            item = item.item()
+        out.append(str(np.asarray(item).squeeze()))
+    return out
+
+
+def _read_mat(path: Path) -> Dict[str, object]:
+    """Variables of a .mat file: numeric arrays as-is, cell arrays of strings as lists."""
+    from scipy.io import loadmat
+    try:
+        raw = loadmat(str(path))
+    except NotImplementedError:  # v7.3 -> HDF5
+        return _read_mat_hdf5(path)
+    out = {}
+    for name, value in raw.items():
+        if name.startswith("__") or not isinstance(value, np.ndarray):
+            continue
+        out[name] = _cell_strings(value) if value.dtype == object else value
+    return out
+
+
+def _read_mat_hdf5(path: Path) -> Dict[str, object]:
+    if h5py is None:
+        raise RuntimeError(f"{path.name} is a MATLAB v7.3 file; install h5py to read it")
+    out = {}
+    with h5py.File(str(path), "r") as f:
+        for name, ds in f.items():
+            if name.startswith("#") or not isinstance(ds, h5py.Dataset):
+                continue
+            if ds.dtype == h5py.ref_dtype:  # cell array of strings
+                out[name] = ["".join(chr(c) for c in np.asarray(f[ref]).ravel()) for ref in ds[()].ravel()]
+            else:
+                out[name] = np.asarray(ds).T  # HDF5 stores MATLAB arrays column-major
+    return out
+
+
+def _signature(path: Path) -> List[int]:
+    st = path.stat()
+    return [st.st_size, st.st_mtime_ns]
+
+
+def _normalize_rel(path: str) -> str:
+    return path.replace("\\", "/").lstrip("./")
+
+
+class FeatureStore:
+    """Converted, memory-mapped feature matrices; see the module docstring."""
+
+    def __init__(self, feats_path: Path = FEATS_PATH, data_path: Path = DATA_PATH,
+                 cache_dir: Path = FEATURES_CACHE, images_root: Path = IMAGES_PATH):
+        self.feats_path = Path(feats_path)
+        self.data_path = Path(data_path)
+        self.cache_dir = Path(cache_dir)
+        self.images_root = Path(images_root)
+        self._index: Optional[dict] = None
+        self._rows: Optional[List[str]] = None
+        self._row_of: Optional[Dict[str, int]] = None
+        self._maps: Dict[str, np.ndarray] = {}
+
+    # ------------------------------------------------------------------
+    # Conversion
+
+    def _sources(self) -> List[Path]:
+        return sorted(self.feats_path.glob("*.mat")) if self.feats_path.is_dir() else []
+
+    def _read_index(self) -> Optional[dict]:
+        path = self.cache_dir / "index.json"
+        if not path.exists():
+            return None
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+
+    def is_stale(self) -> bool:
+        index = self._read_index()
+        if index is None or index.get("version") != INDEX_VERSION:
+            return True
+        sources = {p.name: _signature(p) for p in self._sources()}
+        path_file = self.data_path / IMAGE_PATH_FILE
+        if path_file.exists():
+            sources[IMAGE_PATH_FILE] = _signature(path_file)
+        return sources != index.get("sources")
+
+    def ensure(self) -> "FeatureStore":
+        """Convert the .mat files if they changed since the last conversion."""
+        if self.is_stale():
+            self.convert()
+        return self
+
+    def convert(self) -> dict:
+        """Decode every .mat feature file once and write float32 .npy files."""
+        t0 = time.perf_counter()
+        sources = self._sources()
+        if not sources:
+            raise FileNotFoundError(f"No .mat feature files in {self.feats_path} (set DATASET_ROOT)")
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+        rows: List[str] = []
+        path_file = self.data_path / IMAGE_PATH_FILE
+        if path_file.exists():
+            for value in _read_mat(path_file).values():
+                if isinstance(value, list):
+                    rows = [_normalize_rel(p) for p in value]
+                    break
+        if not rows:
+            print(f"[features] {path_file} not found: rows are not aligned to image paths")
+
+        features = {}
+        signatures = {}
+        for src in sources:
+            signatures[src.name] = _signature(src)
+            for var, value in _read_mat(src).items():
+                if isinstance(value, list):
+                    if not rows and len(value) > 1:
+                        rows = [_normalize_rel(p) for p in value]
+                    continue
+                arr = np.asarray(value)
+                if arr.ndim != 2 or not np.issubdtype(arr.dtype, np.number):
+                    continue
+                if rows and arr.shape[0] != len(rows) and arr.shape[1] == len(rows):
+                    arr = arr.T  # stored features-by-images
+                if rows and arr.shape[0] != len(rows):
+                    print(f"[features] skipping {src.name}:{var} {arr.shape} (expected {len(rows)} rows)")
+                    continue
+                name = f"{src.stem}_{var}"
+                np.save(self.cache_dir / f"{name}.npy", np.ascontiguousarray(arr, dtype=np.float32))
+                features[name] = {"source": src.name, "variable": var, "shape": list(arr.shape)}
+                print(f"[features] {name}: {arr.shape}")
+        if path_file.exists():
+            signatures[IMAGE_PATH_FILE] = _signature(path_file)
+
+        with open(self.cache_dir / "rows.json", "w", encoding="utf-8") as f:
+            json.dump(rows, f)
+        index = {"version": INDEX_VERSION, "sources": signatures, "features": features,
+                 "rows": len(rows), "converted_at": time.time()}
+        with open(self.cache_dir / "index.json", "w", encoding="utf-8") as f:
+            json.dump(index, f, indent=2)
+        self._index, self._rows, self._row_of, self._maps = index, rows, None, {}
+        print(f"[features] converted {len(features)} feature sets in {time.perf_counter() - t0:.1f}s")
+        return index
+
+    # ------------------------------------------------------------------
+    # Access
+
+    @property
+    def index(self) -> dict:
+        if self._index is None:
+            self._index = self._read_index() or {"features": {}, "rows": 0}
+        return self._index
+
+    def names(self) -> List[str]:
+        return list(self.index.get("features", {}))
+
+    def load(self, name: str) -> np.ndarray:
+        """(N, D) float32 memmap of one feature set (opened once per store)."""
+        if name not in self._maps:
+            if name not in self.index.get("features", {}):
+                raise KeyError(f"Unknown feature set '{name}' (available: {', '.join(self.names())})")
+            self._maps[name] = np.load(self.cache_dir / f"{name}.npy", mmap_mode="r")
+        return self._maps[name]
+
+    @property
+    def rows(self) -> List[str]:
+        """Relative image path of each feature row (manifest path format)."""
+        if self._rows is None:
+            path = self.cache_dir / "rows.json"
+            self._rows = json.loads(path.read_text(encoding="utf-8")) if path.exists() else []
+        return self._rows
+
+    def _relative(self, path: str) -> str:
+        p = Path(path)
+        if p.is_absolute():
+            try:
+                return p.relative_to(self.images_root).as_posix()
+            except ValueError:
+                return p.as_posix()
+        return _normalize_rel(path)
+
+    def rows_for(self, paths: Iterable[str]) -> np.ndarray:
+        """Feature row per image path (absolute or relative); -1 if the image has no features."""
+        if self._row_of is None:
+            self._row_of = {p: i for i, p in enumerate(self.rows)}
+        return np.array([self._row_of.get(self._relative(p), -1) for p in paths], dtype=np.int64)
+
+    def features_for(self, name: str, paths: Iterable[str]) -> Tuple[np.ndarray, np.ndarray]:
+        """(features, found mask) for image paths; rows without features are zero."""
+        rows = self.rows_for(paths)
+        feats = self.load(name)
+        found = rows >= 0
+        out = np.zeros((len(rows), feats.shape[1]), dtype=np.float32)
+        out[found] = feats[rows[found]]
+        return out, found
+
+    def nearest(self, name: str, query: np.ndarray, k: int = 10, metric: str = "cosine",
+                chunk_size: int = 8192) -> List[Tuple[str, float]]:
+        """k nearest rows to `query`, scanned in chunks over the memmap.
+
+        Returns (relative path or row number, score) with score = cosine
+        similarity (higher is closer) or L2 distance (lower is closer).
+        """
+        feats = self.load(name)
+        query = np.asarray(query, dtype=np.float32).ravel()
+        if metric == "cosine":
+            query = query / (np.linalg.norm(query) + 1e-12)
+        best_rows = np.empty(0, dtype=np.int64)
+        best_scores = np.empty(0, dtype=np.float32)
+        for start in range(0, feats.shape[0], chunk_size):
+            block = np.asarray(feats[start:start + chunk_size])
+            if metric == "cosine":
+                scores = (block @ query) / (np.linalg.norm(block, axis=1) + 1e-12)
+            else:
+                scores = -np.linalg.norm(block - query, axis=1)
+            best_rows = np.concatenate([best_rows, np.arange(start, start + len(block))])
+            best_scores = np.concatenate([best_scores, scores.astype(np.float32)])
+            if len(best_scores) > k:
+                keep = np.argpartition(-best_scores, k)[:k]
+                best_rows, best_scores = best_rows[keep], best_scores[keep]
+        order = np.argsort(-best_scores)
+        rows = self.rows
+        return [(rows[r] if r < len(rows) else str(r),
+                 float(s) if metric == "cosine" else float(-s))
+                for r, s in zip(best_rows[order], best_scores[order])]
@@ -5,15 +5,70 @@ import pandas as pd
 import numpy as np
 from pathlib import Path
 from PIL import Image
-from typing import List, Dict, Tuple, Optional
-import random
+from typing import List, Dict, Tuple, Optional, Iterator
+import re
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from tqdm import tqdm
-import pickle
 
 from config import *
+from .manifest import DatasetManifest
+
+LOADER_WORKERS = int(os.getenv("LOADER_WORKERS", str(min(8, os.cpu_count() or 1))))
+
+
+def _load_image(path: str, size: Optional[Tuple[int, int]]) -> Image.Image:
+    """Open one image as RGB at `size`, white placeholder on error.
+
+    For JPEGs, draft() lets libjpeg decode at the smallest 1/2, 1/4 or 1/8
+    scale that is still >= size, so the LANCZOS pass only covers the last
+    step instead of the full-resolution image.
+    """
+    try:
+        with Image.open(path) as img:
+            if size:
+                img.draft('RGB', size)
+            img = img.convert('RGB')
+        if size and img.size != tuple(size):
+            img = img.resize(size, Image.Resampling.LANCZOS, reducing_gap=3.0)
+        return img
+    except Exception as e:
+        print(f"Error loading {path}: {e}")
+        return Image.new('RGB', tuple(size or IMAGE_SIZE), color='white')
+
+
+def iter_images(image_paths: List[str], size: Optional[Tuple[int, int]] = IMAGE_SIZE,
+                workers: int = LOADER_WORKERS) -> Iterator[Image.Image]:
+    """Decode images on a thread pool, yielding them in input order.
+
+    PIL releases the GIL while decoding and resizing, so threads scale without
+    pickling images back from worker processes. At most 4 x workers images are
+    in flight, so memory stays bounded however long the input is.
+    """
+    if workers <= 1:
+        for path in image_paths:
+            yield _load_image(path, size)
+        return
+    window = workers * 4
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="image-loader") as pool:
+        pending = deque()
+        paths = iter(image_paths)
+        for path in paths:
+            pending.append(pool.submit(_load_image, path, size))
+            if len(pending) >= window:
+                break
+        while pending:
+            yield pending.popleft().result()
+            nxt = next(paths, None)
+            if nxt is not None:
+                pending.append(pool.submit(_load_image, nxt, size))
+
 
 class ZapposDataLoader:
     """Loads and manages UT Zappos50K dataset."""
+
+    MANIFEST_RECHECK_SECONDS = 300.0  # how often `manifest` re-stats the image tree
     
     def __init__(self):
         self.images_path = IMAGES_PATH
@@ -21,26 +76,42 @@ class ZapposDataLoader:
         self.image_paths = []
         self.metadata = None
         self.attributes_data = None
+        self._manifest: Optional[DatasetManifest] = None
+        self._manifest_checked_at: Optional[float] = None
+
+    def _manifest_db(self) -> DatasetManifest:
+        if self._manifest is None:
+            self._manifest = DatasetManifest(self.images_path)
+        return self._manifest
+
+    @property
+    def manifest(self) -> DatasetManifest:
+        """Indexed manifest of the image tree, rebuilt only when a directory changed.
+
+        The staleness check stats every directory, so it runs on first use and
+        then at most every MANIFEST_RECHECK_SECONDS (refresh_manifest() forces it).
+        """
+        now = time.monotonic()
+        if self._manifest_checked_at is None or now - self._manifest_checked_at >= self.MANIFEST_RECHECK_SECONDS:
+            self.refresh_manifest()
+        return self._manifest_db()
+
+    def refresh_manifest(self) -> DatasetManifest:
+        """Check the image tree now and rebuild the manifest if it changed."""
+        manifest = self._manifest_db().ensure()
+        self._manifest_checked_at = time.monotonic()
+        return manifest
         
     def discover_images(self, max_images: int = 1000) -> List[str]:
-        """Discover all image paths in the dataset."""
+        """Discover image paths in the dataset (random sample of up to max_images)."""
         print(f"Discovering images in {self.images_path}")
         
-        image_extensions = {'.jpg', '.jpeg', '.png', '.bmp'}
-        all_paths = []
-        
-        # Walk through the directory structure
-        for root, dirs, files in os.walk(self.images_path):
-            for file in files:
-                if Path(file).suffix.lower() in image_extensions:
-                    full_path = os.path.join(root, file)
-                    all_paths.append(full_path)
-        
-        print(f"Found {len(all_paths)} total images")
+        manifest = self.manifest
+        total = manifest.count()
+        print(f"Found {total} total images")
         
-        # Randomly sample if we have more than max_images
-        if len(all_paths) > max_images:
-            all_paths = random.sample(all_paths, max_images)
+        all_paths = manifest.sample(max_images)
+        if total > max_images:
             print(f"Randomly sampled {max_images} images")
         
         self.image_paths = all_paths
@@ -92,16 +163,20 @@ class ZapposDataLoader:
             }
     
     def create_image_dataframe(self) -> pd.DataFrame:
-        """Create a dataframe with image paths and extracted metadata."""
+        """Create a dataframe with image paths and manifest metadata."""
         if not self.image_paths:
             self.discover_images()
         
-        data = []
-        print("Extracting metadata from image paths...")
-        
-        for img_path in tqdm(self.image_paths):
-            metadata = self.extract_path_metadata(img_path)
-            data.append(metadata)
+        print("Reading metadata from the dataset manifest...")
+        records = self.manifest.records(self.image_paths)
+        known = {r['full_path'] for r in records}
+        # Paths outside the images root fall back to path parsing
+        data = [
+            {'full_path': r['full_path'], 'filename': r['filename'], 'category': r['category'],
+             'subcategory': r['subcategory'], 'brand': r['brand'], 'file_size': r['file_size'],
+             'width': r['width'], 'height': r['height']}
+            for r in records
+        ] + [self.extract_path_metadata(p) for p in self.image_paths if p not in known]
         
         df = pd.DataFrame(data)
         print(f"Created dataframe with {len(df)} images")
@@ -109,52 +184,60 @@ class ZapposDataLoader:
         
         return df
     
-    def load_sample_images(self, image_paths: List[str], size: Tuple[int, int] = IMAGE_SIZE) -> List[Image.Image]:
-        """Load and preprocess a sample of images."""
-        images = []
-        
+    def load_sample_images(self, image_paths: List[str], size: Tuple[int, int] = IMAGE_SIZE,
+                           workers: int = LOADER_WORKERS) -> List[Image.Image]:
+        """Load and preprocess a sample of images (parallel, input order kept)."""
         print(f"Loading {len(image_paths)} images...")
-        for path in tqdm(image_paths):  # Load all provided images
-            try:
-                img = Image.open(path).convert('RGB')
-                if size:
-                    img = img.resize(size, Image.Resampling.LANCZOS)
-                images.append(img)
-            except Exception as e:
-                print(f"Error loading {path}: {e}")
-                # Add a blank image as placeholder
-                images.append(Image.new('RGB', size, color='white'))
-        
-        return images
+        return list(tqdm(iter_images(image_paths, size, workers), total=len(image_paths)))
+
+    def iter_sample_images(self, image_paths: List[str], size: Tuple[int, int] = IMAGE_SIZE,
+                           workers: int = LOADER_WORKERS) -> Iterator[Image.Image]:
+        """Streaming load_sample_images: yields each image as soon as it (and all before it) is ready."""
+        return iter_images(image_paths, size, workers)
+
+    def load_sample_array(self, image_paths: List[str], size: Tuple[int, int] = IMAGE_SIZE,
+                          out: Optional[np.ndarray] = None, workers: int = LOADER_WORKERS) -> np.ndarray:
+        """Load images straight into a (N, height, width, 3) uint8 array.
+
+        Pass `out` to fill a preallocated array (e.g. a np.memmap); it must have
+        exactly that shape and dtype.
+        """
+        width, height = size
+        shape = (len(image_paths), height, width, 3)
+        if out is None:
+            out = np.empty(shape, dtype=np.uint8)
+        elif out.shape != shape or out.dtype != np.uint8:
+            raise ValueError(f"out must be a uint8 array of shape {shape}, got {out.dtype} {out.shape}")
+        print(f"Loading {len(image_paths)} images into a {shape} array...")
+        for i, img in enumerate(tqdm(iter_images(image_paths, size, workers), total=len(image_paths))):
+            out[i] = np.asarray(img)
+        return out
     
     def get_category_sample(self, category: str, n_images: int = 50) -> List[str]:
-        """Get a sample of images from a specific category."""
-        if not self.image_paths:
-            self.discover_images()
-        
-        category_paths = [path for path in self.image_paths 
-                         if category.lower() in path.lower()]
-        
-        if len(category_paths) > n_images:
-            category_paths = random.sample(category_paths, n_images)
+        """Get a sample of images from a category, subcategory or brand (case-insensitive)."""
+        category_paths = self.manifest.find(category, n_images)
         
         print(f"Found {len(category_paths)} images for category '{category}'")
         return category_paths
+
+    @staticmethod
+    def _table_name(filename: str) -> str:
+        return "processed_" + re.sub(r"\W+", "_", Path(filename).stem)
+    
+    def save_processed_data(self, df: pd.DataFrame, filename: str = "processed_dataset"):
+        """Save processed dataframe as a table in the manifest database."""
+        table = self._table_name(filename)
+        df.to_sql(table, self._manifest_db().connect(), if_exists="replace", index=False)
+        print(f"Saved processed data to {MANIFEST_PATH} ({table})")
     
-    def save_processed_data(self, df: pd.DataFrame, filename: str = "processed_dataset.pkl"):
-        """Save processed dataframe to cache."""
-        cache_path = CACHE_DIR / filename
-        with open(cache_path, 'wb') as f:
-            pickle.dump(df, f)
-        print(f"Saved processed data to {cache_path}")
-    
-    def load_processed_data(self, filename: str = "processed_dataset.pkl") -> Optional[pd.DataFrame]:
-        """Load processed dataframe from cache."""
-        cache_path = CACHE_DIR / filename
-        if cache_path.exists():
-            with open(cache_path, 'rb') as f:
-                df = pickle.load(f)
-            print(f"Loaded processed data from {cache_path}")
+    def load_processed_data(self, filename: str = "processed_dataset") -> Optional[pd.DataFrame]:
+        """Load a processed dataframe saved by save_processed_data."""
+        table = self._table_name(filename)
+        conn = self._manifest_db().connect()
+        exists = conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (table,)).fetchone()
+        if exists:
+            df = pd.read_sql(f'SELECT * FROM "{table}"', conn)
+            print(f"Loaded processed data from {MANIFEST_PATH} ({table})")
             return df
         return None
 
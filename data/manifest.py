@@ -0,0 +1,282 @@
+"""Indexed manifest of the UT Zappos50K image tree (SQLite).
+
+Walking 50K files on every query is slow, so the tree is scanned once into
+a SQLite table with one row per image (relative path, category, subcategory,
+brand, file size, width, height) and indexes on the lookup columns:
+
+    manifest = DatasetManifest().ensure()
+    manifest.categories()                      # {"Shoes": 35000, ...}
+    manifest.sample(50, category="Boots")      # random absolute paths
+
+The manifest records the mtime of every directory it scanned. Adding or
+removing a file changes its directory's mtime, so ensure() only has to stat
+the directories (not the files) to notice a stale manifest. A rebuild keeps
+the stored dimensions of files whose size and mtime are unchanged and only
+opens new or modified images (header read, in parallel).
+"""
+
+import os
+import random
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from PIL import Image
+
+from config import IMAGES_PATH, MANIFEST_PATH, ensure_cache_dirs
+
+IMAGE_EXTENSIONS = {'.jpg', '.jpeg', '.png', '.bmp'}
+SCHEMA_VERSION = 1
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS images (
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL UNIQUE,          -- relative to the images root, '/'-separated
+    filename TEXT NOT NULL,
+    category TEXT NOT NULL,
+    subcategory TEXT NOT NULL,
+    brand TEXT NOT NULL,
+    file_size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    width INTEGER,
+    height INTEGER
+);
+CREATE INDEX IF NOT EXISTS idx_images_category ON images(category COLLATE NOCASE, subcategory COLLATE NOCASE);
+CREATE INDEX IF NOT EXISTS idx_images_subcategory ON images(subcategory COLLATE NOCASE);
+CREATE INDEX IF NOT EXISTS idx_images_brand ON images(brand COLLATE NOCASE);
+CREATE TABLE IF NOT EXISTS directories (
+    path TEXT PRIMARY KEY,              -- relative to the images root ('' = root)
+    mtime_ns INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+
+def _image_size(path: str) -> Tuple[Optional[int], Optional[int]]:
+    """Width/height from the image header (PIL decodes lazily)."""
+    try:
+        with Image.open(path) as img:
+            return img.size
+    except Exception:
+        return None, None
+
+
+def _path_fields(rel_path: str) -> Tuple[str, str, str]:
+    """Category / subcategory / brand from 'Category/Subcategory/Brand/file.jpg'."""
+    parts = rel_path.split("/")[:-1]
+    parts += ["Unknown"] * (3 - len(parts))
+    return parts[0], parts[1], parts[2]
+
+
+class DatasetManifest:
+    """SQLite manifest of an image tree; see the module docstring."""
+
+    def __init__(self, images_root: Path = IMAGES_PATH, db_path: Path = MANIFEST_PATH,
+                 probe_workers: int = 8):
+        self.images_root = Path(images_root)
+        self.db_path = Path(db_path)
+        self.probe_workers = probe_workers
+        self._local = threading.local()
+        self._build_lock = threading.Lock()
+
+    # ------------------------------------------------------------------
+    # Connection / freshness
+
+    def connect(self) -> sqlite3.Connection:
+        """Per-thread connection (sqlite3 connections aren't shared across threads)."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            ensure_cache_dirs()
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.db_path))
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+            self._local.conn = conn
+        return conn
+
+    def _meta(self, key: str) -> Optional[str]:
+        row = self.connect().execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def is_stale(self) -> bool:
+        """True if the manifest was never built, is for another root, or a directory changed."""
+        if self._meta("schema_version") != str(SCHEMA_VERSION) or self._meta("root") != str(self.images_root):
+            return True
+        recorded = self.connect().execute("SELECT path, mtime_ns FROM directories").fetchall()
+        if not recorded:
+            return True
+        for rel, mtime_ns in recorded:
+            try:
+                if os.stat(self.images_root / rel).st_mtime_ns != mtime_ns:
+                    return True
+            except OSError:
+                return True
+        return False
+
+    def ensure(self) -> "DatasetManifest":
+        """Build or refresh the manifest if the image tree changed."""
+        if self.is_stale():
+            self.rebuild()
+        return self
+
+    # ------------------------------------------------------------------
+    # Build
+
+    def _scan(self) -> Tuple[List[Tuple[str, int]], List[Tuple[str, int, int]]]:
+        """(directories with mtime, image files with size and mtime), paths relative to the root."""
+        dirs, files = [], []
+        stack = [""]
+        while stack:
+            rel_dir = stack.pop()
+            abs_dir = self.images_root / rel_dir if rel_dir else self.images_root
+            try:
+                dirs.append((rel_dir, os.stat(abs_dir).st_mtime_ns))
+                entries = list(os.scandir(abs_dir))
+            except OSError as e:
+                print(f"[manifest] cannot read {abs_dir}: {e}")
+                continue
+            for entry in entries:
+                rel = f"{rel_dir}/{entry.name}" if rel_dir else entry.name
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(rel)
+                elif Path(entry.name).suffix.lower() in IMAGE_EXTENSIONS:
+                    st = entry.stat()
+                    files.append((rel, st.st_size, st.st_mtime_ns))
+        return dirs, files
+
+    def rebuild(self) -> int:
+        """Rescan the tree; returns the number of images in the manifest."""
+        with self._build_lock:
+            t0 = time.perf_counter()
+            if not self.images_root.is_dir():
+                raise FileNotFoundError(f"Images directory not found: {self.images_root} (set DATASET_ROOT)")
+            dirs, files = self._scan()
+
+            conn = self.connect()
+            known = {path: (size, mtime_ns, w, h) for path, size, mtime_ns, w, h in
+                     conn.execute("SELECT path, file_size, mtime_ns, width, height FROM images")}
+            to_probe = [rel for rel, size, mtime_ns in files
+                        if known.get(rel, (None, None))[:2] != (size, mtime_ns)]
+            with ThreadPoolExecutor(max_workers=self.probe_workers) as pool:
+                probed = dict(zip(to_probe, pool.map(
+                    lambda rel: _image_size(str(self.images_root / rel)), to_probe)))
+
+            rows = []
+            for rel, size, mtime_ns in files:
+                width, height = probed[rel] if rel in probed else known[rel][2:]
+                category, subcategory, brand = _path_fields(rel)
+                rows.append((rel, rel.rsplit("/", 1)[-1], category, subcategory, brand,
+                             size, mtime_ns, width, height))
+
+            with conn:
+                conn.execute("DELETE FROM images")
+                conn.execute("DELETE FROM directories")
+                conn.executemany(
+                    "INSERT INTO images (path, filename, category, subcategory, brand, file_size, mtime_ns, width, height) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+                conn.executemany("INSERT INTO directories (path, mtime_ns) VALUES (?, ?)", dirs)
+                conn.executemany("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", [
+                    ("schema_version", str(SCHEMA_VERSION)),
+                    ("root", str(self.images_root)),
+                    ("built_at", str(time.time())),
+                ])
+            print(f"[manifest] indexed {len(rows)} images in {len(dirs)} directories "
+                  f"({len(to_probe)} probed) in {time.perf_counter() - t0:.1f}s")
+            return len(rows)
+
+    # ------------------------------------------------------------------
+    # Queries
+
+    @staticmethod
+    def _where(category: Optional[str], subcategory: Optional[str], brand: Optional[str]) -> Tuple[str, list]:
+        clauses, params = [], []
+        for column, value in (("category", category), ("subcategory", subcategory), ("brand", brand)):
+            if value:
+                clauses.append(f"{column} = ? COLLATE NOCASE")
+                params.append(value)
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+    def _absolute(self, rel_paths: List[str]) -> List[str]:
+        return [str(self.images_root / rel) for rel in rel_paths]
+
+    def count(self, category: Optional[str] = None, subcategory: Optional[str] = None,
+              brand: Optional[str] = None) -> int:
+        where, params = self._where(category, subcategory, brand)
+        return self.connect().execute(f"SELECT COUNT(*) FROM images{where}", params).fetchone()[0]
+
+    def paths(self, category: Optional[str] = None, subcategory: Optional[str] = None,
+              brand: Optional[str] = None, limit: Optional[int] = None) -> List[str]:
+        """Absolute image paths (in manifest order)."""
+        where, params = self._where(category, subcategory, brand)
+        sql = f"SELECT path FROM images{where} ORDER BY id"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(int(limit))
+        return self._absolute([r[0] for r in self.connect().execute(sql, params)])
+
+    def sample(self, n: int, category: Optional[str] = None, subcategory: Optional[str] = None,
+               brand: Optional[str] = None, seed: Optional[int] = None) -> List[str]:
+        """Up to n random absolute paths matching the filters (reproducible with seed)."""
+        conn = self.connect()
+        where, params = self._where(category, subcategory, brand)
+        ids = [r[0] for r in conn.execute(f"SELECT id FROM images{where}", params)]
+        if len(ids) > n:
+            ids = random.Random(seed).sample(ids, n)
+        if not ids:
+            return []
+        placeholders = ",".join("?" * len(ids))
+        by_id = dict(conn.execute(f"SELECT id, path FROM images WHERE id IN ({placeholders})", ids))
+        return self._absolute([by_id[i] for i in ids])
+
+    def find(self, name: str, n: int, seed: Optional[int] = None) -> List[str]:
+        """Sample images whose category, subcategory or brand is `name` (case-insensitive)."""
+        for column in ("category", "subcategory", "brand"):
+            paths = self.sample(n, seed=seed, **{column: name})
+            if paths:
+                return paths
+        return []
+
+    def categories(self) -> Dict[str, int]:
+        return dict(self.connect().execute(
+            "SELECT category, COUNT(*) FROM images GROUP BY category ORDER BY COUNT(*) DESC"))
+
+    def subcategories(self, category: Optional[str] = None) -> Dict[str, int]:
+        where, params = self._where(category, None, None)
+        return dict(self.connect().execute(
+            f"SELECT subcategory, COUNT(*) FROM images{where} GROUP BY subcategory ORDER BY COUNT(*) DESC", params))
+
+    def brands(self, category: Optional[str] = None, subcategory: Optional[str] = None) -> Dict[str, int]:
+        where, params = self._where(category, subcategory, None)
+        return dict(self.connect().execute(
+            f"SELECT brand, COUNT(*) FROM images{where} GROUP BY brand ORDER BY COUNT(*) DESC", params))
+
+    def records(self, paths: List[str]) -> List[dict]:
+        """Manifest rows for absolute paths (same order; unknown paths are skipped)."""
+        rel = {}
+        for p in paths:
+            try:
+                rel[Path(p).relative_to(self.images_root).as_posix()] = p
+            except ValueError:
+                continue
+        if not rel:
+            return []
+        conn = self.connect()
+        columns = ("path", "filename", "category", "subcategory", "brand", "file_size", "width", "height")
+        found = {}
+        keys = list(rel)
+        for start in range(0, len(keys), 900):  # stay under SQLite's bound-parameter limit
+            chunk = keys[start:start + 900]
+            placeholders = ",".join("?" * len(chunk))
+            for row in conn.execute(f"SELECT {', '.join(columns)} FROM images WHERE path IN ({placeholders})", chunk):
+                found[row[0]] = dict(zip(columns, row))
+        out = []
+        for key, full in rel.items():
+            if key in found:
+                out.append({**found[key], "full_path": full})
+        return out
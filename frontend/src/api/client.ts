@@ -171,7 +171,8 @@ class APIClient {
       return; // Already connected
     }
 
-    this.ws = new WebSocket(WS_URL);
+    const pid = _getParticipantId ? _getParticipantId() : 'researcher';
+    this.ws = new WebSocket(`${WS_URL}?participant_id=${encodeURIComponent(pid)}`);
 
     this.ws.onmessage = (event) => {
       try {
@@ -0,0 +1,299 @@
+"""
+Local stand-ins for the external APIs the backend calls, for load testing
+without spending real Jina / Gemini / fal.ai quota.
+
+One process serves all three:
+  POST /v1/embeddings                           Jina (jina-clip-v2 shape)
+  POST /v1beta/models/{model}:generateContent   Gemini REST
+  POST /{endpoint}                              fal.run (nano-banana*, imageutils/rembg)
+  GET  /_mock/files/{name}.png                  images returned by the fal mock
+  GET  /_mock/stats, POST /_mock/config         counters / change behaviour while running
+
+Each service has its own latency distribution (lognormal, given as median and
+p95 in ms) plus a share of 429s (with Retry-After) and 5xx errors:
+
+  python loadtest/mock_services.py --port 8199 \\
+      --jina-latency 120,400 --gemini-latency 900,2500 --fal-latency 4000,9000 \\
+      --jina-429 0.02 --fal-errors 0.01
+
+Then start the backend with the env printed on startup (JINA_API_URL,
+GEMINI_API_ENDPOINT, FAL_API_BASE and dummy keys).
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import math
+import random
+import re
+from dataclasses import dataclass, asdict
+from io import BytesIO
+from typing import Dict, Optional
+
+import numpy as np
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, Response
+from PIL import Image
+
+EMBEDDING_DIM = 1024
+IMAGE_SIZE = 512
+
+
+@dataclass
+class ServiceProfile:
+    median_ms: float
+    p95_ms: float
+    throttle_rate: float = 0.0   # share of calls answered with 429
+    error_rate: float = 0.0      # share of calls answered with 500/503
+    retry_after_s: float = 1.0
+
+    def sample_latency(self) -> float:
+        """Seconds, lognormal with the configured median and p95."""
+        mu = math.log(max(self.median_ms, 0.1))
+        sigma = max(math.log(max(self.p95_ms, self.median_ms) / max(self.median_ms, 0.1)) / 1.645, 0.0)
+        return random.lognormvariate(mu, sigma) / 1000.0
+
+
+PROFILES: Dict[str, ServiceProfile] = {
+    "jina": ServiceProfile(median_ms=150, p95_ms=450),
+    "gemini": ServiceProfile(median_ms=900, p95_ms=2500),
+    "fal": ServiceProfile(median_ms=3000, p95_ms=8000),
+    "rembg": ServiceProfile(median_ms=800, p95_ms=2000),
+}
+STATS: Dict[str, Dict[str, int]] = {name: {"calls": 0, "throttled": 0, "errors": 0} for name in PROFILES}
+
+app = FastAPI(title="External API mocks (load testing)")
+
+
+async def _simulate(service: str) -> Optional[Response]:
+    """Sleep for the service's latency; return an error response if this call should fail."""
+    profile = PROFILES[service]
+    STATS[service]["calls"] += 1
+    await asyncio.sleep(profile.sample_latency())
+    roll = random.random()
+    if roll < profile.throttle_rate:
+        STATS[service]["throttled"] += 1
+        return JSONResponse(
+            {"error": {"code": 429, "message": f"mock {service}: rate limited"}},
+            status_code=429,
+            headers={"Retry-After": f"{profile.retry_after_s:g}"},
+        )
+    if roll < profile.throttle_rate + profile.error_rate:
+        STATS[service]["errors"] += 1
+        return JSONResponse(
+            {"error": {"code": 503, "message": f"mock {service}: upstream unavailable"}},
+            status_code=random.choice([500, 503]),
+        )
+    return None
+
+
+def _seed(value: str) -> int:
+    return int.from_bytes(hashlib.sha1(value.encode()).digest()[:8], "little")
+
+
+# ─── Jina ───────────────────────────────────────────────────────────────────
+
+def _fake_embedding(key: str) -> list:
+    """Deterministic unit vector per input, so caching/dedup behave as with the real API."""
+    v = np.random.default_rng(_seed(key)).standard_normal(EMBEDDING_DIM).astype(np.float32)
+    return (v / np.linalg.norm(v)).round(6).tolist()
+
+
+@app.post("/v1/embeddings")
+async def jina_embeddings(request: Request):
+    body = await request.json()
+    failure = await _simulate("jina")
+    if failure is not None:
+        return failure
+    data, tokens = [], 0
+    for i, item in enumerate(body.get("input", [])):
+        if isinstance(item, dict):
+            key = item.get("text") or item.get("image") or json.dumps(item, sort_keys=True)
+            tokens += len(item["text"]) // 4 + 1 if "text" in item else 1000
+        else:
+            key = str(item)
+            tokens += len(key) // 4 + 1
+        data.append({"object": "embedding", "index": i, "embedding": _fake_embedding(key[:4096])})
+    return {
+        "model": body.get("model", "jina-clip-v2"),
+        "object": "list",
+        "usage": {"total_tokens": tokens, "prompt_tokens": tokens},
+        "data": data,
+    }
+
+
+# ─── Gemini ─────────────────────────────────────────────────────────────────
+
+_DESCRIPTORS = ["matte leather", "chunky sole", "neon accents", "suede panels", "metallic eyelets",
+                "knit upper", "gum rubber outsole", "patent finish", "contrast stitching", "platform heel"]
+
+
+def _gemini_text(prompt: str) -> str:
+    """Plausible reply for the prompt shapes api.py sends (it parses JSON out of most of them)."""
+    rng = random.Random(_seed(prompt))
+    if "JSON array of strings" in prompt:
+        return json.dumps([f"{d} shoe" for d in rng.sample(_DESCRIPTORS, 4)])
+    if '"suggestions"' in prompt:
+        return json.dumps({"suggestions": [
+            {
+                "prompt": f"A shoe with {a} and {b}",
+                "reasoning": "Fills an empty region of the canvas.",
+                "target_region": f"{a.split()[0]} + {b.split()[0]}",
+                "contrasts_with": "The dense cluster of existing designs.",
+                "gap_index": i,
+            }
+            for i, (a, b) in enumerate(zip(rng.sample(_DESCRIPTORS, 5), rng.sample(_DESCRIPTORS, 5)))
+        ]})
+    if "JSON" in prompt:
+        return json.dumps({"prompt": f"A shoe with {rng.choice(_DESCRIPTORS)}",
+                           "reasoning": "Mock response.", "tags": rng.sample(_DESCRIPTORS, 3)})
+    return f"A shoe with {rng.choice(_DESCRIPTORS)} and {rng.choice(_DESCRIPTORS)}."
+
+
+@app.post("/v1beta/models/{model_action:path}")
+async def gemini_generate(model_action: str, request: Request):
+    body = await request.json()
+    failure = await _simulate("gemini")
+    if failure is not None:
+        return failure
+    prompt = "\n".join(
+        part.get("text", "")
+        for content in body.get("contents", [])
+        for part in content.get("parts", [])
+    )
+    text = _gemini_text(prompt)
+    return {
+        "candidates": [{
+            "content": {"parts": [{"text": text}], "role": "model"},
+            "finishReason": "STOP",
+            "index": 0,
+        }],
+        "usageMetadata": {
+            "promptTokenCount": len(prompt) // 4,
+            "candidatesTokenCount": len(text) // 4,
+            "totalTokenCount": (len(prompt) + len(text)) // 4,
+        },
+        "modelVersion": model_action.split(":", 1)[0],
+    }
+
+
+# ─── Control ────────────────────────────────────────────────────────────────
+
+@app.get("/_mock/stats")
+async def mock_stats():
+    return {"stats": STATS, "profiles": {k: asdict(v) for k, v in PROFILES.items()}}
+
+
+@app.post("/_mock/config")
+async def mock_config(request: Request):
+    """Change a profile at runtime, e.g. {"jina": {"throttle_rate": 0.2}}."""
+    body = await request.json()
+    for service, changes in body.items():
+        if service in PROFILES:
+            for field, value in changes.items():
+                if hasattr(PROFILES[service], field):
+                    setattr(PROFILES[service], field, float(value))
+    return await mock_stats()
+
+
+# ─── fal.ai ─────────────────────────────────────────────────────────────────
+
+def _render_shoe(name: str, transparent: bool) -> bytes:
+    """Procedural product shot: a shaded ellipse on white (or transparent after rembg)."""
+    rng = np.random.default_rng(_seed(name))
+    yy, xx = np.mgrid[0:IMAGE_SIZE, 0:IMAGE_SIZE].astype(np.float32) / IMAGE_SIZE
+    cx, cy = rng.uniform(0.4, 0.6, 2)
+    rx, ry = rng.uniform(0.30, 0.42), rng.uniform(0.15, 0.25)
+    inside = ((xx - cx) / rx) ** 2 + ((yy - cy) / ry) ** 2 <= 1.0
+    shade = (1.0 - 0.5 * yy)[..., None]
+    rgb = np.clip(rng.uniform(40, 220, 3) * shade + rng.normal(0, 12, (IMAGE_SIZE, IMAGE_SIZE, 3)), 0, 255)
+    rgb = np.where(inside[..., None], rgb, 255).astype(np.uint8)
+    if transparent:
+        img = Image.fromarray(np.dstack([rgb, np.where(inside, 255, 0).astype(np.uint8)]), mode="RGBA")
+    else:
+        img = Image.fromarray(rgb, mode="RGB")
+    buf = BytesIO()
+    img.save(buf, format="PNG")
+    return buf.getvalue()
+
+
+@app.get("/_mock/files/{name}.png")
+async def mock_file(name: str):
+    png = await asyncio.to_thread(_render_shoe, name, name.startswith("rembg-"))
+    return Response(png, media_type="image/png")
+
+
+# Catch-all: must stay the last route registered
+@app.post("/{endpoint:path}")
+async def fal_run(endpoint: str, request: Request):
+    body = await request.json()
+    base = str(request.base_url).rstrip("/")
+    if endpoint.endswith("imageutils/rembg"):
+        failure = await _simulate("rembg")
+        if failure is not None:
+            return failure
+        name = "rembg-" + hashlib.sha1(body.get("image_url", "").encode()).hexdigest()[:16]
+        return {"image": {"url": f"{base}/_mock/files/{name}.png", "content_type": "image/png",
+                          "width": IMAGE_SIZE, "height": IMAGE_SIZE}}
+    failure = await _simulate("fal")
+    if failure is not None:
+        return failure
+    seed = random.getrandbits(48)
+    n = max(1, min(int(body.get("num_images", 1) or 1), 8))
+    return {
+        "images": [
+            {"url": f"{base}/_mock/files/gen-{seed:x}-{i}.png", "content_type": "image/png",
+             "width": IMAGE_SIZE, "height": IMAGE_SIZE}
+            for i in range(n)
+        ],
+        "seed": seed,
+        "description": f"mock {endpoint}",
+    }
+
+
+def _parse_latency(value: str):
+    m = re.fullmatch(r"\s*([\d.]+)\s*(?:,\s*([\d.]+)\s*)?", value)
+    if not m:
+        raise argparse.ArgumentTypeError("expected MEDIAN_MS or MEDIAN_MS,P95_MS")
+    median = float(m.group(1))
+    return median, float(m.group(2) or median)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8199)
+    parser.add_argument("--seed", type=int, default=None, help="seed latency/error sampling")
+    for service in PROFILES:
+        parser.add_argument(f"--{service}-latency", type=_parse_latency, metavar="MEDIAN[,P95]",
+                            help=f"ms (default {PROFILES[service].median_ms:g},{PROFILES[service].p95_ms:g})")
+        parser.add_argument(f"--{service}-429", type=float, metavar="RATE", help="share of 429 responses")
+        parser.add_argument(f"--{service}-errors", type=float, metavar="RATE", help="share of 5xx responses")
+    parser.add_argument("--retry-after", type=float, default=1.0, help="Retry-After seconds on 429s")
+    args = parser.parse_args()
+
+    if args.seed is not None:
+        random.seed(args.seed)
+    for service, profile in PROFILES.items():
+        opts = vars(args)
+        if opts[f"{service}_latency"]:
+            profile.median_ms, profile.p95_ms = opts[f"{service}_latency"]
+        if opts[f"{service}_429"] is not None:
+            profile.throttle_rate = opts[f"{service}_429"]
+        if opts[f"{service}_errors"] is not None:
+            profile.error_rate = opts[f"{service}_errors"]
+        profile.retry_after_s = args.retry_after
+
+    base = f"http://{args.host}:{args.port}"
+    print("Start the backend with:")
+    print(f"  JINA_API_URL={base}/v1/embeddings JINA_API_KEY=mock \\")
+    print(f"  GEMINI_API_ENDPOINT={base} GOOGLE_API_KEY=mock GEMINI_API_KEY=mock \\")
+    print(f"  FAL_API_BASE={base} FAL_KEY=mock \\")
+    print("  python backend/api.py")
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
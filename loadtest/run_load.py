@@ -0,0 +1,295 @@
+"""
+Load harness: N simulated participants against a running backend.
+
+Each participant gets its own X-Participant-Id, keeps a /ws websocket open
+(with keep-alive pings, like the frontend) and loops over a weighted mix of
+realistic flows with random think time in between:
+
+  generate   POST /api/fal/run (nano-banana) -> POST /api/add-external-images
+  axes       POST /api/update-axes with a new label pair
+  ghosts     POST /api/agent/suggest-ghosts -> /api/fal/run -> POST /api/embed-ghost
+  session    POST /api/sessions/save -> GET /api/sessions/list -> POST /api/sessions/load
+  state      GET /api/state
+
+Point the backend at loadtest/mock_services.py first (see README.md), then:
+
+  python loadtest/run_load.py --base-url http://127.0.0.1:8000 --participants 20 --duration 120
+
+Prints count / errors / p50 / p95 / p99 / max latency per endpoint, plus the
+backend's event-loop lag (from /api/admin/loop-lag) over the run. --json
+writes the same report to a file for comparing runs.
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import time
+from collections import defaultdict
+from typing import Dict, List, Optional
+
+import httpx
+import numpy as np
+import websockets
+
+AXIS_PAIRS = [
+    ("formal", "sporty"), ("dark", "colorful"), ("casual", "elegant"), ("minimal", "ornate"),
+    ("rugged", "delicate"), ("vintage", "futuristic"), ("flat", "high heel"), ("leather", "mesh"),
+]
+PROMPTS = [
+    "a minimalist white leather sneaker", "a chunky trail running shoe", "a patent leather oxford",
+    "a suede chelsea boot", "a neon basketball shoe", "a woven summer sandal", "a platform loafer",
+]
+DEFAULT_MIX = "generate=3,axes=2,ghosts=1,session=1,state=4"
+
+
+class Recorder:
+    """Latency samples and failures per endpoint."""
+
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Dict[str, int] = defaultdict(int)
+        self.statuses: Dict[str, Dict[int, int]] = defaultdict(lambda: defaultdict(int))
+
+    def record(self, name: str, seconds: float, status: Optional[int], ok: bool) -> None:
+        self.latencies[name].append(seconds)
+        self.statuses[name][status or 0] += 1
+        if not ok:
+            self.errors[name] += 1
+
+    def report(self) -> Dict[str, dict]:
+        out = {}
+        for name in sorted(self.latencies):
+            ms = np.array(self.latencies[name]) * 1000.0
+            p50, p95, p99 = np.percentile(ms, [50, 95, 99])
+            out[name] = {
+                "count": len(ms),
+                "errors": self.errors[name],
+                "p50_ms": round(float(p50), 1),
+                "p95_ms": round(float(p95), 1),
+                "p99_ms": round(float(p99), 1),
+                "max_ms": round(float(ms.max()), 1),
+                "statuses": dict(self.statuses[name]),
+            }
+        return out
+
+
+class Participant:
+    def __init__(self, pid: str, args, recorder: Recorder):
+        self.pid = pid
+        self.args = args
+        self.rec = recorder
+        self.client = httpx.AsyncClient(
+            base_url=args.base_url,
+            headers={"X-Participant-Id": pid},
+            timeout=args.timeout,
+        )
+        self.ws_messages = 0
+
+    async def call(self, method: str, path: str, **kwargs) -> Optional[httpx.Response]:
+        """Timed request; a failure is recorded and returns None instead of raising."""
+        name = f"{method} {path}"
+        t0 = time.perf_counter()
+        try:
+            resp = await self.client.request(method, path, **kwargs)
+        except httpx.HTTPError as e:
+            self.rec.record(name, time.perf_counter() - t0, None, False)
+            if self.args.verbose:
+                print(f"[{self.pid}] {name}: {type(e).__name__}: {e}")
+            return None
+        ok = resp.status_code < 400
+        self.rec.record(name, time.perf_counter() - t0, resp.status_code, ok)
+        if not ok and self.args.verbose:
+            print(f"[{self.pid}] {name}: {resp.status_code} {resp.text[:200]}")
+        return resp if ok else None
+
+    # ─── Flows ──────────────────────────────────────────────────────────────
+
+    async def _generate_urls(self, prompt: str, n: int) -> List[str]:
+        resp = await self.call("POST", "/api/fal/run", json={
+            "endpoint": "fal-ai/nano-banana",
+            "input": {"prompt": prompt, "num_images": n, "output_format": "png"},
+        })
+        if resp is None:
+            return []
+        return [img["url"] for img in resp.json().get("images", []) if img.get("url")]
+
+    async def flow_generate(self) -> None:
+        prompt = random.choice(PROMPTS)
+        urls = await self._generate_urls(prompt, random.randint(1, self.args.batch_size))
+        if urls:
+            await self.call("POST", "/api/add-external-images", json={
+                "images": [{"url": u} for u in urls],
+                "prompt": prompt,
+                "generation_method": "batch",
+                "remove_background": random.random() < self.args.rembg_share,
+            })
+
+    async def flow_axes(self) -> None:
+        x, y = random.sample(AXIS_PAIRS, 2)
+        await self.call("POST", "/api/update-axes", json={
+            "x_negative": x[0], "x_positive": x[1],
+            "y_negative": y[0], "y_positive": y[1],
+        })
+
+    async def flow_ghosts(self) -> None:
+        resp = await self.call("POST", "/api/agent/suggest-ghosts", json={
+            "brief": "Explore bold athletic shoe designs", "num_suggestions": 3,
+        })
+        ghosts = resp.json().get("ghosts", []) if resp is not None else []
+        if not ghosts:
+            return
+        urls = await self._generate_urls(ghosts[0].get("suggested_prompt") or random.choice(PROMPTS), 1)
+        if urls:
+            await self.call("POST", "/api/embed-ghost", json={"image_url": urls[0]})
+
+    async def flow_session(self) -> None:
+        if await self.call("POST", "/api/sessions/save") is None:
+            return
+        resp = await self.call("GET", "/api/sessions/list")
+        if resp is None:
+            return
+        body = resp.json()
+        canvas_id = body.get("lastActiveCanvasId") or next(
+            (s.get("id") for s in body.get("sessions", []) if s.get("id")), None)
+        if canvas_id:
+            await self.call("POST", "/api/sessions/load", json={"canvas_id": canvas_id})
+
+    async def flow_state(self) -> None:
+        await self.call("GET", "/api/state")
+
+    # ─── Lifecycle ──────────────────────────────────────────────────────────
+
+    async def _websocket(self, stop: asyncio.Event) -> None:
+        ws_url = self.args.base_url.replace("http", "ws", 1).rstrip("/") + f"/ws?participant_id={self.pid}"
+        try:
+            async with websockets.connect(ws_url, extra_headers={"X-Participant-Id": self.pid}) as ws:
+                async def reader():
+                    async for _ in ws:
+                        self.ws_messages += 1
+                read_task = asyncio.ensure_future(reader())
+                while not stop.is_set():
+                    await ws.send("ping")
+                    try:
+                        await asyncio.wait_for(stop.wait(), timeout=self.args.ws_ping)
+                    except asyncio.TimeoutError:
+                        pass
+                read_task.cancel()
+        except Exception as e:
+            self.rec.record("WS /ws", 0.0, None, False)
+            if self.args.verbose:
+                print(f"[{self.pid}] websocket: {type(e).__name__}: {e}")
+
+    async def run(self, mix: Dict[str, float], deadline: float, stop: asyncio.Event) -> None:
+        ws_task = asyncio.ensure_future(self._websocket(stop))
+        try:
+            await self.call("POST", "/api/initialize-clip-only")
+            flows, weights = list(mix), list(mix.values())
+            while time.monotonic() < deadline:
+                flow = random.choices(flows, weights)[0]
+                await getattr(self, f"flow_{flow}")()
+                await asyncio.sleep(random.expovariate(1000.0 / self.args.think_ms) if self.args.think_ms else 0)
+        finally:
+            stop.set()
+            await ws_task
+            await self.client.aclose()
+
+
+def _parse_mix(value: str) -> Dict[str, float]:
+    mix = {}
+    for part in value.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if not hasattr(Participant, f"flow_{name}"):
+            raise argparse.ArgumentTypeError(f"unknown flow '{name}'")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+async def _admin_get(args, path: str, **params) -> Optional[dict]:
+    async with httpx.AsyncClient(base_url=args.base_url, timeout=10) as client:
+        try:
+            resp = await client.get(path, params={"admin_key": args.admin_key, **params})
+            return resp.json() if resp.status_code == 200 else None
+        except httpx.HTTPError:
+            return None
+
+
+def _print_report(report: dict) -> None:
+    print(f"\n{'endpoint':<38} {'count':>6} {'err':>5} {'p50':>9} {'p95':>9} {'p99':>9} {'max':>9}")
+    for name, r in report["endpoints"].items():
+        print(f"{name:<38} {r['count']:>6} {r['errors']:>5} {r['p50_ms']:>7.0f}ms "
+              f"{r['p95_ms']:>7.0f}ms {r['p99_ms']:>7.0f}ms {r['max_ms']:>7.0f}ms")
+    lag = report.get("loop_lag")
+    if lag and lag.get("probes"):
+        print(f"\nevent-loop lag ({lag['probes']} probes every {lag['interval_ms']:.0f}ms): "
+              f"p50 {lag['p50_ms']:.1f}ms  p95 {lag['p95_ms']:.1f}ms  p99 {lag['p99_ms']:.1f}ms  "
+              f"max {lag['max_ms']:.1f}ms")
+    else:
+        print("\nevent-loop lag: unavailable (check --admin-key)")
+    print(f"\n{report['participants']} participants, {report['duration_s']:.0f}s, "
+          f"{report['requests']} requests ({report['requests'] / max(report['duration_s'], 1e-9):.1f} req/s), "
+          f"{report['ws_messages']} websocket messages")
+
+
+async def main_async(args) -> dict:
+    mix = _parse_mix(args.mix)
+    recorder = Recorder()
+    await _admin_get(args, "/api/admin/loop-lag", reset="true")
+
+    participants = [Participant(f"{args.prefix}{i:03d}", args, recorder) for i in range(args.participants)]
+    stops = [asyncio.Event() for _ in participants]
+    start = time.monotonic()
+    deadline = start + args.duration
+    tasks = []
+    for p, stop in zip(participants, stops):
+        tasks.append(asyncio.ensure_future(p.run(mix, deadline, stop)))
+        await asyncio.sleep(args.ramp_up / max(len(participants), 1))
+    await asyncio.gather(*tasks)
+    elapsed = time.monotonic() - start
+
+    endpoints = recorder.report()
+    return {
+        "participants": args.participants,
+        "duration_s": elapsed,
+        "mix": mix,
+        "requests": sum(r["count"] for r in endpoints.values()),
+        "ws_messages": sum(p.ws_messages for p in participants),
+        "endpoints": endpoints,
+        "loop_lag": await _admin_get(args, "/api/admin/loop-lag"),
+        "rate_limits": await _admin_get(args, "/api/admin/rate-limits"),
+        "embedding_batching": await _admin_get(args, "/api/admin/embedding-batching"),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--participants", type=int, default=10)
+    parser.add_argument("--duration", type=float, default=60.0, help="seconds of load per participant")
+    parser.add_argument("--ramp-up", type=float, default=5.0, help="seconds to start all participants")
+    parser.add_argument("--think-ms", type=float, default=1500.0, help="mean pause between flows")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help=f"flow weights (default {DEFAULT_MIX})")
+    parser.add_argument("--batch-size", type=int, default=4, help="max images per generate flow")
+    parser.add_argument("--rembg-share", type=float, default=0.5, help="share of generations with remove_background")
+    parser.add_argument("--ws-ping", type=float, default=20.0, help="websocket keep-alive interval (s)")
+    parser.add_argument("--timeout", type=float, default=300.0)
+    parser.add_argument("--prefix", default="load_", help="participant id prefix")
+    parser.add_argument("--admin-key", default="zappos-admin")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--json", dest="json_path", help="also write the report to this file")
+    parser.add_argument("-v", "--verbose", action="store_true", help="print every failed request")
+    args = parser.parse_args()
+
+    if args.seed is not None:
+        random.seed(args.seed)
+    report = asyncio.run(main_async(args))
+    _print_report(report)
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"report written to {args.json_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,8 @@
 # models/__init__.py
 """Machine learning models for embedding extraction and semantic analysis."""
 
-from .embeddings import CLIPEmbedder, HuggingFaceCLIPEmbedder
-from .semantic_axes import SemanticAxisBuilder, SemanticAxis, create_default_axes
+from .embeddings import CLIPEmbedder, HuggingFaceCLIPEmbedder, EmbeddingDispatcher
+from .semantic_axes import SemanticAxisBuilder, SemanticAxis, AxisBank, OnlineAxisLearner, PCABasis, create_default_axes
 from .data_structures import ImageMetadata, HistoryGroup
 
-__all__ = ['CLIPEmbedder', 'HuggingFaceCLIPEmbedder', 'SemanticAxisBuilder', 'SemanticAxis', 'create_default_axes', 'ImageMetadata', 'HistoryGroup']
+__all__ = ['CLIPEmbedder', 'HuggingFaceCLIPEmbedder', 'EmbeddingDispatcher', 'SemanticAxisBuilder', 'SemanticAxis', 'AxisBank', 'OnlineAxisLearner', 'PCABasis', 'create_default_axes', 'ImageMetadata', 'HistoryGroup']
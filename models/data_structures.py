@@ -8,6 +8,8 @@ from datetime import datetime
 import base64
 from io import BytesIO
 
+from .telemetry import OPERATION_LATENCY, record_cache
+
 
 @dataclass
 class ImageMetadata:
@@ -46,6 +48,25 @@ class ImageMetadata:
     shoe_view: str = 'side'    # 'side', '3/4-front', '3/4-back'
     parent_side_id: int = -1   # For 3/4 satellites: ID of parent side-view shoe (-1 = none)
     _cached_base64_url: Optional[str] = field(default=None, repr=False)
+    _cached_png: Optional[bytes] = field(default=None, repr=False)
+
+    def get_png_bytes(self) -> bytes:
+        """Get the PNG encoding of pil_image, encoding once and caching the bytes.
+
+        pil_image is never mutated after creation, so the cached bytes stay
+        valid for the lifetime of this object (API responses, saves and
+        exports all share one encode).
+
+        Returns:
+            PNG file bytes
+        """
+        record_cache("png", self._cached_png is not None)
+        if self._cached_png is None:
+            with OPERATION_LATENCY.time(operation="png_encode"):
+                buffered = BytesIO()
+                self.pil_image.save(buffered, format="PNG")
+                self._cached_png = buffered.getvalue()
+        return self._cached_png
 
     def get_base64_url(self, size: Optional[Tuple[int, int]] = None) -> str:
         """Get cached base64 URL for this image, generating if needed.
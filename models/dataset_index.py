@@ -0,0 +1,272 @@
+"""Dataset-scale image embeddings and an IVF index for nearest real products.
+
+Offline job (embeds every image in the dataset manifest; resumable):
+
+    python -m models.dataset_index build [--limit N] [--batch-size 32]
+    python -m models.dataset_index ivf [--nlist 256]      # retrain the index only
+    python -m models.dataset_index query path/to/image.jpg
+
+Layout of cache/dataset_index/:
+
+    embeddings.npy   (N, D) float16 memmap of L2-normalized embeddings
+    rows.json        relative path, category, subcategory, brand per row
+    meta.json        model, dim, rows embedded so far, images root
+    ivf_*.npy        centroids, row order grouped by list, list offsets
+
+The index is an inverted file (IVF): spherical k-means splits the rows into
+`nlist` lists; a query scores the centroids, scans only the `nprobe` best
+lists and re-ranks those candidates exactly against the memmap. With ~sqrt(N)
+lists and nprobe=8 that is a few thousand dot products for 50K images.
+Failed embeddings (zero rows) are left out of the lists.
+"""
+
+import json
+import sys
+import time
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from config import DATASET_INDEX_DIR
+
+DEFAULT_NPROBE = 8
+EMBED_IMAGE_SIZE = (512, 512)  # what the embedder downsizes to anyway
+
+
+def _normalize_rows(x: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(x, axis=1, keepdims=True)
+    return x / np.maximum(norms, 1e-12)
+
+
+def _spherical_kmeans(x: np.ndarray, k: int, iters: int = 20, seed: int = 0) -> np.ndarray:
+    """Unit-norm centroids maximizing cosine similarity to their rows."""
+    rng = np.random.default_rng(seed)
+    centroids = x[rng.choice(len(x), k, replace=False)].copy()
+    for _ in range(iters):
+        assign = np.argmax(x @ centroids.T, axis=1)
+        counts = np.bincount(assign, minlength=k)
+        sums = np.zeros_like(centroids)
+        nonempty = np.flatnonzero(counts)
+        starts = (np.cumsum(counts) - counts)[nonempty]
+        sums[nonempty] = np.add.reduceat(x[np.argsort(assign, kind="stable")], starts, axis=0)
+        empty = counts == 0
+        if empty.any():  # reseed empty lists with random rows
+            sums[empty] = x[rng.choice(len(x), int(empty.sum()), replace=False)]
+        centroids = _normalize_rows(sums)
+    return centroids
+
+
+class DatasetEmbeddingIndex:
+    """Read side: memmapped embeddings + IVF lists (see module docstring)."""
+
+    def __init__(self, directory: Path = DATASET_INDEX_DIR):
+        self.directory = Path(directory)
+        with open(self.directory / "meta.json", encoding="utf-8") as f:
+            self.meta = json.load(f)
+        with open(self.directory / "rows.json", encoding="utf-8") as f:
+            self.rows: List[dict] = json.load(f)
+        self.embeddings = np.load(self.directory / "embeddings.npy", mmap_mode="r")
+        self.count = int(self.meta.get("done", 0))
+        self.images_root = Path(self.meta.get("images_root", ""))
+        ivf = self.directory / "ivf_centroids.npy"
+        if ivf.exists():
+            self.centroids = np.load(ivf)
+            self.order = np.load(self.directory / "ivf_order.npy")
+            self.offsets = np.load(self.directory / "ivf_offsets.npy")
+        else:
+            self.centroids = self.order = self.offsets = None
+
+    @staticmethod
+    def exists(directory: Path = DATASET_INDEX_DIR) -> bool:
+        return (Path(directory) / "meta.json").exists() and (Path(directory) / "embeddings.npy").exists()
+
+    @property
+    def model(self) -> str:
+        return self.meta.get("model", "")
+
+    @property
+    def dim(self) -> int:
+        return int(self.embeddings.shape[1])
+
+    def record(self, row: int) -> dict:
+        return self.rows[row]
+
+    def _top_k(self, candidates: np.ndarray, query: np.ndarray, k: int) -> List[Tuple[int, float]]:
+        if len(candidates) == 0:
+            return []
+        candidates = np.sort(candidates)  # sequential memmap reads
+        scores = np.asarray(self.embeddings[candidates], dtype=np.float32) @ query
+        if len(scores) > k:
+            keep = np.argpartition(-scores, k)[:k]
+            candidates, scores = candidates[keep], scores[keep]
+        order = np.argsort(-scores)
+        return [(int(candidates[i]), float(scores[i])) for i in order]
+
+    def search(self, query: np.ndarray, k: int = 10, nprobe: int = DEFAULT_NPROBE) -> List[Tuple[int, float]]:
+        """Approximate top-k (row, cosine similarity); exact when no IVF has been built."""
+        query = np.asarray(query, dtype=np.float32).ravel()
+        query = query / (np.linalg.norm(query) + 1e-12)
+        if self.centroids is None:
+            return self.search_exact(query, k)
+        nprobe = max(1, min(nprobe, len(self.centroids)))
+        probe = np.argpartition(-(self.centroids @ query), nprobe - 1)[:nprobe]
+        candidates = np.concatenate([self.order[self.offsets[c]:self.offsets[c + 1]] for c in probe])
+        return self._top_k(candidates, query, k)
+
+    def search_exact(self, query: np.ndarray, k: int = 10, chunk_size: int = 16384) -> List[Tuple[int, float]]:
+        """Brute-force top-k over all embedded rows (for small sets and recall checks)."""
+        query = np.asarray(query, dtype=np.float32).ravel()
+        query = query / (np.linalg.norm(query) + 1e-12)
+        best: List[Tuple[int, float]] = []
+        for start in range(0, self.count, chunk_size):
+            rows = np.arange(start, min(start + chunk_size, self.count))
+            best = sorted(best + self._top_k(rows, query, k), key=lambda rs: -rs[1])[:k]
+        return best
+
+    # ------------------------------------------------------------------
+    # Build side
+
+    def build_ivf(self, nlist: Optional[int] = None, train_size: int = 50_000,
+                  iters: int = 20, seed: int = 0, chunk_size: int = 16384) -> int:
+        """Train the IVF lists on the embedded rows and write ivf_*.npy."""
+        t0 = time.perf_counter()
+        valid = []
+        for start in range(0, self.count, chunk_size):
+            block = np.asarray(self.embeddings[start:min(start + chunk_size, self.count)], dtype=np.float32)
+            valid.append(start + np.flatnonzero(np.linalg.norm(block, axis=1) > 1e-6))
+        valid = np.concatenate(valid) if valid else np.empty(0, dtype=np.int64)
+        if len(valid) == 0:
+            raise ValueError("No embedded rows to index")
+        nlist = nlist or max(1, int(np.sqrt(len(valid))))
+        nlist = min(nlist, len(valid))
+
+        rng = np.random.default_rng(seed)
+        train_rows = np.sort(rng.choice(valid, min(train_size, len(valid)), replace=False))
+        train = _normalize_rows(np.asarray(self.embeddings[train_rows], dtype=np.float32))
+        centroids = _spherical_kmeans(train, nlist, iters, seed).astype(np.float32)
+
+        assign = np.empty(len(valid), dtype=np.int32)
+        for start in range(0, len(valid), chunk_size):
+            rows = valid[start:start + chunk_size]
+            assign[start:start + len(rows)] = np.argmax(
+                np.asarray(self.embeddings[rows], dtype=np.float32) @ centroids.T, axis=1)
+        by_list = np.argsort(assign, kind="stable")
+        order = valid[by_list].astype(np.int64)
+        offsets = np.zeros(nlist + 1, dtype=np.int64)
+        offsets[1:] = np.cumsum(np.bincount(assign, minlength=nlist))
+
+        np.save(self.directory / "ivf_centroids.npy", centroids)
+        np.save(self.directory / "ivf_order.npy", order)
+        np.save(self.directory / "ivf_offsets.npy", offsets)
+        self.centroids, self.order, self.offsets = centroids, order, offsets
+        self.meta.update({"nlist": nlist, "indexed": int(len(valid)), "ivf_built_at": time.time()})
+        _write_meta(self.directory, self.meta)
+        print(f"[dataset-index] IVF: {len(valid)} rows in {nlist} lists ({time.perf_counter() - t0:.1f}s)")
+        return nlist
+
+
+def _write_meta(directory: Path, meta: dict) -> None:
+    tmp = directory / "meta.json.tmp"
+    tmp.write_text(json.dumps(meta, indent=2), encoding="utf-8")
+    tmp.replace(directory / "meta.json")
+
+
+def embed_dataset(embedder, manifest, directory: Path = DATASET_INDEX_DIR, batch_size: int = 32,
+                  limit: Optional[int] = None, dtype: str = "float16", seed: int = 0) -> DatasetEmbeddingIndex:
+    """Offline job: embed manifest images into embeddings.npy, resuming a previous run.
+
+    The row set (all images, or a seeded sample of `limit`) is fixed on the
+    first run; rerunning continues after the last completed batch as long as
+    the model and rows are unchanged.
+    """
+    from data.loader import iter_images
+
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    model = getattr(embedder, "model_name", type(embedder).__name__)
+    meta_path = directory / "meta.json"
+    meta = json.loads(meta_path.read_text(encoding="utf-8")) if meta_path.exists() else {}
+    rows_path = directory / "rows.json"
+
+    resume = (meta.get("model") == model and meta.get("dtype") == dtype and rows_path.exists()
+              and (directory / "embeddings.npy").exists())
+    if resume:
+        rows = json.loads(rows_path.read_text(encoding="utf-8"))
+        emb = np.load(directory / "embeddings.npy", mmap_mode="r+")
+        print(f"[dataset-index] resuming at {meta.get('done', 0)}/{len(rows)}")
+    else:
+        paths = manifest.sample(limit, seed=seed) if limit else manifest.paths()
+        rows = manifest.records(paths)
+        if not rows:
+            raise ValueError(f"No images in the dataset manifest ({manifest.images_root})")
+        for r in rows:
+            del r["full_path"]
+        rows_path.write_text(json.dumps(rows), encoding="utf-8")
+        emb = None  # allocated once the first batch tells us the dimension
+        meta = {"model": model, "dtype": dtype, "rows": len(rows), "done": 0,
+                "images_root": str(manifest.images_root), "started_at": time.time()}
+
+    t0 = time.perf_counter()
+    done = start = int(meta.get("done", 0))
+    todo = [str(manifest.images_root / r["path"]) for r in rows[done:]]
+    images = iter_images(todo, EMBED_IMAGE_SIZE)
+    while done < len(rows):
+        batch = [next(images) for _ in range(min(batch_size, len(rows) - done))]
+        vectors = _normalize_rows(np.asarray(embedder.extract_image_embeddings_from_pil(batch), dtype=np.float32))
+        if emb is None:
+            emb = np.lib.format.open_memmap(directory / "embeddings.npy", mode="w+", dtype=dtype,
+                                            shape=(len(rows), vectors.shape[1]))
+            meta["dim"] = int(vectors.shape[1])
+        emb[done:done + len(batch)] = vectors.astype(dtype)
+        done += len(batch)
+        emb.flush()
+        meta["done"] = done
+        _write_meta(directory, meta)
+        rate = (done - start) / max(time.perf_counter() - t0, 1e-9)
+        print(f"[dataset-index] {done}/{len(rows)} embedded ({rate:.1f} img/s)")
+    meta["finished_at"] = time.time()
+    _write_meta(directory, meta)
+    del emb
+    return DatasetEmbeddingIndex(directory)
+
+
+def main(argv: List[str]) -> None:
+    import argparse
+    parser = argparse.ArgumentParser(description="Build / query the dataset embedding index")
+    sub = parser.add_subparsers(dest="command", required=True)
+    build = sub.add_parser("build", help="embed the dataset (resumable) and train the IVF index")
+    build.add_argument("--limit", type=int, default=None, help="embed a seeded random sample of this size")
+    build.add_argument("--batch-size", type=int, default=32)
+    build.add_argument("--dtype", choices=["float16", "float32"], default="float16")
+    build.add_argument("--nlist", type=int, default=None)
+    ivf = sub.add_parser("ivf", help="retrain the IVF lists only")
+    ivf.add_argument("--nlist", type=int, default=None)
+    query = sub.add_parser("query", help="nearest dataset images to an image file")
+    query.add_argument("image")
+    query.add_argument("-k", type=int, default=10)
+    query.add_argument("--nprobe", type=int, default=DEFAULT_NPROBE)
+    args = parser.parse_args(argv)
+
+    if args.command == "build":
+        from data.manifest import DatasetManifest
+        from models.embeddings import CLIPEmbedder
+        index = embed_dataset(CLIPEmbedder(), DatasetManifest().ensure(), batch_size=args.batch_size,
+                              limit=args.limit, dtype=args.dtype)
+        index.build_ivf(args.nlist)
+    elif args.command == "ivf":
+        DatasetEmbeddingIndex().build_ivf(args.nlist)
+    else:
+        from PIL import Image
+        from models.embeddings import CLIPEmbedder
+        index = DatasetEmbeddingIndex()
+        vec = CLIPEmbedder().extract_image_embeddings_from_pil([Image.open(args.image).convert("RGB")])[0]
+        t0 = time.perf_counter()
+        hits = index.search(vec, args.k, args.nprobe)
+        print(f"{len(hits)} results in {(time.perf_counter() - t0) * 1000:.1f} ms")
+        for row, score in hits:
+            print(f"{score:.4f}  {index.record(row)['path']}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -12,16 +12,25 @@ Fallback: CLIPEmbedder falls back to zeros if the API is unreachable,
 import os
 import base64
 import time
+import asyncio
 import numpy as np
+import threading
 import requests as http_requests
+from requests.adapters import HTTPAdapter
+from collections import OrderedDict
 from io import BytesIO
-from typing import List, Union, Optional
+from typing import List, Union, Optional, Tuple, Dict, Set
 from PIL import Image
 from pathlib import Path
 import pickle
 import hashlib
 from dotenv import load_dotenv
 
+from .rate_limit import get_limiter, parse_retry_after
+from .singleflight import SingleFlight, AsyncSingleFlight
+from .telemetry import track_call, record_external_error, record_cache
+from .tracing import traced
+
 load_dotenv()
 
 # ------------------------------------------------------------------
@@ -29,8 +38,22 @@ load_dotenv()
 # ------------------------------------------------------------------
 EMBEDDING_DIM = 1024          # jina-clip-v2 native dimension
 EMBEDDINGS_CACHE = Path("cache/embeddings")
-JINA_API_URL = "https://api.jina.ai/v1/embeddings"
+JINA_API_URL = os.getenv("JINA_API_URL", "https://api.jina.ai/v1/embeddings")  # override to hit a mock (loadtest/)
 JINA_MODEL = "jina-clip-v2"
+RETRY_DELAYS = [5, 10, 20]    # back-off on timeout / network error; default 429 pause without Retry-After
+JINA_IMAGE_TOKENS = int(os.getenv("JINA_IMAGE_TOKENS", "1000"))  # approx. token cost of one 512px image
+JINA_POOL_SIZE = int(os.getenv("JINA_POOL_SIZE", "16"))             # keep-alive connections per embedder
+TEXT_EMBED_MEMORY_CACHE = int(os.getenv("TEXT_EMBED_MEMORY_CACHE", "1024"))  # in-memory text results (in front of disk)
+
+_jina_limiter = get_limiter("jina")  # shared by every embedder in the process
+# Identical concurrent text-embedding calls share one request
+_text_flight = SingleFlight("jina-text")
+_atext_flight = AsyncSingleFlight("jina-text")
+
+# Cross-request micro-batching (see EmbeddingDispatcher)
+EMBED_BATCH_WINDOW_MS = float(os.getenv("EMBED_BATCH_WINDOW_MS", "5"))
+EMBED_BATCH_MAX_INPUTS = int(os.getenv("EMBED_BATCH_MAX_INPUTS", "64"))
+EMBED_BATCH_MAX_BYTES = int(os.getenv("EMBED_BATCH_MAX_BYTES", str(4 * 1024 * 1024)))
 
 
 class JinaCLIPEmbedder:
@@ -46,6 +69,8 @@ class JinaCLIPEmbedder:
     """
 
     def __init__(self):
+        self.model_name = JINA_MODEL
+        self.dispatcher: Optional["EmbeddingDispatcher"] = None  # async calls batch through this when set
         self.api_key = os.getenv("JINA_API_KEY", "")
         if not self.api_key:
             print("⚠️  JINA_API_KEY not set — embeddings will return zeros.")
@@ -54,6 +79,14 @@ class JinaCLIPEmbedder:
             "Authorization": f"Bearer {self.api_key}",
             "Content-Type": "application/json",
         }
+        # One embedder is shared by every participant (see initialize_embedder in
+        # backend/api.py), so its keep-alive pool and memory cache are too
+        self._session = http_requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=JINA_POOL_SIZE)
+        self._session.mount("https://", adapter)
+        self._session.mount("http://", adapter)
+        self._text_memory: "OrderedDict[tuple, np.ndarray]" = OrderedDict()
+        self._text_memory_lock = threading.Lock()
         EMBEDDINGS_CACHE.mkdir(parents=True, exist_ok=True)
         print(f"🔌 Jina CLIP v2 embedder ready ({JINA_MODEL}, dim={EMBEDDING_DIM})")
 
@@ -84,34 +117,75 @@ class JinaCLIPEmbedder:
         # Return raw base64 (no data URI prefix) — Jina API expects {"image": "<raw b64>"}
         return base64.b64encode(buf.getvalue()).decode()
 
-    def _post(self, payload: dict) -> Optional[dict]:
-        """POST to the Jina embeddings endpoint with retry on rate-limit."""
-        if not self.api_key:
-            return None
-        for attempt, delay in enumerate([5, 10, 20]):
-            try:
-                r = http_requests.post(
+    def _estimate_tokens(self, payload: dict) -> int:
+        """Rough Jina token count for the tokens/min limiter (≈4 chars/token, fixed cost per image)."""
+        total = 0
+        for inp in payload.get("input", []):
+            if "text" in inp:
+                total += len(inp["text"]) // 4 + 1
+            else:
+                total += JINA_IMAGE_TOKENS
+        return total
+
+    @traced("jina.request")
+    def _post_once(self, payload: dict, attempt: int, delay: float) -> Tuple[bool, Optional[dict], float]:
+        """One POST to the Jina embeddings endpoint (the caller has already acquired the limiter).
+
+        Returns (retry, response, backoff): when retry is True the caller should
+        wait `backoff` seconds, re-acquire the limiter and try again. On 429 the
+        pause is applied through the shared limiter (Retry-After if sent,
+        otherwise `delay`), so backoff is 0.
+        """
+        try:
+            with track_call("jina", "embeddings"):
+                r = self._session.post(
                     JINA_API_URL,
                     headers=self.headers,
                     json=payload,
                     timeout=90,
                 )
-                if r.status_code == 429:
-                    print(f"⏳ Jina rate limit, waiting {delay}s… (attempt {attempt+1}/3)")
-                    time.sleep(delay)
-                    continue
-                if r.status_code != 200:
-                    print(f"⚠️ Jina API error {r.status_code}: {r.text[:300]}")
-                    return None
-                return r.json()
-            except http_requests.exceptions.Timeout:
-                print(f"⚠️ Jina request timed out (attempt {attempt+1}/3)")
-                if attempt < 2:
-                    time.sleep(delay)
-            except Exception as e:
-                print(f"⚠️ Jina request error: {e}")
-                if attempt < 2:
-                    time.sleep(delay)
+            if r.status_code != 200:
+                record_external_error("jina", f"http_{r.status_code}")
+            if r.status_code == 429:
+                print(f"⏳ Jina rate limit (attempt {attempt+1}/{len(RETRY_DELAYS)})")
+                _jina_limiter.report_throttled(parse_retry_after(r.headers.get("Retry-After")), fallback=delay)
+                return True, None, 0.0
+            if r.status_code != 200:
+                print(f"⚠️ Jina API error {r.status_code}: {r.text[:300]}")
+                return False, None, 0.0
+            _jina_limiter.report_success()
+            return False, r.json(), 0.0
+        except http_requests.exceptions.Timeout:
+            print(f"⚠️ Jina request timed out (attempt {attempt+1}/{len(RETRY_DELAYS)})")
+        except Exception as e:
+            print(f"⚠️ Jina request error: {e}")
+        return attempt < len(RETRY_DELAYS) - 1, None, delay
+
+    def _post(self, payload: dict) -> Optional[dict]:
+        """POST to the Jina embeddings endpoint with retry on rate-limit (blocking)."""
+        if not self.api_key:
+            return None
+        tokens = self._estimate_tokens(payload)
+        for attempt, delay in enumerate(RETRY_DELAYS):
+            _jina_limiter.acquire(tokens)
+            retry, resp, backoff = self._post_once(payload, attempt, delay)
+            if not retry:
+                return resp
+            time.sleep(backoff)
+        return None
+
+    async def _apost(self, payload: dict) -> Optional[dict]:
+        """Async _post: the request runs on a worker thread and limiter waits /
+        retries use asyncio.sleep, so a rate-limit stall never blocks the event loop."""
+        if not self.api_key:
+            return None
+        tokens = self._estimate_tokens(payload)
+        for attempt, delay in enumerate(RETRY_DELAYS):
+            await _jina_limiter.aacquire(tokens)
+            retry, resp, backoff = await asyncio.to_thread(self._post_once, payload, attempt, delay)
+            if not retry:
+                return resp
+            await asyncio.sleep(backoff)
         return None
 
     def _extract_embeddings(self, resp: Optional[dict], count: int) -> np.ndarray:
@@ -131,36 +205,99 @@ class JinaCLIPEmbedder:
             content = "|".join(data if preserve_order else sorted(data))
         return hashlib.md5(f"{JINA_MODEL}|{content}".encode()).hexdigest()
 
+    def _text_cache_file(self, texts: List[str]) -> Path:
+        cache_key = self.create_cache_key(texts, preserve_order=False)
+        return EMBEDDINGS_CACHE / f"jina_texts_{cache_key}.pkl"
+
+    def _text_memory_get(self, texts: List[str]) -> Optional[np.ndarray]:
+        key = tuple(texts)
+        with self._text_memory_lock:
+            result = self._text_memory.get(key)
+            if result is not None:
+                self._text_memory.move_to_end(key)
+        record_cache("jina_text_memory", result is not None)
+        return result
+
+    def _text_memory_put(self, texts: List[str], result: np.ndarray) -> None:
+        if not np.all(np.linalg.norm(result, axis=1) > 1e-6):
+            return  # don't pin API failures (zero rows) in memory
+        with self._text_memory_lock:
+            self._text_memory[tuple(texts)] = result
+            self._text_memory.move_to_end(tuple(texts))
+            while len(self._text_memory) > TEXT_EMBED_MEMORY_CACHE:
+                self._text_memory.popitem(last=False)
+
+    def _text_payload(self, texts: List[str]) -> dict:
+        return {
+            "model": JINA_MODEL,
+            "normalized": True,
+            "task": "retrieval.query",   # text axes are queries
+            "input": [{"text": t} for t in texts],
+        }
+
+    @traced("prepare_image_b64")
+    def _prepare_pil_inputs(self, pil_images: List[Image.Image]) -> List[Optional[dict]]:
+        """Jina inputs for in-memory images (None where preparation failed)."""
+        inputs: List[Optional[dict]] = []
+        for img in pil_images:
+            try:
+                b64 = self._prepare_image_b64(img)
+                inputs.append({"image": b64})
+            except Exception as e:
+                print(f"⚠️ PIL image prep error: {e}")
+                inputs.append(None)
+        return inputs
+
+    def _merge_valid_rows(self, inputs: List[Optional[dict]], valid_rows: np.ndarray) -> np.ndarray:
+        """Scatter embeddings of the valid inputs back into input order (zeros for failures)."""
+        all_embeddings: List[np.ndarray] = []
+        vi = 0
+        for inp in inputs:
+            if inp is None:
+                all_embeddings.append(np.zeros(EMBEDDING_DIM, dtype=np.float32))
+            else:
+                all_embeddings.append(valid_rows[vi])
+                vi += 1
+        return self._normalize(np.vstack(all_embeddings))
+
     # ------------------------------------------------------------------
     # Public API (same interface as the old CLIPEmbedder)
     # ------------------------------------------------------------------
 
+    def _text_flight_key(self, texts: List[str], use_cache: bool) -> tuple:
+        return (self.api_key, JINA_MODEL, tuple(texts), use_cache)
+
     def extract_text_embeddings(self, texts: List[str], use_cache: bool = True) -> np.ndarray:
         """Embed a list of text strings into the shared CLIP space."""
         if not texts:
             return np.zeros((0, EMBEDDING_DIM), dtype=np.float32)
+        return _text_flight.do(
+            self._text_flight_key(texts, use_cache),
+            lambda: self._extract_text_embeddings(texts, use_cache),
+        )
 
+    def _extract_text_embeddings(self, texts: List[str], use_cache: bool) -> np.ndarray:
         if use_cache:
-            cache_key = self.create_cache_key(texts, preserve_order=False)
-            cache_file = EMBEDDINGS_CACHE / f"jina_texts_{cache_key}.pkl"
+            result = self._text_memory_get(texts)
+            if result is not None:
+                return result
+            cache_file = self._text_cache_file(texts)
+            record_cache("jina_text", cache_file.exists())
             if cache_file.exists():
                 with open(cache_file, "rb") as f:
-                    return pickle.load(f)
+                    result = pickle.load(f)
+                self._text_memory_put(texts, result)
+                return result
 
         print(f"🚀 Jina CLIP: embedding {len(texts)} texts…")
-        payload = {
-            "model": JINA_MODEL,
-            "normalized": True,
-            "task": "retrieval.query",   # text axes are queries
-            "input": [{"text": t} for t in texts],
-        }
-        resp = self._post(payload)
+        resp = self._post(self._text_payload(texts))
         arr = self._extract_embeddings(resp, len(texts))
         result = self._normalize(arr)
 
         if use_cache:
             with open(cache_file, "wb") as f:
                 pickle.dump(result, f)
+            self._text_memory_put(texts, result)
         return result
 
     def extract_image_embeddings(
@@ -176,6 +313,7 @@ class JinaCLIPEmbedder:
         if use_cache:
             cache_key = self.create_cache_key(image_paths, preserve_order=True)
             cache_file = EMBEDDINGS_CACHE / f"jina_images_{cache_key}.pkl"
+            record_cache("jina_image", cache_file.exists())
             if cache_file.exists():
                 print(f"✅ Cached Jina embeddings for {len(image_paths)} images")
                 with open(cache_file, "rb") as f:
@@ -222,32 +360,206 @@ class JinaCLIPEmbedder:
         if not pil_images:
             return np.zeros((0, EMBEDDING_DIM), dtype=np.float32)
 
-        inputs: List[Optional[dict]] = []
-        for img in pil_images:
-            try:
-                b64 = self._prepare_image_b64(img)
-                inputs.append({"image": b64})
-            except Exception as e:
-                print(f"⚠️ PIL image prep error: {e}")
-                inputs.append(None)
-
+        inputs = self._prepare_pil_inputs(pil_images)
         valid = [inp for inp in inputs if inp is not None]
         if not valid:
             return np.zeros((len(pil_images), EMBEDDING_DIM), dtype=np.float32)
 
         resp = self._post({"model": JINA_MODEL, "normalized": True, "task": "retrieval.query", "input": valid})
         valid_rows = self._extract_embeddings(resp, len(valid))
+        return self._merge_valid_rows(inputs, valid_rows)
 
-        all_embeddings: List[np.ndarray] = []
-        vi = 0
-        for inp in inputs:
-            if inp is None:
-                all_embeddings.append(np.zeros(EMBEDDING_DIM, dtype=np.float32))
-            else:
-                all_embeddings.append(valid_rows[vi])
-                vi += 1
+    # ------------------------------------------------------------------
+    # Async API (for the FastAPI server — never blocks the event loop)
+    # ------------------------------------------------------------------
 
-        return self._normalize(np.vstack(all_embeddings))
+    @traced("jina.embed")
+    async def _aembed_inputs(self, inputs: List[dict], task: str = "retrieval.query") -> np.ndarray:
+        """Raw (count, EMBEDDING_DIM) rows for Jina inputs; zeros where the API failed.
+
+        Goes through the shared dispatcher when one is attached, so small
+        requests from concurrent callers are merged into one API call.
+        """
+        if not self.api_key:
+            return np.zeros((len(inputs), EMBEDDING_DIM), dtype=np.float32)
+        if self.dispatcher is not None:
+            return await self.dispatcher.embed(self, inputs, task)
+        resp = await self._apost({"model": JINA_MODEL, "normalized": True, "task": task, "input": inputs})
+        return self._extract_embeddings(resp, len(inputs))
+
+    async def aextract_text_embeddings(self, texts: List[str], use_cache: bool = True) -> np.ndarray:
+        """Async extract_text_embeddings (shares the same on-disk cache)."""
+        if not texts:
+            return np.zeros((0, EMBEDDING_DIM), dtype=np.float32)
+        return await _atext_flight.do(
+            self._text_flight_key(texts, use_cache),
+            lambda: self._aextract_text_embeddings(texts, use_cache),
+        )
+
+    async def _aextract_text_embeddings(self, texts: List[str], use_cache: bool) -> np.ndarray:
+        if use_cache:
+            result = self._text_memory_get(texts)
+            if result is not None:
+                return result
+            cache_file = self._text_cache_file(texts)
+            record_cache("jina_text", cache_file.exists())
+            if cache_file.exists():
+                with open(cache_file, "rb") as f:
+                    result = pickle.load(f)
+                self._text_memory_put(texts, result)
+                return result
+
+        print(f"🚀 Jina CLIP: embedding {len(texts)} texts…")
+        arr = await self._aembed_inputs(self._text_payload(texts)["input"])
+        result = self._normalize(arr)
+
+        if use_cache:
+            with open(cache_file, "wb") as f:
+                pickle.dump(result, f)
+            self._text_memory_put(texts, result)
+        return result
+
+    async def aextract_image_embeddings_from_pil(self, pil_images: List[Image.Image]) -> np.ndarray:
+        """Async extract_image_embeddings_from_pil; resize/JPEG prep runs on a worker thread."""
+        if not pil_images:
+            return np.zeros((0, EMBEDDING_DIM), dtype=np.float32)
+
+        inputs = await asyncio.to_thread(self._prepare_pil_inputs, pil_images)
+        valid = [inp for inp in inputs if inp is not None]
+        if not valid:
+            return np.zeros((len(pil_images), EMBEDDING_DIM), dtype=np.float32)
+
+        valid_rows = await self._aembed_inputs(valid)
+        return self._merge_valid_rows(inputs, valid_rows)
+
+
+# ------------------------------------------------------------------
+# Cross-request micro-batching
+# ------------------------------------------------------------------
+
+class _EmbedRequest:
+    """One caller's inputs waiting in the dispatcher."""
+
+    __slots__ = ("embedder", "inputs", "sizes", "rows", "remaining", "future")
+
+    def __init__(self, embedder: JinaCLIPEmbedder, inputs: List[dict], future: "asyncio.Future"):
+        self.embedder = embedder
+        self.inputs = inputs
+        self.sizes = [len(inp.get("text") or inp.get("image") or "") for inp in inputs]
+        self.rows = np.zeros((len(inputs), EMBEDDING_DIM), dtype=np.float32)
+        self.remaining = len(inputs)
+        self.future = future
+
+
+class EmbeddingDispatcher:
+    """
+    Merges embedding requests from all participants into shared Jina calls.
+
+    Callers await embed(); inputs arriving within `window_ms` of each other
+    for the same (API key, task) are packed into requests of at most
+    `max_inputs` inputs / `max_bytes` of payload (text and image inputs can
+    share one call — jina-clip-v2 embeds both into the same space). Each
+    caller gets back exactly its own rows, in order. A single caller larger
+    than the limits is split across several calls.
+
+    Must be used from one event loop (the server's).
+    """
+
+    def __init__(self, window_ms: float = EMBED_BATCH_WINDOW_MS,
+                 max_inputs: int = EMBED_BATCH_MAX_INPUTS,
+                 max_bytes: int = EMBED_BATCH_MAX_BYTES):
+        self.window = max(window_ms, 0.0) / 1000.0
+        self.max_inputs = max(max_inputs, 1)
+        self.max_bytes = max(max_bytes, 1)
+        self._pending: Dict[tuple, List[_EmbedRequest]] = {}
+        self._pending_inputs: Dict[tuple, int] = {}
+        self._pending_bytes: Dict[tuple, int] = {}
+        self._timers: Dict[tuple, asyncio.TimerHandle] = {}
+        self._tasks: Set[asyncio.Task] = set()  # in-flight sends (the loop only holds tasks weakly)
+        self.calls = 0          # Jina requests sent
+        self.inputs_sent = 0    # inputs across those requests
+        self.callers = 0        # embed() calls served
+
+    async def embed(self, embedder: JinaCLIPEmbedder, inputs: List[dict], task: str = "retrieval.query") -> np.ndarray:
+        """Queue `inputs` and wait for their (len(inputs), EMBEDDING_DIM) raw rows."""
+        if not inputs:
+            return np.zeros((0, EMBEDDING_DIM), dtype=np.float32)
+        loop = asyncio.get_running_loop()
+        req = _EmbedRequest(embedder, inputs, loop.create_future())
+        key = (embedder.api_key, task)
+        self._pending.setdefault(key, []).append(req)
+        self._pending_inputs[key] = self._pending_inputs.get(key, 0) + len(inputs)
+        self._pending_bytes[key] = self._pending_bytes.get(key, 0) + sum(req.sizes)
+        self.callers += 1
+
+        if self._pending_inputs[key] >= self.max_inputs or self._pending_bytes[key] >= self.max_bytes:
+            self._flush(key)
+        elif key not in self._timers:
+            self._timers[key] = loop.call_later(self.window, self._flush, key)
+        return await req.future
+
+    def stats(self) -> dict:
+        return {
+            "calls": self.calls,
+            "inputs_sent": self.inputs_sent,
+            "callers": self.callers,
+            "pending_inputs": sum(self._pending_inputs.values()),
+        }
+
+    def _flush(self, key: tuple) -> None:
+        timer = self._timers.pop(key, None)
+        if timer is not None:
+            timer.cancel()
+        requests = self._pending.pop(key, [])
+        self._pending_inputs.pop(key, None)
+        self._pending_bytes.pop(key, None)
+        for batch in self._pack(requests):
+            task = asyncio.ensure_future(self._send(key[1], batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    def _pack(self, requests: List[_EmbedRequest]) -> List[List[Tuple[_EmbedRequest, int]]]:
+        """Split (request, input index) slots into batches within the size limits."""
+        batches: List[List[Tuple[_EmbedRequest, int]]] = []
+        batch: List[Tuple[_EmbedRequest, int]] = []
+        batch_bytes = 0
+        for req in requests:
+            for i, size in enumerate(req.sizes):
+                if batch and (len(batch) >= self.max_inputs or batch_bytes + size > self.max_bytes):
+                    batches.append(batch)
+                    batch, batch_bytes = [], 0
+                batch.append((req, i))
+                batch_bytes += size
+        if batch:
+            batches.append(batch)
+        return batches
+
+    async def _send(self, task: str, batch: List[Tuple[_EmbedRequest, int]]) -> None:
+        live = [(req, i) for req, i in batch if not req.future.done()]  # skip cancelled callers
+        if not live:
+            return
+        embedder = live[0][0].embedder
+        payload = {
+            "model": JINA_MODEL,
+            "normalized": True,
+            "task": task,
+            "input": [req.inputs[i] for req, i in live],
+        }
+        self.calls += 1
+        self.inputs_sent += len(live)
+        try:
+            resp = await embedder._apost(payload)
+            rows = embedder._extract_embeddings(resp, len(live))
+        except Exception as e:
+            for req, _ in live:
+                if not req.future.done():
+                    req.future.set_exception(e)
+            return
+        for (req, i), row in zip(live, rows):
+            req.rows[i] = row
+            req.remaining -= 1
+            if req.remaining == 0 and not req.future.done():
+                req.future.set_result(req.rows)
 
 
 # ------------------------------------------------------------------
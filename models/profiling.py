@@ -0,0 +1,258 @@
+"""
+Opt-in request profiling for diagnosing slow requests.
+
+RequestProfiler decides which requests to profile, runs the profiler and
+stores the result:
+
+  - off by default; enable with PROFILE_REQUESTS=1 or at runtime through
+    the admin endpoint (POST /api/admin/profiling)
+  - a request is profiled when its path matches one of `routes` (fnmatch
+    patterns, e.g. "/api/update-axes" or "/api/sessions/*"); with no
+    patterns every request is profiled and only the ones slower than
+    `threshold_ms` are kept
+  - uses pyinstrument (statistical sampler, HTML report) when installed,
+    otherwise cProfile (.prof for snakeviz/pstats + a text summary)
+  - one request is profiled at a time, so overhead stays bounded
+  - pyinstrument runs with async_mode="strict": time other tasks spend on
+    the loop while the request awaits shows up as <out-of-context>, not as
+    the request's own frames. cProfile cannot separate them: every coroutine
+    that runs on the loop during the request's awaits lands in its profile.
+    Such profiles are marked "possibly contaminated" (header of the .txt and
+    `contaminated` in list_profiles) when other requests overlapped it
+  - profiles are written to <dir>/<timestamp>_<participant>_<route>_<ms>ms.*
+    and the oldest are pruned beyond `max_profiles`
+
+Only the event-loop thread is sampled: time a handler spends awaiting
+asyncio.to_thread work shows up as waiting in the await, not as the
+worker's own frames.
+"""
+
+import cProfile
+import io
+import os
+import pstats
+import re
+import threading
+from datetime import datetime
+from fnmatch import fnmatch
+from pathlib import Path
+from typing import List, Optional
+
+try:
+    from pyinstrument import Profiler as _PyinstrumentProfiler
+except ImportError:  # optional dependency
+    _PyinstrumentProfiler = None
+
+PROFILE_EXTENSIONS = (".html", ".prof", ".txt")
+
+
+def _slug(value: str, limit: int = 60, allowed: str = "A-Za-z0-9_-") -> str:
+    """Filename-safe and dot-free (file names are split on the extension)."""
+    return re.sub(f"[^{allowed}]+", "-", value).strip("-")[:limit] or "root"
+
+
+class _Session:
+    """One running profile (pyinstrument or cProfile)."""
+
+    def __init__(self, backend: str):
+        self.backend = backend
+        self.overlapping = 0  # other requests in flight at some point during this one
+        if backend == "pyinstrument":
+            self._profiler = _PyinstrumentProfiler(async_mode="strict")
+        else:
+            self._profiler = cProfile.Profile()
+
+    @property
+    def contaminated(self) -> bool:
+        """cProfile profiles include other requests' frames when they overlapped."""
+        return self.backend == "cprofile" and self.overlapping > 0
+
+    def start(self) -> None:
+        if self.backend == "pyinstrument":
+            self._profiler.start()
+        else:
+            self._profiler.enable()
+
+    def stop(self) -> None:
+        if self.backend == "pyinstrument":
+            self._profiler.stop()
+        else:
+            self._profiler.disable()
+
+    def write(self, base: Path, header: str) -> List[Path]:
+        """Write the report files next to `base` (no extension). Blocking."""
+        paths = []
+        if self.backend == "pyinstrument":
+            html = base.parent / (base.name + ".html")
+            html.write_text(self._profiler.output_html(), encoding="utf-8")
+            paths.append(html)
+            text = self._profiler.output_text(unicode=True, color=False)
+        else:
+            prof = base.parent / (base.name + ".prof")
+            self._profiler.dump_stats(str(prof))
+            paths.append(prof)
+            buf = io.StringIO()
+            stats = pstats.Stats(self._profiler, stream=buf)
+            stats.sort_stats("cumulative").print_stats(60)
+            text = buf.getvalue()
+        txt = base.parent / (base.name + ".txt")
+        txt.write_text(header + "\n\n" + text, encoding="utf-8")
+        paths.append(txt)
+        return paths
+
+
+class RequestProfiler:
+    def __init__(self, directory: Path, enabled: bool = False, threshold_ms: float = 1000.0,
+                 routes: Optional[List[str]] = None, max_profiles: int = 200):
+        self.directory = Path(directory)
+        self.enabled = enabled
+        self.threshold_ms = threshold_ms
+        self.routes: List[str] = list(routes or [])
+        self.max_profiles = max_profiles
+        self.backend = "pyinstrument" if _PyinstrumentProfiler is not None else "cprofile"
+        self._busy = threading.Lock()
+        self._inflight_lock = threading.Lock()
+        self._inflight = 0
+        self._active: Optional[_Session] = None
+        self.profiled = 0
+        self.saved = 0
+        self.skipped_busy = 0
+        self.contaminated = 0
+
+    @classmethod
+    def from_env(cls, directory: Path) -> "RequestProfiler":
+        return cls(
+            directory,
+            enabled=os.getenv("PROFILE_REQUESTS", "0").lower() in ("1", "true", "yes", "on"),
+            threshold_ms=float(os.getenv("PROFILE_THRESHOLD_MS", "1000")),
+            routes=[r.strip() for r in os.getenv("PROFILE_ROUTES", "").split(",") if r.strip()],
+            max_profiles=int(os.getenv("PROFILE_MAX_FILES", "200")),
+        )
+
+    # ------------------------------------------------------------------
+
+    def config(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "threshold_ms": self.threshold_ms,
+            "routes": self.routes,
+            "max_profiles": self.max_profiles,
+            "backend": self.backend,
+            "directory": str(self.directory),
+            "profiled": self.profiled,
+            "saved": self.saved,
+            "skipped_busy": self.skipped_busy,
+            "contaminated": self.contaminated,
+        }
+
+    def configure(self, enabled: Optional[bool] = None, threshold_ms: Optional[float] = None,
+                  routes: Optional[List[str]] = None) -> dict:
+        if enabled is not None:
+            self.enabled = enabled
+        if threshold_ms is not None:
+            self.threshold_ms = max(float(threshold_ms), 0.0)
+        if routes is not None:
+            self.routes = [r.strip() for r in routes if r and r.strip()]
+        return self.config()
+
+    def matches_route(self, path: str) -> bool:
+        return any(fnmatch(path, pattern) for pattern in self.routes)
+
+    def request_started(self) -> None:
+        """Called for every request (profiled or not) to detect overlap."""
+        with self._inflight_lock:
+            self._inflight += 1
+            if self._active is not None:
+                self._active.overlapping += 1
+
+    def request_finished(self) -> None:
+        with self._inflight_lock:
+            self._inflight -= 1
+
+    def begin(self, path: str) -> Optional[_Session]:
+        """Start profiling this request if it qualifies; None otherwise.
+        Call after request_started() for the same request."""
+        if not self.enabled or (self.routes and not self.matches_route(path)):
+            return None
+        if not self._busy.acquire(blocking=False):
+            self.skipped_busy += 1
+            return None
+        session = _Session(self.backend)
+        try:
+            session.start()
+        except Exception as e:  # e.g. another profiler/tracer already active
+            self._busy.release()
+            print(f"[profiling] could not start {self.backend}: {e}")
+            return None
+        with self._inflight_lock:
+            session.overlapping = self._inflight - 1
+            self._active = session
+        self.profiled += 1
+        return session
+
+    def end(self, session: _Session, elapsed_ms: float) -> bool:
+        """Stop the profiler. Returns True if the profile should be kept."""
+        try:
+            session.stop()
+        finally:
+            with self._inflight_lock:
+                self._active = None
+            self._busy.release()
+        return elapsed_ms >= self.threshold_ms
+
+    def save(self, session: _Session, participant_id: str, method: str, path: str,
+             route: str, status: int, elapsed_ms: float) -> List[Path]:
+        """Write the profile and prune old ones. Blocking (run on a worker thread)."""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        stamp = datetime.now().strftime("%Y%m%dT%H%M%S_%f")
+        route_slug = _slug(route, allowed="A-Za-z0-9-")  # no "_": it separates the name fields
+        base = self.directory / f"{stamp}_{_slug(participant_id, 40)}_{route_slug}_{int(elapsed_ms)}ms"
+        header = (f"{method} {path} (route {route}) -> {status}\n"
+                  f"participant: {participant_id}\nelapsed: {elapsed_ms:.1f} ms\n"
+                  f"captured: {datetime.now().isoformat()} with {session.backend}")
+        if session.contaminated:
+            header += (f"\nPOSSIBLY CONTAMINATED: {session.overlapping} other request(s) overlapped this one; "
+                       "cProfile includes their frames")
+            self.contaminated += 1
+        paths = session.write(base, header)
+        self.saved += 1
+        self._prune()
+        return paths
+
+    def _prune(self) -> None:
+        stems = sorted({p.stem for p in self.directory.iterdir() if p.suffix in PROFILE_EXTENSIONS})
+        for stem in stems[:max(len(stems) - self.max_profiles, 0)]:
+            for ext in PROFILE_EXTENSIONS:
+                (self.directory / f"{stem}{ext}").unlink(missing_ok=True)
+
+    def list_profiles(self) -> List[dict]:
+        """Newest first: one entry per profile with its files."""
+        if not self.directory.is_dir():
+            return []
+        entries = {}
+        for p in self.directory.iterdir():
+            if p.suffix not in PROFILE_EXTENSIONS:
+                continue
+            st = p.stat()
+            entry = entries.setdefault(p.stem, {"id": p.stem, "files": [], "size": 0, "mtime": st.st_mtime})
+            entry["files"].append(p.name)
+            entry["size"] += st.st_size
+            if p.suffix == ".txt":
+                with open(p, encoding="utf-8", errors="replace") as f:
+                    entry["contaminated"] = "POSSIBLY CONTAMINATED" in "".join(f.readline() for _ in range(6))
+            m = re.match(r"^(\d{8}T\d{6})_\d+_(.+)_([^_]+)_(\d+)ms$", p.stem)
+            if m:
+                entry.update({
+                    "captured_at": datetime.strptime(m.group(1), "%Y%m%dT%H%M%S").isoformat(),
+                    "participant_id": m.group(2),
+                    "route": m.group(3),
+                    "elapsed_ms": int(m.group(4)),
+                })
+        return sorted(entries.values(), key=lambda e: e["id"], reverse=True)
+
+    def profile_path(self, filename: str) -> Optional[Path]:
+        """Resolve a profile file by name (no path traversal)."""
+        if Path(filename).name != filename or Path(filename).suffix not in PROFILE_EXTENSIONS:
+            return None
+        path = self.directory / filename
+        return path if path.is_file() else None
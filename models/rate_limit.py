@@ -0,0 +1,186 @@
+"""
+Process-wide rate limiting for external APIs (Jina, Gemini, fal.ai).
+
+Every call to an external service first acquires from that service's
+RateLimiter, shared by all participants in the process:
+
+  - requests/s bucket (with a small burst) and an optional tokens/min bucket
+  - reservation style: each caller books its slot up front and sleeps until
+    it comes round, so waiters are served in arrival order
+  - adaptive (AIMD): a 429 halves the effective request rate and blocks the
+    service until Retry-After (or the caller's back-off) has passed;
+    successes creep the rate back up to the configured ceiling
+  - sync acquire() for worker threads / scripts, async aacquire() for the
+    event loop — both share the same state
+
+Limits come from env vars, e.g. RATE_LIMIT_JINA_RPS=5,
+RATE_LIMIT_JINA_TPM=1000000, RATE_LIMIT_GEMINI_RPS=4, RATE_LIMIT_FAL_RPS=10
+(TPM 0 = no token limit).
+"""
+
+import os
+import time
+import asyncio
+import threading
+from email.utils import parsedate_to_datetime
+from typing import Dict, Optional
+
+
+_DEFAULT_LIMITS = {
+    # service: (requests/s, tokens/min, burst)
+    "jina": (5.0, 1_000_000, 5),
+    "gemini": (4.0, 0, 4),
+    "fal": (10.0, 0, 10),
+}
+
+MIN_RATE_FRACTION = 0.1   # adaptive rate never drops below this share of the configured rps
+RECOVERY_STEP = 0.05      # share of the configured rps regained per successful call
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP date)."""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        return max(parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+    except Exception:
+        return None
+
+
+class RateLimiter:
+    """Token-bucket limiter for one external service (thread- and asyncio-safe)."""
+
+    def __init__(self, name: str, requests_per_sec: float, tokens_per_min: float = 0, burst: int = 1):
+        self.name = name
+        self.base_rate = max(float(requests_per_sec), 1e-3)
+        self.rate = self.base_rate
+        self.burst = max(int(burst), 1)
+        self.tokens_per_min = float(tokens_per_min or 0)
+        self._lock = threading.Lock()
+        now = time.monotonic()
+        self._req_level = float(self.burst)       # may go negative: outstanding reservations
+        self._tok_level = self.tokens_per_min
+        self._updated = now
+        self._blocked_until = 0.0
+        # Stats
+        self.waiting = 0
+        self.acquired = 0
+        self.throttled = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    # ------------------------------------------------------------------
+
+    def _refill(self, now: float) -> None:
+        elapsed = now - self._updated
+        self._updated = now
+        self._req_level = min(self._req_level + elapsed * self.rate, float(self.burst))
+        if self.tokens_per_min:
+            self._tok_level = min(self._tok_level + elapsed * self.tokens_per_min / 60.0, self.tokens_per_min)
+
+    def _reserve(self, tokens: float) -> float:
+        """Book one request (+ tokens) and return how long the caller must wait."""
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            self._req_level -= 1.0
+            delay = -self._req_level / self.rate if self._req_level < 0 else 0.0
+            if self.tokens_per_min and tokens:
+                tokens = min(tokens, self.tokens_per_min)  # a single oversized call still goes through
+                self._tok_level -= tokens
+                if self._tok_level < 0:
+                    delay = max(delay, -self._tok_level * 60.0 / self.tokens_per_min)
+            delay = max(delay, self._blocked_until - now)
+            self.acquired += 1
+            self.total_wait += delay
+            self.max_wait = max(self.max_wait, delay)
+            return delay
+
+    def acquire(self, tokens: float = 0) -> float:
+        """Block until a request may be sent. Returns seconds waited."""
+        delay = self._reserve(tokens)
+        if delay > 0:
+            with self._lock:
+                self.waiting += 1
+            try:
+                time.sleep(delay)
+            finally:
+                with self._lock:
+                    self.waiting -= 1
+        return delay
+
+    async def aacquire(self, tokens: float = 0) -> float:
+        """Async acquire: waits with asyncio.sleep. Returns seconds waited."""
+        delay = self._reserve(tokens)
+        if delay > 0:
+            with self._lock:
+                self.waiting += 1
+            try:
+                await asyncio.sleep(delay)
+            finally:
+                with self._lock:
+                    self.waiting -= 1
+        return delay
+
+    def report_throttled(self, retry_after: Optional[float] = None, fallback: float = 5.0) -> float:
+        """Record a 429: halve the rate and pause the service. Returns the pause in seconds."""
+        pause = retry_after if retry_after is not None else fallback
+        with self._lock:
+            self.throttled += 1
+            self.rate = max(self.rate / 2.0, self.base_rate * MIN_RATE_FRACTION)
+            self._blocked_until = max(self._blocked_until, time.monotonic() + pause)
+        print(f"⏳ [{self.name}] rate limited — pausing {pause:.1f}s, rate now {self.rate:.2f} req/s")
+        return pause
+
+    def report_success(self) -> None:
+        """Record a successful call: recover the rate toward the configured ceiling."""
+        if self.rate < self.base_rate:
+            with self._lock:
+                self.rate = min(self.base_rate, self.rate + self.base_rate * RECOVERY_STEP)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "service": self.name,
+                "rate_per_sec": round(self.rate, 3),
+                "configured_rate_per_sec": self.base_rate,
+                "tokens_per_min": self.tokens_per_min or None,
+                "queue_depth": self.waiting,
+                "acquired": self.acquired,
+                "throttled": self.throttled,
+                "avg_wait_s": round(self.total_wait / self.acquired, 4) if self.acquired else 0.0,
+                "max_wait_s": round(self.max_wait, 4),
+                "blocked_for_s": round(max(self._blocked_until - time.monotonic(), 0.0), 3),
+            }
+
+
+_limiters: Dict[str, RateLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def get_limiter(service: str) -> RateLimiter:
+    """Process-wide limiter for `service` ("jina", "gemini", "fal", ...)."""
+    with _limiters_lock:
+        limiter = _limiters.get(service)
+        if limiter is None:
+            rps, tpm, burst = _DEFAULT_LIMITS.get(service, (5.0, 0, 5))
+            prefix = f"RATE_LIMIT_{service.upper()}"
+            limiter = RateLimiter(
+                service,
+                requests_per_sec=float(os.getenv(f"{prefix}_RPS", rps)),
+                tokens_per_min=float(os.getenv(f"{prefix}_TPM", tpm)),
+                burst=int(os.getenv(f"{prefix}_BURST", burst)),
+            )
+            _limiters[service] = limiter
+        return limiter
+
+
+def all_limiter_stats() -> Dict[str, dict]:
+    with _limiters_lock:
+        limiters = list(_limiters.values())
+    return {l.name: l.stats() for l in limiters}
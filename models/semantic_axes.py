@@ -1,12 +1,14 @@
 """Semantic axis construction using CLIP text and human annotations."""
 
+import threading
 import numpy as np
-from sklearn.linear_model import LogisticRegression
-from sklearn.svm import SVC
-from sklearn.decomposition import PCA
-from typing import List, Dict, Tuple, Optional, Union
-import pandas as pd
-from dataclasses import dataclass
+from typing import Any, List, Dict, Tuple, Optional, Union, TYPE_CHECKING
+from dataclasses import dataclass, field
+
+# scikit-learn and pandas are only needed by the supervised/PCA/Zappos-label
+# axes, so they are imported there rather than when the backend starts.
+if TYPE_CHECKING:
+    import pandas as pd
 
 from config import ZAPPOS_ATTRIBUTES
 from models.embeddings import CLIPEmbedder
@@ -21,34 +23,452 @@ class SemanticAxis:
     method: str  # 'clip_text', 'supervised', 'pca', 'ensemble'
     strength: float = 1.0
     metadata: Optional[Dict] = None  # Optional metadata (e.g., concepts list for ensemble)
-    
+    _unit: Optional[np.ndarray] = field(default=None, init=False, repr=False, compare=False)
+
+    def __setattr__(self, name, value):
+        if name == "direction":
+            object.__setattr__(self, "_unit", None)  # reassigned direction -> renormalize lazily
+        object.__setattr__(self, name, value)
+
+    @property
+    def unit_direction(self) -> np.ndarray:
+        """L2-normalized direction, computed once per assigned direction."""
+        if self._unit is None:
+            self._unit = _normalized(self.direction)
+        return self._unit
+
     def project(self, embeddings: np.ndarray) -> np.ndarray:
         """Project embeddings onto this semantic axis."""
-        # Ensure direction is normalized
-        direction_norm = self.direction / np.linalg.norm(self.direction)
-        
-        # Project embeddings
-        projections = np.dot(embeddings, direction_norm) * self.strength
-        return projections
+        return np.dot(embeddings, self.unit_direction) * self.strength
     
     def get_extreme_indices(self, embeddings: np.ndarray, n_extreme: int = 10) -> Tuple[List[int], List[int]]:
         """Get indices of most positive and negative examples along this axis."""
-        projections = self.project(embeddings)
-        
-        # Most positive (high values)
-        positive_indices = np.argsort(projections)[-n_extreme:].tolist()
-        
-        # Most negative (low values) 
-        negative_indices = np.argsort(projections)[:n_extreme].tolist()
-        
-        return positive_indices, negative_indices
+        positive, negative = _extremes(self.project(embeddings), n_extreme)
+        return positive.tolist(), negative.tolist()
+
+
+def _normalized(direction: np.ndarray) -> np.ndarray:
+    direction = np.asarray(direction, dtype=np.float32).ravel()
+    norm = np.linalg.norm(direction)
+    return direction / norm if norm > 1e-12 else direction
+
+
+def _extremes(projections: np.ndarray, n_extreme: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Bottom-k and top-k indices of a 1-D projection without a full sort.
+
+    Same order as the argsort slices they replace: both ascending by value,
+    so the most positive index is last and the most negative first.
+    """
+    n = len(projections)
+    k = min(max(n_extreme, 0), n)
+    if k == 0:
+        empty = np.empty(0, dtype=np.intp)
+        return empty, empty
+    if k == n:
+        order = np.argsort(projections)
+        return order, order
+    top = np.argpartition(projections, n - k)[n - k:]
+    bottom = np.argpartition(projections, k - 1)[:k]
+    top = top[np.argsort(projections[top])]
+    bottom = bottom[np.argsort(projections[bottom])]
+    return top, bottom
+
+
+class AxisBank:
+    """Unit directions of many axes stacked in one (K, D) float32 matrix.
+
+    Projecting N embeddings onto all K axes is a single (N, D) @ (D, K)
+    multiply. Rows are stored in a buffer that grows by doubling, and removing
+    an axis moves the last row into its slot, so adding and removing axes never
+    copies the whole bank. Row order therefore isn't stable across removals;
+    use `names` (or `index`) to map columns back to axes.
+
+    A bank can be shared by concurrent requests: mutations hold `_lock` and
+    projections work on a copy of the rows taken under it.
+    """
+
+    def __init__(self, dim: Optional[int] = None, capacity: int = 8):
+        self.dim = dim
+        self._capacity = max(int(capacity), 1)
+        self._matrix: Optional[np.ndarray] = None
+        self._strength = np.ones(self._capacity, dtype=np.float32)
+        self._names: List[str] = []
+        self._rows: Dict[str, int] = {}
+        self._axes: Dict[str, SemanticAxis] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._rows
+
+    @property
+    def names(self) -> List[str]:
+        """Axis names in column order of project()."""
+        with self._lock:
+            return list(self._names)
+
+    @property
+    def matrix(self) -> np.ndarray:
+        """(K, D) copy of the stored unit directions."""
+        return self._snapshot()[1]
+
+    def index(self, name: str) -> int:
+        return self._rows[name]
+
+    def get(self, name: str) -> Optional[SemanticAxis]:
+        return self._axes.get(name)
+
+    def add(self, axis: SemanticAxis, name: Optional[str] = None) -> int:
+        """Add (or replace) an axis; returns its row."""
+        name = name or axis.name
+        unit = axis.unit_direction
+        with self._lock:
+            return self._add(axis, name, unit)
+
+    def _add(self, axis: SemanticAxis, name: str, unit: np.ndarray) -> int:
+        if self._matrix is None:
+            self.dim = self.dim or unit.shape[0]
+            self._matrix = np.zeros((self._capacity, self.dim), dtype=np.float32)
+        if unit.shape[0] != self.dim:
+            raise ValueError(f"Axis '{name}' has dimension {unit.shape[0]}, bank expects {self.dim}")
+
+        row = self._rows.get(name)
+        if row is None:
+            row = len(self._names)
+            if row == self._capacity:
+                self._grow()
+            self._names.append(name)
+            self._rows[name] = row
+        self._matrix[row] = unit
+        self._strength[row] = axis.strength
+        self._axes[name] = axis
+        return row
+
+    def remove(self, name: str) -> Optional[SemanticAxis]:
+        """Remove an axis by moving the last row into its slot (O(D))."""
+        with self._lock:
+            return self._remove(name)
+
+    def _remove(self, name: str) -> Optional[SemanticAxis]:
+        row = self._rows.pop(name, None)
+        if row is None:
+            return None
+        last = len(self._names) - 1
+        if row != last:
+            moved = self._names[last]
+            self._matrix[row] = self._matrix[last]
+            self._strength[row] = self._strength[last]
+            self._names[row] = moved
+            self._rows[moved] = row
+        self._names.pop()
+        return self._axes.pop(name)
+
+    def _grow(self) -> None:
+        self._capacity *= 2
+        matrix = np.zeros((self._capacity, self.dim), dtype=np.float32)
+        matrix[:len(self._names)] = self._matrix[:len(self._names)]
+        strength = np.ones(self._capacity, dtype=np.float32)
+        strength[:len(self._names)] = self._strength[:len(self._names)]
+        self._matrix, self._strength = matrix, strength
+
+    def _snapshot(self) -> Tuple[List[str], np.ndarray, np.ndarray]:
+        """Names, (K, D) directions and strengths, copied under the lock."""
+        with self._lock:
+            k = len(self._names)
+            if self._matrix is None:
+                return [], np.empty((0, self.dim or 0), dtype=np.float32), np.empty(0, dtype=np.float32)
+            return list(self._names), self._matrix[:k].copy(), self._strength[:k].copy()
+
+    def _project(self, embeddings: np.ndarray) -> Tuple[List[str], np.ndarray]:
+        names, matrix, strength = self._snapshot()
+        embeddings = np.atleast_2d(np.asarray(embeddings, dtype=np.float32))
+        if not names:
+            return names, np.empty((embeddings.shape[0], 0), dtype=np.float32)
+        return names, (embeddings @ matrix.T) * strength
+
+    def project(self, embeddings: np.ndarray) -> np.ndarray:
+        """(N, D) embeddings -> (N, K) projections, columns in `names` order."""
+        return self._project(embeddings)[1]
+
+    def project_dict(self, embeddings: np.ndarray) -> Dict[str, np.ndarray]:
+        names, projections = self._project(embeddings)
+        return {name: projections[:, i] for i, name in enumerate(names)}
+
+    def extreme_indices(self, embeddings: np.ndarray, n_extreme: int = 10) -> Dict[str, Tuple[List[int], List[int]]]:
+        """Per axis: (top-k, bottom-k) indices, ordered like SemanticAxis.get_extreme_indices."""
+        names, projections = self._project(embeddings)
+        out = {}
+        for i, name in enumerate(names):
+            top, bottom = _extremes(projections[:, i], n_extreme)
+            out[name] = (top.tolist(), bottom.tolist())
+        return out
+
+class OnlineAxisLearner:
+    """Axis direction learned incrementally from image anchors on the canvas.
+
+    Each anchor is an image pinned at a position along the axis (0-10, mapped
+    to a target in [-1, +1]). An SGDRegressor is warm-started from the current
+    direction (initially the text axis) and every new or moved anchor runs a
+    few partial_fit passes over the anchor set, so an update costs milliseconds
+    instead of refitting a classifier. The direction is the normalized weight
+    vector.
+
+    to_dict()/from_dict() persist the learned weights and anchor targets with
+    the canvas; anchor embeddings are looked up from the canvas images on load.
+    Updates run in worker threads, so fits and reads of the weights hold `_lock`.
+    """
+
+    def __init__(self, labels: Tuple[str, str], prior: Optional[np.ndarray] = None,
+                 epochs: int = 3, alpha: float = 1e-4, eta0: float = 0.05):
+        self.labels = tuple(labels)
+        self.epochs = epochs
+        self.alpha = alpha
+        self.eta0 = eta0
+        self.anchors: Dict[int, Tuple[np.ndarray, float]] = {}  # image id -> (unit embedding, target)
+        self.updates = 0
+        self._prior = None if prior is None else _normalized(prior).astype(np.float64)
+        self._model = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def position_to_target(position: float) -> float:
+        return float(np.clip((position - 5.0) / 5.0, -1.0, 1.0))
+
+    def _new_model(self):
+        from sklearn.linear_model import SGDRegressor
+        return SGDRegressor(loss="squared_error", penalty="l2", alpha=self.alpha,
+                            learning_rate="constant", eta0=self.eta0, random_state=0)
+
+    def _warm_start(self, dim: int, coef: Optional[np.ndarray] = None,
+                    intercept: float = 0.0, t: float = 1.0) -> None:
+        """Seed SGD state so partial_fit continues from `coef` (or the prior)."""
+        self._model = self._new_model()
+        if coef is None:
+            coef = self._prior if self._prior is not None else np.zeros(dim)
+        self._model.coef_ = np.asarray(coef, dtype=np.float64).copy()
+        self._model.intercept_ = np.array([intercept], dtype=np.float64)
+        self._model.t_ = float(t)
+        self._model.n_features_in_ = dim
+
+    @property
+    def fitted(self) -> bool:
+        return self._model is not None and bool(self.anchors)
+
+    @property
+    def direction(self) -> Optional[np.ndarray]:
+        with self._lock:
+            if self._model is not None:
+                return _normalized(self._model.coef_)
+            return self._prior
+
+    def _fit(self) -> None:
+        X = np.stack([emb for emb, _ in self.anchors.values()]).astype(np.float64)
+        y = np.array([target for _, target in self.anchors.values()])
+        if self._model is None:
+            self._warm_start(X.shape[1])
+        for _ in range(self.epochs):
+            self._model.partial_fit(X, y)
+        self.updates += 1
+
+    def add_anchor(self, image_id: int, embedding: np.ndarray, position: float) -> np.ndarray:
+        """Add or move an anchor and update the direction."""
+        with self._lock:
+            self.anchors[int(image_id)] = (_normalized(embedding), self.position_to_target(position))
+            self._fit()
+        return self.direction
+
+    def remove_anchor(self, image_id: int) -> Optional[np.ndarray]:
+        with self._lock:
+            if self.anchors.pop(int(image_id), None) is not None and self.anchors:
+                self._fit()
+        return self.direction
+
+    def to_dict(self) -> dict:
+        with self._lock:
+            return self._to_dict()
+
+    def _to_dict(self) -> dict:
+        return {
+            "labels": list(self.labels),
+            "anchors": {str(i): target for i, (_, target) in self.anchors.items()},
+            "coef": self._model.coef_.tolist() if self._model is not None else None,
+            "intercept": float(self._model.intercept_[0]) if self._model is not None else 0.0,
+            "t": float(getattr(self._model, "t_", 1.0)) if self._model is not None else 1.0,
+            "prior": self._prior.tolist() if self._prior is not None else None,
+            "updates": self.updates,
+            "epochs": self.epochs,
+            "alpha": self.alpha,
+            "eta0": self.eta0,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict, embeddings: Dict[int, np.ndarray]) -> "OnlineAxisLearner":
+        """Restore a learner; anchors whose image is no longer on the canvas are dropped."""
+        prior = data.get("prior")
+        learner = cls(tuple(data.get("labels", ("", ""))),
+                      prior=np.asarray(prior) if prior is not None else None,
+                      epochs=data.get("epochs", 3), alpha=data.get("alpha", 1e-4), eta0=data.get("eta0", 0.05))
+        for key, target in data.get("anchors", {}).items():
+            emb = embeddings.get(int(key))
+            if emb is not None:
+                learner.anchors[int(key)] = (_normalized(emb), float(target))
+        if data.get("coef") is not None:
+            coef = np.asarray(data["coef"], dtype=np.float64)
+            learner._warm_start(coef.shape[0], coef, data.get("intercept", 0.0), data.get("t", 1.0))
+        learner.updates = data.get("updates", 0)
+        return learner
+
+
+class PCABasis:
+    """Incrementally fitted PCA basis of one canvas' image embeddings.
+
+    sync() is given the canvas' current (image id, embedding) pairs and feeds
+    only images it hasn't seen to IncrementalPCA.partial_fit, so keeping the
+    basis current on every canvas change costs a small update rather than a
+    refit. partial_fit needs at least n_components rows per batch, so new
+    images are buffered until that many have arrived. Removed images stay in
+    the fit until more than `rebuild_fraction` of the fitted ones are gone,
+    then the basis is rebuilt from scratch.
+
+    Any component is then available instantly as a unit direction or axis.
+    """
+
+    def __init__(self, n_components: int = 10, key: Any = None, rebuild_fraction: float = 0.25):
+        self.n_components = n_components
+        self.key = key  # what the basis was fitted for, e.g. (canvas id, model)
+        self.rebuild_fraction = rebuild_fraction
+        self.version = 0  # bumped whenever the components change
+        self._ipca = None
+        self._fitted_ids: set = set()
+        self._pending: Dict[int, np.ndarray] = {}
+        self._bank: Optional[AxisBank] = None
+        self._lock = threading.Lock()
+
+    @property
+    def fitted(self) -> bool:
+        return self._ipca is not None
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+
+    def _reset(self) -> None:
+        self._ipca = None
+        self._fitted_ids = set()
+        self._pending = {}
+
+    def sync(self, items: List[Tuple[int, np.ndarray]]) -> bool:
+        """Bring the basis up to date with the canvas; returns True if it changed."""
+        from sklearn.decomposition import IncrementalPCA
+        with self._lock:
+            current = {int(i) for i, _ in items}
+            gone = self._fitted_ids - current
+            if gone and len(gone) > self.rebuild_fraction * len(self._fitted_ids):
+                self._reset()
+            else:
+                self._fitted_ids -= gone
+            for i in set(self._pending) - current:
+                del self._pending[i]
+            for i, emb in items:
+                i = int(i)
+                if i not in self._fitted_ids and i not in self._pending:
+                    self._pending[i] = np.asarray(emb, dtype=np.float32)
+
+            if not self._pending:
+                return False
+            dim = next(iter(self._pending.values())).shape[0]
+            k = min(self.n_components, dim)
+            if len(self._pending) < k:
+                return False
+            if self._ipca is None:
+                self._ipca = IncrementalPCA(n_components=k)
+            self._ipca.partial_fit(np.stack(list(self._pending.values())))
+            self._fitted_ids.update(self._pending)
+            self._pending = {}
+            self._bank = None
+            self.version += 1
+            return True
+
+    def component(self, idx: int) -> np.ndarray:
+        with self._lock:
+            return self._component(idx)
+
+    def _component(self, idx: int) -> np.ndarray:
+        if self._ipca is None:
+            raise ValueError("PCA basis has not been fitted yet")
+        return _normalized(self._ipca.components_[idx])
+
+    def axis(self, idx: int, name: Optional[str] = None) -> SemanticAxis:
+        return self._axis(idx, self.component(idx), name)
+
+    @staticmethod
+    def _axis(idx: int, direction: np.ndarray, name: Optional[str] = None) -> SemanticAxis:
+        return SemanticAxis(
+            name=name or f"pc{idx}",
+            direction=direction,
+            positive_concept=f"PC{idx}+",
+            negative_concept=f"PC{idx}-",
+            method='pca'
+        )
+
+    def bank(self) -> AxisBank:
+        """All components stacked (pc0, pc1, ...), rebuilt only when the basis changes.
+
+        The returned bank is never mutated afterwards; a later sync() replaces it."""
+        with self._lock:
+            if self._bank is None:
+                bank = AxisBank(capacity=self.n_components)
+                if self._ipca is not None:
+                    for idx in range(self._ipca.n_components_):
+                        bank.add(self._axis(idx, self._component(idx)))
+                self._bank = bank
+            return self._bank
+
+    def explained_variance(self) -> dict:
+        with self._lock:
+            return self._explained_variance()
+
+    def _explained_variance(self) -> dict:
+        if self._ipca is None:
+            return {"fitted": False, "n_images": 0, "pending": len(self._pending),
+                    "needed": self.n_components, "components": []}
+        ratios = self._ipca.explained_variance_ratio_
+        cumulative = np.cumsum(ratios)
+        return {
+            "fitted": True,
+            "n_images": int(self._ipca.n_samples_seen_),
+            "pending": len(self._pending),
+            "components": [
+                {"index": i, "explained_variance_ratio": float(r), "cumulative": float(c)}
+                for i, (r, c) in enumerate(zip(ratios, cumulative))
+            ],
+        }
+
 
 class SemanticAxisBuilder:
     """Builds semantic axes using various methods."""
     
-    def __init__(self, embedder: Optional[CLIPEmbedder] = None):
+    def __init__(self, embedder: Optional[CLIPEmbedder] = None, max_axes: Optional[int] = None):
         self.embedder = embedder or CLIPEmbedder()
         self.axes: Dict[str, SemanticAxis] = {}
+        self.bank = AxisBank()  # same axes, stacked for project_all_axes
+        # Bound on remembered axes (oldest dropped first); None keeps all.
+        # A builder shared by many participants must set it.
+        self.max_axes = max_axes
+        self._lock = threading.Lock()  # shared builders are called from concurrent requests
+
+    def _remember(self, name: str, axis: SemanticAxis) -> None:
+        with self._lock:
+            self.axes.pop(name, None)
+            self.axes[name] = axis
+            self.bank.add(axis, name)
+            if self.max_axes is not None:
+                while len(self.axes) > self.max_axes:
+                    oldest = next(iter(self.axes))
+                    del self.axes[oldest]
+                    self.bank.remove(oldest)
     
     def create_clip_text_axis(
         self, 
@@ -76,7 +496,7 @@ class SemanticAxisBuilder:
             method='clip_text'
         )
         
-        self.axes[axis_name] = axis
+        self._remember(axis_name, axis)
         return axis
 
     def create_ensemble_axis(
@@ -112,7 +532,40 @@ class SemanticAxisBuilder:
             concept_prompts,
             use_cache=True  # Cache individual concepts for reuse
         )
+        return self._ensemble_axis_from_embeddings(
+            concept_embeddings, concept_prompts, name, positive_concept, negative_concept
+        )
 
+    async def acreate_ensemble_axis(
+        self,
+        concept_prompts: List[str],
+        name: str = "ensemble_axis",
+        positive_concept: str = "ensemble",
+        negative_concept: str = "opposite"
+    ) -> SemanticAxis:
+        """Async create_ensemble_axis (uses the embedder's non-blocking API)."""
+        if not concept_prompts:
+            raise ValueError("concept_prompts cannot be empty")
+
+        print(f"🎯 Creating ensemble axis from {len(concept_prompts)} concepts")
+
+        concept_embeddings = await self.embedder.aextract_text_embeddings(
+            concept_prompts,
+            use_cache=True
+        )
+        return self._ensemble_axis_from_embeddings(
+            concept_embeddings, concept_prompts, name, positive_concept, negative_concept
+        )
+
+    def _ensemble_axis_from_embeddings(
+        self,
+        concept_embeddings: np.ndarray,
+        concept_prompts: List[str],
+        name: str,
+        positive_concept: str,
+        negative_concept: str
+    ) -> SemanticAxis:
+        """Average concept embeddings into a normalized axis and register it."""
         # Filter out zero embeddings (API failures e.g. HTTP 410)
         non_zero_mask = np.linalg.norm(concept_embeddings, axis=1) > 1e-6
         if np.any(non_zero_mask):
@@ -148,7 +601,7 @@ class SemanticAxisBuilder:
             }
         )
 
-        self.axes[name] = axis
+        self._remember(name, axis)
         return axis
 
     def create_supervised_axis(
@@ -173,6 +626,8 @@ class SemanticAxisBuilder:
             print(f"Warning: Only {len(filtered_labels)} labeled examples for axis '{axis_name}'")
         
         # Train classifier
+        from sklearn.linear_model import LogisticRegression
+        from sklearn.svm import SVC
         if method == 'logistic':
             classifier = LogisticRegression(random_state=42, max_iter=1000)
         elif method == 'svm':
@@ -196,25 +651,31 @@ class SemanticAxisBuilder:
             method='supervised'
         )
         
-        self.axes[axis_name] = axis
+        self._remember(axis_name, axis)
         return axis
     
     def create_pca_axis(
         self,
         embeddings: np.ndarray,
         axis_name: str,
-        component_idx: int = 0
+        component_idx: int = 0,
+        basis: Optional[PCABasis] = None
     ) -> SemanticAxis:
-        """Create semantic axis using PCA component."""
+        """Create semantic axis using PCA component.
+
+        With a fitted `basis` (see PCABasis) the component is read from it and
+        nothing is refit; otherwise a randomized PCA is fitted on `embeddings`.
+        """
         
         print(f"Creating PCA axis '{axis_name}' using component {component_idx}")
         
-        # Fit PCA
-        pca = PCA(n_components=min(10, embeddings.shape[1]))
-        pca.fit(embeddings)
-        
-        # Get the specified component as direction
-        direction = pca.components_[component_idx]
+        if basis is not None and basis.fitted:
+            direction = basis.component(component_idx)
+        else:
+            from sklearn.decomposition import PCA
+            pca = PCA(n_components=min(10, *embeddings.shape), svd_solver="randomized", random_state=0)
+            pca.fit(embeddings)
+            direction = pca.components_[component_idx]
         
         axis = SemanticAxis(
             name=axis_name,
@@ -224,14 +685,14 @@ class SemanticAxisBuilder:
             method='pca'
         )
         
-        self.axes[axis_name] = axis
+        self._remember(axis_name, axis)
         return axis
     
     def create_zappos_attribute_axes(
         self,
         embeddings: np.ndarray,
         image_paths: List[str],
-        zappos_labels_df: Optional[pd.DataFrame] = None
+        zappos_labels_df: Optional["pd.DataFrame"] = None
     ) -> Dict[str, SemanticAxis]:
         """Create semantic axes for Zappos attributes using existing human labels."""
         
@@ -289,7 +750,7 @@ class SemanticAxisBuilder:
     
     def _extract_zappos_labels(
         self, 
-        labels_df: pd.DataFrame, 
+        labels_df: "pd.DataFrame", 
         attribute_id: int, 
         image_paths: List[str]
     ) -> Optional[np.ndarray]:
@@ -307,16 +768,16 @@ class SemanticAxisBuilder:
     
     def list_axes(self) -> List[str]:
         """List all available axis names."""
-        return list(self.axes.keys())
+        with self._lock:
+            return list(self.axes.keys())
     
     def project_all_axes(self, embeddings: np.ndarray) -> Dict[str, np.ndarray]:
-        """Project embeddings onto all available axes."""
-        projections = {}
-        
-        for name, axis in self.axes.items():
-            projections[name] = axis.project(embeddings)
-        
-        return projections
+        """Project embeddings onto all available axes (one matrix multiply)."""
+        return self.bank.project_dict(embeddings)
+
+    def get_all_extreme_indices(self, embeddings: np.ndarray, n_extreme: int = 10) -> Dict[str, Tuple[List[int], List[int]]]:
+        """Most positive / negative examples along every axis."""
+        return self.bank.extreme_indices(embeddings, n_extreme)
 
 def create_default_axes(embeddings: np.ndarray) -> Dict[str, SemanticAxis]:
     """Create a set of default semantic axes for shoe exploration."""
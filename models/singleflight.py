@@ -0,0 +1,103 @@
+"""
+Single-flight deduplication for expensive calls (Gemini, Jina, fal.ai).
+
+When identical calls overlap in time, only the first one (the "leader")
+does the work; the others wait for its result (or its exception). The
+entry is dropped as soon as the call finishes, so this deduplicates
+concurrent work only and is not a cache.
+
+  - SingleFlight: for blocking code (worker threads, scripts)
+  - AsyncSingleFlight: for coroutines on one event loop. The shared work
+    runs as its own task and every waiter awaits it through
+    asyncio.shield, so a cancelled waiter (e.g. a client disconnect)
+    doesn't cancel the call for the others.
+
+Keys must capture everything the result depends on. Per-participant state
+(axis labels etc.) must be applied by the caller after the shared part.
+"""
+
+import asyncio
+import threading
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+
+class _Call:
+    __slots__ = ("event", "result", "error")
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result: Any = None
+        self.error: BaseException = None
+
+
+class SingleFlight:
+    """Thread-safe single-flight group for blocking callables."""
+
+    def __init__(self, name: str = ""):
+        self.name = name
+        self._lock = threading.Lock()
+        self._inflight: Dict[Hashable, _Call] = {}
+        self.calls = 0    # calls that did the work
+        self.shared = 0   # calls that reused an in-flight result
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        with self._lock:
+            call = self._inflight.get(key)
+            leader = call is None
+            if leader:
+                call = _Call()
+                self._inflight[key] = call
+                self.calls += 1
+            else:
+                self.shared += 1
+
+        if leader:
+            try:
+                call.result = fn()
+            except BaseException as e:
+                call.error = e
+            finally:
+                with self._lock:
+                    self._inflight.pop(key, None)
+                call.event.set()
+        else:
+            call.event.wait()
+
+        if call.error is not None:
+            raise call.error
+        return call.result
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"calls": self.calls, "shared": self.shared, "in_flight": len(self._inflight)}
+
+
+class AsyncSingleFlight:
+    """Single-flight group for coroutine functions (one event loop)."""
+
+    def __init__(self, name: str = ""):
+        self.name = name
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+        self.calls = 0
+        self.shared = 0
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._inflight[key] = task
+            self.calls += 1
+
+            def _done(t: asyncio.Future, key=key) -> None:
+                if self._inflight.get(key) is t:
+                    del self._inflight[key]
+                if not t.cancelled():
+                    t.exception()  # mark retrieved; waiters re-raise it themselves
+
+            task.add_done_callback(_done)
+        else:
+            self.shared += 1
+        return await asyncio.shield(task)
+
+    def stats(self) -> dict:
+        return {"calls": self.calls, "shared": self.shared, "in_flight": len(self._inflight)}
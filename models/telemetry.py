@@ -0,0 +1,262 @@
+"""
+Process-wide metrics: counters, gauges and histograms rendered in the
+Prometheus text exposition format (served at /api/metrics).
+
+Deliberately dependency-free (no prometheus_client) and thread-safe, so it
+can be used from the event loop, worker threads and the models package alike:
+
+    from models.telemetry import EXTERNAL_LATENCY, track_call
+
+    with track_call("jina", "embeddings"):
+        resp = requests.post(...)
+
+The shared metrics below cover what we need to tell where time goes:
+per-route request latency, outbound calls per service, internal operations
+(PNG encoding, KMeans, websocket broadcasts), event-loop lag and cache
+hit/miss counts. Gauges whose value lives elsewhere (active participants,
+open websockets) are registered with a callback evaluated at scrape time.
+"""
+
+import math
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+LAG_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+BYTES_BUCKETS = tuple(float(1024 * 4 ** i) for i in range(10))  # 1 KB .. 256 MB
+
+LabelValues = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if math.isnan(value):
+        return "NaN"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+def _label_str(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> LabelValues:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name}: expected labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[n]) for n in self.labelnames)
+
+    def _samples(self) -> Iterable[str]:
+        raise NotImplementedError
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(self._samples())
+        return lines
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, help, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def values(self) -> Dict[LabelValues, float]:
+        with self._lock:
+            return dict(self._values)
+
+    def _samples(self) -> Iterable[str]:
+        for key, value in sorted(self.values().items()):
+            yield f"{self.name}{_label_str(self.labelnames, key)} {_format_value(value)}"
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, help, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+        self._fn: Optional[Callable[[], object]] = None
+
+    def set(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = float(value)
+
+    def set_function(self, fn: Callable[[], object]) -> None:
+        """Compute the value at scrape time. `fn` returns a number, or for a
+        labelled gauge a dict of label-value tuples -> number."""
+        self._fn = fn
+
+    def _samples(self) -> Iterable[str]:
+        if self._fn is not None:
+            try:
+                result = self._fn()
+            except Exception:
+                return
+            items = result.items() if isinstance(result, dict) else [((), result)]
+        else:
+            with self._lock:
+                items = list(self._values.items())
+        for key, value in sorted(items):
+            yield f"{self.name}{_label_str(self.labelnames, key)} {_format_value(value)}"
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(float(b) for b in buckets))
+        self._counts: Dict[LabelValues, List[int]] = {}
+        self._sums: Dict[LabelValues, float] = {}
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            counts = self._counts.get(key)
+            if counts is None:
+                counts = self._counts[key] = [0] * (len(self.buckets) + 1)
+                self._sums[key] = 0.0
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+                    break
+            else:
+                counts[-1] += 1
+            self._sums[key] += value
+
+    @contextmanager
+    def time(self, **labels):
+        """Observe the duration of the `with` block in seconds."""
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - t0, **labels)
+
+    def _samples(self) -> Iterable[str]:
+        with self._lock:
+            snapshot = [(k, list(c), self._sums[k]) for k, c in self._counts.items()]
+        for key, counts, total in sorted(snapshot):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), counts):
+                cumulative += count
+                le = 'le="' + _format_value(bound) + '"'
+                yield f"{self.name}_bucket{_label_str(self.labelnames, key, le)} {cumulative}"
+            yield f"{self.name}_sum{_label_str(self.labelnames, key)} {_format_value(total)}"
+            yield f"{self.name}_count{_label_str(self.labelnames, key)} {cumulative}"
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def _get_or_create(self, cls, name: str, *args, **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, *args, **kwargs)
+            elif not isinstance(metric, cls):
+                raise ValueError(f"metric {name} already registered as {metric.kind}")
+            return metric
+
+    def counter(self, name: str, help: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._get_or_create(Counter, name, help, labelnames)
+
+    def gauge(self, name: str, help: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._get_or_create(Gauge, name, help, labelnames)
+
+    def histogram(self, name: str, help: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = LATENCY_BUCKETS) -> Histogram:
+        return self._get_or_create(Histogram, name, help, labelnames, buckets)
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines: List[str] = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# ─── Shared metrics ─────────────────────────────────────────────────────────
+
+HTTP_LATENCY = REGISTRY.histogram(
+    "http_request_duration_seconds", "HTTP request latency by route template", ("method", "route", "status"))
+EXTERNAL_LATENCY = REGISTRY.histogram(
+    "external_call_duration_seconds", "Outbound call latency by service", ("service", "operation"))
+EXTERNAL_ERRORS = REGISTRY.counter(
+    "external_call_errors_total", "Failed outbound calls (HTTP status or exception type)", ("service", "reason"))
+OPERATION_LATENCY = REGISTRY.histogram(
+    "operation_duration_seconds", "In-process work: PNG encoding, KMeans, websocket broadcasts", ("operation",))
+LOOP_LAG = REGISTRY.histogram(
+    "event_loop_lag_seconds", "Delay of the event-loop lag probe beyond its sleep interval", buckets=LAG_BUCKETS)
+BROADCAST_BYTES = REGISTRY.histogram(
+    "websocket_broadcast_bytes", "Serialized size of websocket state broadcasts", buckets=BYTES_BUCKETS)
+CACHE_REQUESTS = REGISTRY.counter(
+    "cache_requests_total", "Cache lookups by cache and result (hit/miss)", ("cache", "result"))
+CACHE_HIT_RATIO = REGISTRY.gauge(
+    "cache_hit_ratio", "Share of lookups served from cache since start", ("cache",))
+
+
+def _hit_ratios() -> Dict[LabelValues, float]:
+    totals: Dict[str, List[float]] = {}
+    for (cache, result), value in CACHE_REQUESTS.values().items():
+        hits_total = totals.setdefault(cache, [0.0, 0.0])
+        hits_total[1] += value
+        if result == "hit":
+            hits_total[0] += value
+    return {(cache, ): hits / total for cache, (hits, total) in totals.items() if total}
+
+
+CACHE_HIT_RATIO.set_function(_hit_ratios)
+
+
+def record_cache(cache: str, hit: bool) -> None:
+    CACHE_REQUESTS.inc(cache=cache, result="hit" if hit else "miss")
+
+
+def record_external_error(service: str, reason: str) -> None:
+    EXTERNAL_ERRORS.inc(service=service, reason=reason)
+
+
+@contextmanager
+def track_call(service: str, operation: str):
+    """Time an outbound call; exceptions are counted as errors (by type) and re-raised.
+    Non-2xx responses that don't raise are reported with record_external_error."""
+    t0 = time.perf_counter()
+    try:
+        yield
+    except Exception as e:
+        record_external_error(service, type(e).__name__)
+        raise
+    finally:
+        EXTERNAL_LATENCY.observe(time.perf_counter() - t0, service=service, operation=operation)
@@ -0,0 +1,285 @@
+"""
+Lightweight span tracing for per-stage timing of individual requests.
+
+    with tracer.trace("POST /api/add-external-images", participant_id=pid):
+        with span("download", url=url[:80]):
+            ...
+
+    @traced("remove_background")
+    def remove_background(...): ...
+
+The active span lives in a ContextVar, so spans nest across awaits and
+follow work into asyncio.to_thread / ensure_future (both copy the context).
+Outside a trace, span() and @traced cost one ContextVar lookup and record
+nothing, so library code (models/*) can be instrumented unconditionally.
+
+Finished traces go into an in-memory ring buffer (listed by
+/api/admin/traces) and, when OTEL_EXPORTER_OTLP_ENDPOINT is set, are also
+sent as OTLP/HTTP JSON to a local collector (Jaeger, Tempo, otel-collector)
+from a background thread.
+"""
+
+import functools
+import inspect
+import os
+import queue
+import secrets
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional
+
+import requests
+
+TRACE_BUFFER_SIZE = int(os.getenv("TRACE_BUFFER_SIZE", "500"))
+OTLP_ENDPOINT = os.getenv("OTEL_EXPORTER_OTLP_ENDPOINT", "").rstrip("/")
+OTLP_SERVICE_NAME = os.getenv("OTEL_SERVICE_NAME", "zappos-semantic-explorer")
+
+
+class Span:
+    __slots__ = ("trace", "span_id", "parent_id", "name", "start_ns", "end_ns", "attributes", "error", "thread")
+
+    def __init__(self, trace: "Trace", name: str, parent_id: Optional[str], attributes: Dict[str, Any]):
+        self.trace = trace
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent_id
+        self.name = name
+        self.start_ns = time.time_ns()
+        self.end_ns: Optional[int] = None
+        self.attributes = attributes
+        self.error: Optional[str] = None
+        self.thread = threading.current_thread().name
+
+    @property
+    def duration_ms(self) -> float:
+        end = self.end_ns if self.end_ns is not None else time.time_ns()
+        return (end - self.start_ns) / 1e6
+
+    def set(self, **attributes) -> None:
+        self.attributes.update(attributes)
+
+    def to_dict(self) -> dict:
+        return {
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "start_ms": (self.start_ns - self.trace.root.start_ns) / 1e6,
+            "duration_ms": round(self.duration_ms, 3),
+            "attributes": self.attributes,
+            "error": self.error,
+            "thread": self.thread,
+        }
+
+
+class Trace:
+    def __init__(self, name: str, attributes: Dict[str, Any]):
+        self.trace_id = secrets.token_hex(16)
+        self._lock = threading.Lock()
+        self.spans: List[Span] = []
+        self.root = Span(self, name, None, attributes)
+        self.spans.append(self.root)
+
+    def add(self, span: Span) -> None:
+        with self._lock:
+            self.spans.append(span)
+
+    def breakdown(self) -> Dict[str, dict]:
+        """Total time and call count per stage (span name), excluding the root."""
+        out: Dict[str, dict] = {}
+        with self._lock:
+            spans = [s for s in self.spans if s is not self.root and s.end_ns is not None]
+        for s in spans:
+            entry = out.setdefault(s.name, {"ms": 0.0, "count": 0})
+            entry["ms"] = round(entry["ms"] + s.duration_ms, 3)
+            entry["count"] += 1
+        return out
+
+    def summary(self) -> dict:
+        return {
+            "trace_id": self.trace_id,
+            "name": self.root.name,
+            "started_at": self.root.start_ns / 1e9,
+            "duration_ms": round(self.root.duration_ms, 3),
+            "attributes": self.root.attributes,
+            "error": self.root.error,
+            "breakdown": self.breakdown(),
+        }
+
+    def to_dict(self) -> dict:
+        with self._lock:
+            spans = list(self.spans)
+        return {**self.summary(), "spans": [s.to_dict() for s in sorted(spans, key=lambda s: s.start_ns)]}
+
+    def to_otlp(self) -> dict:
+        """OTLP/JSON (ExportTraceServiceRequest) for this trace."""
+        def attrs(d: Dict[str, Any]) -> List[dict]:
+            out = []
+            for k, v in d.items():
+                if isinstance(v, bool):
+                    value = {"boolValue": v}
+                elif isinstance(v, int):
+                    value = {"intValue": str(v)}
+                elif isinstance(v, float):
+                    value = {"doubleValue": v}
+                else:
+                    value = {"stringValue": str(v)}
+                out.append({"key": k, "value": value})
+            return out
+
+        with self._lock:
+            spans = list(self.spans)
+        otlp_spans = []
+        for s in spans:
+            entry = {
+                "traceId": self.trace_id,
+                "spanId": s.span_id,
+                "name": s.name,
+                "kind": 2 if s is self.root else 1,  # SERVER / INTERNAL
+                "startTimeUnixNano": str(s.start_ns),
+                "endTimeUnixNano": str(s.end_ns or s.start_ns),
+                "attributes": attrs({**s.attributes, "thread.name": s.thread}),
+                "status": {"code": 2, "message": s.error} if s.error else {"code": 1},
+            }
+            if s.parent_id:
+                entry["parentSpanId"] = s.parent_id
+            otlp_spans.append(entry)
+        return {"resourceSpans": [{
+            "resource": {"attributes": attrs({"service.name": OTLP_SERVICE_NAME})},
+            "scopeSpans": [{"scope": {"name": "models.tracing"}, "spans": otlp_spans}],
+        }]}
+
+
+_current_span: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+
+
+class _OtlpExporter:
+    """Background thread POSTing finished traces to <endpoint>/v1/traces."""
+
+    def __init__(self, endpoint: str):
+        self.url = f"{endpoint}/v1/traces"
+        self._queue: "queue.Queue[Trace]" = queue.Queue(maxsize=1000)
+        self.exported = 0
+        self.dropped = 0
+        self.failed = 0
+        threading.Thread(target=self._run, name="otlp-exporter", daemon=True).start()
+
+    def submit(self, trace: Trace) -> None:
+        try:
+            self._queue.put_nowait(trace)
+        except queue.Full:
+            self.dropped += 1
+
+    def _run(self) -> None:
+        session = requests.Session()
+        while True:
+            trace = self._queue.get()
+            try:
+                resp = session.post(self.url, json=trace.to_otlp(), timeout=5)
+                resp.raise_for_status()
+                self.exported += 1
+            except Exception as e:
+                self.failed += 1
+                if self.failed in (1, 10, 100) or self.failed % 1000 == 0:
+                    print(f"[tracing] OTLP export to {self.url} failed ({self.failed}x): {e}")
+
+    def stats(self) -> dict:
+        return {"url": self.url, "exported": self.exported, "failed": self.failed,
+                "dropped": self.dropped, "queued": self._queue.qsize()}
+
+
+class Tracer:
+    def __init__(self, buffer_size: int = TRACE_BUFFER_SIZE, otlp_endpoint: str = OTLP_ENDPOINT):
+        self._traces: "deque[Trace]" = deque(maxlen=buffer_size)
+        self._lock = threading.Lock()
+        self.exporter = _OtlpExporter(otlp_endpoint) if otlp_endpoint else None
+
+    @contextmanager
+    def trace(self, name: str, **attributes):
+        """Start a new trace whose root span covers the `with` block."""
+        t = Trace(name, attributes)
+        token = _current_span.set(t.root)
+        try:
+            yield t.root
+        except BaseException as e:
+            t.root.error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            _current_span.reset(token)
+            t.root.end_ns = time.time_ns()
+            with self._lock:
+                self._traces.append(t)
+            if self.exporter is not None:
+                self.exporter.submit(t)
+
+    def list(self, limit: int = 50, name: str = "", min_ms: float = 0.0) -> List[dict]:
+        """Newest-first summaries (with per-stage breakdown)."""
+        with self._lock:
+            traces = list(self._traces)
+        out = []
+        for t in reversed(traces):
+            if name and name not in t.root.name:
+                continue
+            if t.root.duration_ms < min_ms:
+                continue
+            out.append(t.summary())
+            if len(out) >= limit:
+                break
+        return out
+
+    def get(self, trace_id: str) -> Optional[Trace]:
+        with self._lock:
+            return next((t for t in self._traces if t.trace_id == trace_id), None)
+
+    def stats(self) -> dict:
+        with self._lock:
+            buffered = len(self._traces)
+        return {"buffered": buffered, "capacity": self._traces.maxlen,
+                "otlp": self.exporter.stats() if self.exporter else None}
+
+
+tracer = Tracer()
+
+
+def current_span() -> Optional[Span]:
+    return _current_span.get()
+
+
+@contextmanager
+def span(name: str, **attributes):
+    """Child span of the active span; a no-op (yields None) outside a trace."""
+    parent = _current_span.get()
+    if parent is None:
+        yield None
+        return
+    s = Span(parent.trace, name, parent.span_id, attributes)
+    parent.trace.add(s)
+    token = _current_span.set(s)
+    try:
+        yield s
+    except BaseException as e:
+        s.error = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        s.end_ns = time.time_ns()
+        _current_span.reset(token)
+
+
+def traced(name: Optional[str] = None):
+    """Decorator: run the (sync or async) function inside span(name)."""
+    def decorate(fn):
+        span_name = name or fn.__name__
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                with span(span_name):
+                    return await fn(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(span_name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate
@@ -0,0 +1,189 @@
+"""Non-linear canvas layout: UMAP fits cached by embedding set.
+
+UMAPProjector.fit(embeddings) fits UMAP with the settings in config.py
+(UMAP_N_NEIGHBORS, UMAP_MIN_DIST, UMAP_N_COMPONENTS, UMAP_RANDOM_STATE) and
+pickles the fitted model to UMAP_CACHE/<key>.pkl, where the key is a hash of
+the embedding rows and the settings. Refitting the same set (reloading a
+canvas, switching modes back and forth) is a cache hit.
+
+A fitted UMAPProjection places rows from the fit at their fitted positions
+and everything else (images added afterwards) with the model's transform(),
+so the layout stays put as the canvas grows. Output is centered and scaled
+to the range the linear axis projection uses.
+
+umap-learn is optional and imported on first fit (it pulls in numba, which
+is slow to import). Without it, scikit-learn's Isomap is used: also
+non-linear, and it also supports transform() for new points.
+"""
+
+import hashlib
+import pickle
+import re
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Optional
+
+import numpy as np
+
+from config import (UMAP_CACHE, UMAP_MIN_DIST, UMAP_N_COMPONENTS, UMAP_N_NEIGHBORS,
+                    UMAP_RANDOM_STATE, ensure_cache_dirs)
+
+LAYOUT_HALF_EXTENT = 0.5  # fitted layout spans [-0.5, 0.5] on its widest axis
+KEY_PATTERN = re.compile(r"[0-9a-f]{20}")  # what key_for() produces (use fullmatch)
+
+
+def is_valid_key(key) -> bool:
+    """Keys come back from saved canvases; only accept ones key_for() could have made."""
+    return isinstance(key, str) and KEY_PATTERN.fullmatch(key) is not None
+
+
+def _umap_module():
+    try:
+        import umap
+        return umap
+    except ImportError:
+        return None
+
+
+def _row_key(row: np.ndarray) -> bytes:
+    return hashlib.blake2b(np.ascontiguousarray(row, dtype=np.float32).tobytes(), digest_size=12).digest()
+
+
+class UMAPProjection:
+    """A fitted model plus the affine map from its output to canvas coordinates."""
+
+    def __init__(self, key: str, backend: str, model, fitted_coords: np.ndarray, row_keys: list):
+        self.key = key
+        self.backend = backend
+        self.model = model
+        self.center = fitted_coords.mean(axis=0)
+        extent = float(np.abs(fitted_coords - self.center).max()) if len(fitted_coords) else 0.0
+        self.scale = LAYOUT_HALF_EXTENT / extent if extent > 1e-9 else 1.0
+        self._fitted: Dict[bytes, np.ndarray] = dict(zip(row_keys, self._to_canvas(fitted_coords)))
+        self.n_fitted = len(fitted_coords)
+        self.transformed = 0
+
+    def _to_canvas(self, coords: np.ndarray) -> np.ndarray:
+        return (np.asarray(coords, dtype=np.float64) - self.center) * self.scale
+
+    def coords_for(self, embeddings: np.ndarray) -> np.ndarray:
+        """Canvas coordinates: fitted position if the row was in the fit, transform() otherwise."""
+        embeddings = np.atleast_2d(np.asarray(embeddings, dtype=np.float32))
+        out = np.empty((len(embeddings), self.center.shape[0]), dtype=np.float64)
+        new = []
+        for i, row in enumerate(embeddings):
+            known = self._fitted.get(_row_key(row))
+            if known is None:
+                new.append(i)
+            else:
+                out[i] = known
+        if new:
+            out[new] = self._to_canvas(self.model.transform(embeddings[new]))
+            self.transformed += len(new)
+        return out
+
+    def stats(self) -> dict:
+        return {"key": self.key, "backend": self.backend, "fitted": self.n_fitted, "transformed": self.transformed}
+
+
+class UMAPProjector:
+    """Fits and caches UMAPProjections (in memory and as pickles on disk)."""
+
+    def __init__(self, cache_dir: Path = UMAP_CACHE, n_neighbors: int = UMAP_N_NEIGHBORS,
+                 min_dist: float = UMAP_MIN_DIST, n_components: int = UMAP_N_COMPONENTS,
+                 random_state: int = UMAP_RANDOM_STATE, memory_size: int = 8):
+        self.cache_dir = Path(cache_dir)
+        self.n_neighbors = n_neighbors
+        self.min_dist = min_dist
+        self.n_components = n_components
+        self.random_state = random_state
+        self.memory_size = memory_size
+        self._memory: "OrderedDict[str, UMAPProjection]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.fits = 0
+        self.cache_hits = 0
+
+    @property
+    def backend(self) -> str:
+        return "umap" if _umap_module() is not None else "isomap"
+
+    def key_for(self, embeddings: np.ndarray) -> str:
+        h = hashlib.sha1()
+        h.update(repr((self.backend, self.n_neighbors, self.min_dist, self.n_components, self.random_state)).encode())
+        h.update(np.ascontiguousarray(embeddings, dtype=np.float32).tobytes())
+        return h.hexdigest()[:20]
+
+    def _remember(self, projection: UMAPProjection) -> UMAPProjection:
+        with self._lock:
+            self._memory[projection.key] = projection
+            self._memory.move_to_end(projection.key)
+            while len(self._memory) > self.memory_size:
+                self._memory.popitem(last=False)
+        return projection
+
+    def load(self, key: str) -> Optional[UMAPProjection]:
+        """A previously fitted projection by key (memory, then disk); None if unknown."""
+        if not is_valid_key(key):
+            return None
+        with self._lock:
+            projection = self._memory.get(key)
+            if projection is not None:
+                self._memory.move_to_end(key)
+                return projection
+        path = self.cache_dir / f"{key}.pkl"
+        if not path.exists():
+            return None
+        try:
+            with open(path, "rb") as f:
+                projection = pickle.load(f)
+        except Exception as e:
+            print(f"[umap] could not load {path.name}: {e}")
+            return None
+        return self._remember(projection)
+
+    def _new_model(self, n_samples: int):
+        n_neighbors = max(2, min(self.n_neighbors, n_samples - 1))
+        umap = _umap_module()
+        if umap is not None:
+            return umap.UMAP(n_neighbors=n_neighbors, min_dist=self.min_dist, n_components=self.n_components,
+                             metric="cosine", random_state=self.random_state)
+        from sklearn.manifold import Isomap
+        return Isomap(n_neighbors=n_neighbors, n_components=self.n_components, metric="cosine")
+
+    def fit(self, embeddings: np.ndarray, force: bool = False) -> UMAPProjection:
+        """Fitted projection for this embedding set (cached unless force)."""
+        embeddings = np.atleast_2d(np.asarray(embeddings, dtype=np.float32))
+        if len(embeddings) <= self.n_components + 1:
+            raise ValueError(f"Need at least {self.n_components + 2} images for a UMAP layout")
+        key = self.key_for(embeddings)
+        if not force:
+            projection = self.load(key)
+            if projection is not None:
+                self.cache_hits += 1
+                return projection
+
+        t0 = time.perf_counter()
+        backend = self.backend
+        model = self._new_model(len(embeddings))
+        coords = model.fit_transform(embeddings)
+        projection = UMAPProjection(key, backend, model, coords, [_row_key(r) for r in embeddings])
+        self.fits += 1
+        print(f"[umap] fitted {backend} on {len(embeddings)} embeddings in {time.perf_counter() - t0:.1f}s ({key})")
+
+        ensure_cache_dirs()
+        tmp = self.cache_dir / f"{key}.pkl.tmp"
+        try:
+            with open(tmp, "wb") as f:
+                pickle.dump(projection, f, protocol=pickle.HIGHEST_PROTOCOL)
+            tmp.replace(self.cache_dir / f"{key}.pkl")
+        except Exception as e:
+            print(f"[umap] could not cache {key}: {e}")
+            tmp.unlink(missing_ok=True)
+        return self._remember(projection)
+
+    def stats(self) -> dict:
+        with self._lock:
+            cached = [p.stats() for p in self._memory.values()]
+        return {"backend": self.backend, "fits": self.fits, "cache_hits": self.cache_hits, "in_memory": cached}